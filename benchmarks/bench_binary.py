@@ -0,0 +1,48 @@
+r""" Compare file size and open time of the JSON and binary dataset formats.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_binary --frames 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from icvlp import AnnotationStore
+
+from benchmarks.synthetic import write_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = write_dataset(os.path.join(tmp, 'synthetic.json'), args.frames)
+        binary_path = os.path.join(tmp, 'synthetic.icvlp')
+
+        start = time.perf_counter()
+        store = AnnotationStore.from_json(json_path)
+        json_elapsed = time.perf_counter() - start
+        store.save(binary_path)
+
+        start = time.perf_counter()
+        mapped = AnnotationStore.load(binary_path, mmap=True)
+        mmap_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        AnnotationStore.load(binary_path, mmap=False)
+        read_elapsed = time.perf_counter() - start
+
+        assert mapped.to_json() == store.to_json()
+
+        print(f"{args.frames} frames")
+        print(f"JSON   {os.path.getsize(json_path) / 2 ** 20:8.1f} MiB  load {json_elapsed:8.3f} s")
+        print(f"binary {os.path.getsize(binary_path) / 2 ** 20:8.1f} MiB  read {read_elapsed:8.3f} s  "
+              f"mmap {mmap_elapsed * 1e3:8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
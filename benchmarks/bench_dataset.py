@@ -0,0 +1,73 @@
+r""" Compare cropping plates from video on every access against the crop cache of
+:py:class:`icvlp.dataset.PlateCropDataset`.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_dataset --videos 4 --frames 600
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from icvlp import ICVLP, Frame, Plate, Video
+from icvlp.dataset import PlateCropDataset, crop_and_resize
+from icvlp.video import VideoReaderPool, read_frames
+
+from benchmarks.synthetic import write_video
+
+
+def make_videos(num_videos: int, num_frames: int, seed: int = 0) -> ICVLP:
+    rng = random.Random(seed)
+    videos = []
+    for v in range(num_videos):
+        plates = []
+        for p, frame_start in enumerate(range(1, num_frames - 60, 30)):
+            frames = []
+            for frame_number in range(frame_start, frame_start + 60, 5):
+                x, y = rng.randrange(0, 500), rng.randrange(0, 300)
+                bbox = [x, y, x + rng.randrange(40, 140), y + rng.randrange(15, 60)]
+                frames.append(Frame(frame=frame_number, bbox=bbox))
+            plates.append(Plate(label=f"AB{p}CD", vehicle_type="bus", frame_start=frame_start,
+                                frame_end=frame_start + 55, frames=frames))
+        videos.append(Video(video_id=f"{v:04d}", fps=6, plates=plates))
+    return ICVLP(videos)
+
+
+def crop_from_video(dataset: PlateCropDataset, pool: VideoReaderPool, order: list[int]) -> None:
+    for index in order:
+        video_id = dataset.video_ids[dataset.video_codes[index]]
+        for _, image in read_frames(pool.get(video_id), [int(dataset.frame_numbers[index])]):
+            crop_and_resize(image, dataset.bboxes[index], dataset.crop_size)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--videos', type=int, default=4)
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    icvlp = make_videos(args.videos, args.frames)
+    with tempfile.TemporaryDirectory() as tmp:
+        for video in icvlp.videos:
+            write_video(os.path.join(tmp, f"{video.video_id}.mp4"), args.frames)
+        dataset = PlateCropDataset(icvlp, os.path.join(tmp, "crops"), video_path=tmp)
+        order = list(range(len(dataset)))
+        random.Random(0).shuffle(order)
+
+        def timed(name, fn):
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+            print(f"{name:<28} {len(dataset):6d} samples {elapsed:8.2f} s {len(dataset) / elapsed:10.1f} samples/s")
+
+        with VideoReaderPool(tmp, index_filename=None) as pool:
+            timed("shuffled, crop from video", lambda: crop_from_video(dataset, pool, order))
+        timed(f"build cache, {args.workers} workers", lambda: dataset.build_cache(workers=args.workers))
+        timed("shuffled, from cache", lambda: [dataset[index] for index in order])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+r""" Compare interpolating every frame in a Python loop with :py:meth:`icvlp.ICVLP.densify`.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_densify --frames 100000
+"""
+import argparse
+import time
+
+from icvlp import ICVLP, Frame
+from icvlp.object import _video_from_dict
+
+from benchmarks.synthetic import make_dataset
+
+
+def python_loop(dataset: ICVLP) -> int:
+    count = 0
+    for video in dataset.videos:
+        for plate in video.plates:
+            frames = sorted((frame for frame in plate.frames if frame.bbox is not None), key=lambda f: f.frame)
+            dense = []
+            for a, b in zip(frames, frames[1:]):
+                for frame_number in range(a.frame, b.frame):
+                    t = (frame_number - a.frame) / (b.frame - a.frame)
+                    bbox = [round(x + t * (y - x)) for x, y in zip(a.bbox, b.bbox)]
+                    dense.append(Frame(frame=frame_number, bbox=bbox))
+            if frames:
+                dense.append(Frame(frame=frames[-1].frame, bbox=list(frames[-1].bbox)))
+            count += len(dense)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=100_000)
+    args = parser.parse_args()
+
+    dataset = ICVLP([_video_from_dict(video) for video in make_dataset(args.frames)])
+    for name, densify in [("python loop", python_loop),
+                          ("densify linear", lambda d: d.densify().num_frames),
+                          ("densify cubic", lambda d: d.densify(method="cubic").num_frames)]:
+        start = time.perf_counter()
+        frames = densify(dataset)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<16} {frames:9d} frames {elapsed:8.2f} s {frames / elapsed:12.0f} frames/s")
+
+
+if __name__ == '__main__':
+    main()
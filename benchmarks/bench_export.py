@@ -0,0 +1,55 @@
+r""" Compare writing one VOC annotation file at a time with :py:func:`icvlp.export.export`, and re-exporting an
+unchanged dataset.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_export --frames 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from icvlp import ICVLP
+from icvlp.export import export, voc_annotation
+from icvlp.object import _video_from_dict
+
+from benchmarks.synthetic import make_dataset
+
+
+def one_at_a_time(dataset: ICVLP, output_dir: str) -> int:
+    files = 0
+    for video in dataset.videos:
+        for plate in video.plates:
+            for frame in plate.frames:
+                name = f"{video.video_id}_{frame.frame}_{plate.label}"
+                with open(os.path.join(output_dir, name + ".xml"), 'w') as f:
+                    f.write(voc_annotation(name + ".jpeg", 1920, 1080, f"plate-{plate.vehicle_type}", frame.bbox))
+                files += 1
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    dataset = ICVLP([_video_from_dict(video) for video in make_dataset(args.frames)])
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        files = one_at_a_time(dataset, tmp)
+        elapsed = time.perf_counter() - start
+        print(f"{'one at a time':<16} {files:7d} files {elapsed:8.2f} s {files / elapsed:10.0f} files/s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for annotation_format in ["voc", "yolo", "coco"]:
+            output_dir = os.path.join(tmp, annotation_format)
+            for name in [annotation_format, f"{annotation_format}, again"]:
+                report = export(dataset, output_dir, (1920, 1080), annotation_format, workers=args.workers)
+                print(f"{name:<16} {report.files:7d} files {report.seconds:8.2f} s "
+                      f"{report.files_per_second:10.0f} files/s {report.written:7d} written")
+
+
+if __name__ == '__main__':
+    main()
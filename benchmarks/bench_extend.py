@@ -0,0 +1,44 @@
+r""" Compare adding detector output to a plate with one :py:meth:`icvlp.object.Plate.append` per frame against
+:py:meth:`icvlp.object.Plate.extend` and :py:meth:`icvlp.object.Plate.extend_arrays`.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_extend --frames 100000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from icvlp import Frame, Plate
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frame_numbers = np.arange(args.frames) * 5
+    corners = rng.uniform(0, 1800, size=(args.frames, 2))
+    bboxes = np.hstack([corners, corners + rng.uniform(20, 200, size=(args.frames, 2))]).astype(np.float32)
+
+    def append(plate):
+        for frame_number, bbox in zip(frame_numbers.tolist(), bboxes.tolist()):
+            plate.append(Frame(frame=frame_number, bbox=bbox))
+
+    def extend(plate):
+        plate.extend([Frame(frame=frame_number, bbox=bbox)
+                      for frame_number, bbox in zip(frame_numbers.tolist(), bboxes.tolist())])
+
+    for name, add in [("append", append), ("extend", extend),
+                      ("extend_arrays", lambda plate: plate.extend_arrays(frame_numbers, bboxes))]:
+        plate = Plate(label="AB1CD", frame_start=0, frame_end=int(frame_numbers[-1]), frames=[])
+        start = time.perf_counter()
+        add(plate)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<14} {len(plate.frames):7d} frames {elapsed:8.3f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+r""" Compare seeking before every frame with the single decode pass of :py:func:`icvlp.video.read_frames`.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_extraction --frames 1800
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import cv2
+
+from icvlp import Plate, Video
+from icvlp.extraction import plan_frames
+from icvlp.video import read_frames
+
+from benchmarks.synthetic import write_video
+
+
+def seek_per_frame(video_filename: str, video: Video, step: int) -> int:
+    cap = cv2.VideoCapture(video_filename)
+    decoded = 0
+    for plate in video.plates:
+        for frame_number in range(plate.frame_start, plate.frame_end + 1, step):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number - 1)
+            ok, _ = cap.read()
+            decoded += ok
+    cap.release()
+    return decoded
+
+
+def single_pass(video_filename: str, video: Video, step: int) -> int:
+    cap = cv2.VideoCapture(video_filename)
+    plan = plan_frames(video, step, extract_path="", skip_existing=False)
+    decoded = sum(len(plan[frame_number]) for frame_number, _ in read_frames(cap, plan))
+    cap.release()
+    return decoded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=1800)
+    parser.add_argument('--step', type=int, default=5)
+    args = parser.parse_args()
+
+    # Overlapping plates, as when several vehicles are visible at the same time.
+    plates = [Plate(label=f"AB{i}CD", frame_start=start, frame_end=min(start + 300, args.frames))
+              for i, start in enumerate(range(1, args.frames, 150))]
+    video = Video(video_id="0001", fps=6, plates=plates)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video_filename = write_video(os.path.join(tmp, "0001.mp4"), args.frames)
+        for name, extract in [("seek per frame", seek_per_frame), ("single pass", single_pass)]:
+            start = time.perf_counter()
+            images = extract(video_filename, video, args.step)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<16} {images:6d} images {elapsed:8.2f} s {images / elapsed:8.1f} images/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+r""" Show that inserting videos into :py:class:`ICVLP` scales linearly with the ``video_id`` index, and that
+checking every candidate frame of a plate, as ``BoundingBoxDetector.label`` does, scales with the frame index of
+:py:class:`Plate`.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_index
+"""
+import time
+
+from icvlp import ICVLP, Frame, Plate, Video
+
+
+def insert(num_videos: int, batch_size: int) -> float:
+    videos = [Video(video_id=f"{i:08d}", plates=[]) for i in range(num_videos)]
+    dataset = ICVLP([])
+    start = time.perf_counter()
+    if batch_size == 1:
+        for video in videos:
+            dataset.append(video)
+    else:
+        for i in range(0, num_videos, batch_size):
+            dataset.extend(videos[i:i + batch_size])
+    for video in videos:
+        dataset.get_video_by_id(video.video_id)
+    return time.perf_counter() - start
+
+
+def scan_frames(num_frames: int) -> tuple[float, float]:
+    plate = Plate(label="AB1CD", frame_start=1, frame_end=5 * num_frames,
+                  frames=[Frame(frame=f, bbox=[1, 1, 9, 9]) for f in range(1, 5 * num_frames + 1, 5)])
+    candidates = range(1, 5 * num_frames + 1)
+
+    start = time.perf_counter()
+    linear = sum(any(frame.frame == frame_number for frame in plate.frames) for frame_number in candidates)
+    linear_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = sum(plate.has_frame(frame_number) for frame_number in candidates)
+    indexed_elapsed = time.perf_counter() - start
+    assert linear == indexed == num_frames
+    return linear_elapsed, indexed_elapsed
+
+
+def main():
+    for batch_size in [1, 100]:
+        for num_videos in [12_500, 25_000, 50_000, 100_000]:
+            elapsed = insert(num_videos, batch_size)
+            print(f"batch {batch_size:>4} {num_videos:>7} videos {elapsed:8.3f} s "
+                  f"{elapsed / num_videos * 1e6:6.2f} us/video")
+    for num_frames in [250, 500, 1000, 2000]:
+        linear, indexed = scan_frames(num_frames)
+        print(f"plate {num_frames:>5} frames: linear scan {linear:8.3f} s, frame index {indexed:8.3f} s")
+
+
+if __name__ == '__main__':
+    main()
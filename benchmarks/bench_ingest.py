@@ -0,0 +1,91 @@
+r""" Compare probing and parsing Pascal VOC annotations one at a time with :py:func:`icvlp.ingest.ingest_annotations`.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_ingest --frames 20000
+"""
+import argparse
+import os
+import tempfile
+import time
+from xml.etree import ElementTree
+
+from icvlp import ICVLP, Frame
+from icvlp.ingest import ingest_annotations
+from icvlp.object import _video_from_dict
+
+from benchmarks.synthetic import make_dataset
+
+VOC = """<annotation>
+    <folder>frames</folder>
+    <filename>{name}.jpeg</filename>
+    <size>
+        <width>1920</width>
+        <height>1080</height>
+        <depth>3</depth>
+    </size>
+    <object>
+        <name>plate-bus</name>
+        <pose>Unspecified</pose>
+        <truncated>0</truncated>
+        <occluded>0</occluded>
+        <difficult>0</difficult>
+        <bndbox>
+            <xmin>{bbox[0]}</xmin>
+            <ymin>{bbox[1]}</ymin>
+            <xmax>{bbox[2]}</xmax>
+            <ymax>{bbox[3]}</ymax>
+        </bndbox>
+    </object>
+</annotation>
+"""
+
+
+def one_at_a_time(dataset: ICVLP, annotations_dir: str) -> int:
+    files = 0
+    for video in dataset.videos:
+        for plate in video.plates:
+            plate.frames.clear()
+            for frame_number in range(plate.frame_start, plate.frame_end + 1, 5):
+                path = os.path.join(annotations_dir, f"{video.video_id}_{frame_number}_{plate.label}.xml")
+                if not os.path.exists(path):
+                    continue
+                bndbox = ElementTree.parse(path).getroot().find("object").find("bndbox")
+                bbox = [round(float(bndbox.find(name).text)) for name in ["xmin", "ymin", "xmax", "ymax"]]
+                plate.append(Frame(frame=frame_number, bbox=bbox))
+                files += 1
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=20_000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    videos = make_dataset(args.frames)
+    with tempfile.TemporaryDirectory() as tmp:
+        for video in videos:
+            for plate in video["plates"]:
+                # Every other annotation exists, as when some frames were rejected during review.
+                for frame in plate["frames"][::2]:
+                    name = f"{video['video_id']}_{frame['frame']}_{plate['label']}"
+                    with open(os.path.join(tmp, name + ".xml"), 'w') as f:
+                        f.write(VOC.format(name=name, bbox=frame["bbox"]))
+
+        def load():
+            return ICVLP([_video_from_dict(video) for video in make_dataset(args.frames)])
+
+        dataset = load()
+        start = time.perf_counter()
+        files = one_at_a_time(dataset, tmp)
+        elapsed = time.perf_counter() - start
+        print(f"{'one at a time':<20} {files:7d} files {elapsed:8.2f} s {files / elapsed:10.0f} files/s")
+        for workers in sorted({1, args.workers}):
+            report = ingest_annotations(load(), tmp, workers=workers)
+            name = f"ingest, {workers} workers"
+            print(f"{name:<20} {report.files:7d} files {report.seconds:8.2f} s {report.files_per_second:10.0f} files/s")
+
+
+if __name__ == '__main__':
+    main()
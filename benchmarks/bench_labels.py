@@ -0,0 +1,53 @@
+r""" Compare splitting every plate label with the old ``get_label_composition`` against
+:py:func:`icvlp.labels.region_counts`.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_labels --frames 1000000
+"""
+import argparse
+import time
+from collections import Counter
+
+from icvlp import ICVLP
+from icvlp.labels import region_counts
+from icvlp.object import _video_from_dict
+from icvlp.store import AnnotationStore
+
+from benchmarks.synthetic import make_dataset
+
+
+def get_label_composition(text: str):
+    num = list("1234567890")
+    mid = "".join([i for i in text if i in num])
+    pre, post = text.split(mid)
+    return pre, mid, post
+
+
+def split_every_label(dataset: ICVLP) -> Counter:
+    regions = Counter()
+    for video in dataset.videos:
+        for plate in video.plates:
+            regions[get_label_composition(plate.label)[0]] += 1
+    return regions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    dataset = ICVLP([_video_from_dict(video) for video in make_dataset(args.frames, frames_per_plate=1)])
+    store = AnnotationStore.from_icvlp(dataset)
+    print(f"{store.num_plates} plates")
+    for name, count in [("split labels", split_every_label),
+                        ("regions, objects", region_counts),
+                        ("regions, store", lambda d: region_counts(store))]:
+        start = time.perf_counter()
+        regions = count(dataset)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<18} {len(regions):4d} regions {elapsed:8.3f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+r""" Measure memory per frame of the data objects, against objects with a ``__dict__`` as before ``__slots__``,
+plain dictionaries and :py:class:`icvlp.store.AnnotationStore`.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_memory --frames 200000
+"""
+import argparse
+import copy
+import gc
+import time
+import tracemalloc
+
+from icvlp import ICVLP
+from icvlp.object import _video_from_dict
+from icvlp.store import AnnotationStore
+
+from benchmarks.synthetic import make_dataset
+
+
+class DictObject:
+    r""" Layout of the data objects before ``__slots__``: an instance ``__dict__`` and a ``children`` list. """
+
+    def __init__(self, data: dict, children_key: str = None):
+        self.children = []
+        for key, value in data.items():
+            if key == children_key:
+                value = [DictObject(child, "plates" if key == "videos" else "frames" if key == "plates" else None)
+                         for child in value]
+                self.children = value
+            setattr(self, key, value)
+
+
+def dict_objects(videos: list) -> list:
+    return [DictObject(video, "plates") for video in videos]
+
+
+def measure(build, *args):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(*args)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=200_000)
+    args = parser.parse_args()
+
+    videos = make_dataset(args.frames)
+    for name, build in [("dicts", copy.deepcopy),
+                        ("__dict__ objects", dict_objects),
+                        ("slots objects", lambda v: ICVLP([_video_from_dict(video) for video in v])),
+                        ("store", AnnotationStore.from_videos)]:
+        # Every build gets its own copy of the input, allocated outside of the measurement.
+        data = copy.deepcopy(videos)
+        result, size, elapsed = measure(build, data)
+        print(f"{name:<18} {size / args.frames:8.1f} bytes/frame {elapsed:8.3f} s")
+        del result, data
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+r""" Compare selecting plates with nested loops against :py:meth:`icvlp.object.ICVLP.query`.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_query --frames 200000
+"""
+import argparse
+import time
+
+from icvlp import ICVLP
+from icvlp.object import _video_from_dict
+
+from benchmarks.synthetic import make_dataset
+
+
+def nested_loops(dataset: ICVLP) -> int:
+    selected = []
+    for video in dataset.videos:
+        for plate in video.plates:
+            if plate.vehicle_type == "semi_trailer" and plate.label.startswith("B"):
+                selected.append(plate)
+    return len(selected)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+
+    dataset = ICVLP([_video_from_dict(video) for video in make_dataset(args.frames, frames_per_plate=2)])
+    start = time.perf_counter()
+    dataset.query_index
+    print(f"{'build index':<14} {time.perf_counter() - start:8.3f} s")
+    for name, select in [("nested loops", nested_loops),
+                         ("query", lambda d: d.query(vehicle_type="semi_trailer", label_prefix="B").count())]:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            selected = select(dataset)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(f"{name:<14} {selected:7d} plates {elapsed * 1e3:8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
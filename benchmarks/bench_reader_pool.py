@@ -0,0 +1,69 @@
+r""" Compare opening a capture for every access against :py:class:`icvlp.video.VideoReaderPool`.
+
+Every access reads the FPS of a random video and decodes one frame, as the labeling tools do when moving between
+plates of different videos.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_reader_pool --videos 8 --accesses 500
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import cv2
+
+from icvlp.video import VideoReaderPool
+
+from benchmarks.synthetic import write_video
+
+
+def open_per_access(video_path: str, accesses: list[tuple[str, int]]) -> int:
+    decoded = 0
+    for video_id, frame_number in accesses:
+        cap = cv2.VideoCapture(os.path.join(video_path, f"{video_id}.mp4"))
+        cap.get(cv2.CAP_PROP_FPS)
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number - 1)
+        ok, _ = cap.read()
+        decoded += ok
+        cap.release()
+    return decoded
+
+
+def pooled(video_path: str, accesses: list[tuple[str, int]]) -> int:
+    decoded = 0
+    with VideoReaderPool(video_path, index_filename=None) as pool:
+        for video_id, frame_number in accesses:
+            pool.metadata(video_id)
+            cap = pool.get(video_id)
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number - 1)
+            ok, _ = cap.read()
+            decoded += ok
+    return decoded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--videos', type=int, default=8)
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--accesses', type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        video_ids = [f"{i:04d}" for i in range(args.videos)]
+        for video_id in video_ids:
+            write_video(os.path.join(tmp, f"{video_id}.mp4"), args.frames)
+        accesses = [(rng.choice(video_ids), rng.randint(1, args.frames)) for _ in range(args.accesses)]
+
+        for name, access in [("open per access", open_per_access), ("reader pool", pooled)]:
+            start = time.perf_counter()
+            decoded = access(tmp, accesses)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<16} {decoded:6d} frames {elapsed:8.2f} s {decoded / elapsed:8.1f} frames/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+r""" Compare the list-based counting of the old ``DatasetCounter`` with :py:class:`icvlp.stats.DatasetStats`.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_stats --frames 200000
+"""
+import argparse
+import time
+
+from icvlp import ICVLP
+from icvlp.object import _video_from_dict
+from icvlp.stats import DatasetStats
+from icvlp.store import AnnotationStore
+
+from benchmarks.synthetic import make_dataset
+
+
+def list_counter(dataset: ICVLP) -> int:
+    distinct_plates, vehicle_type_count, frames_count = [], {}, 0
+    for video in dataset.videos:
+        for plate in video.plates:
+            if plate.label not in distinct_plates:
+                distinct_plates.append(plate.label)
+                vehicle_type_count[plate.vehicle_type] = vehicle_type_count.get(plate.vehicle_type, 0) + 1
+            for _ in plate.frames:
+                frames_count += 1
+    return len(distinct_plates)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=200_000)
+    parser.add_argument('--frames-per-plate', type=int, default=5)
+    args = parser.parse_args()
+
+    dataset = ICVLP([_video_from_dict(video) for video in make_dataset(args.frames, args.frames_per_plate)])
+    store = AnnotationStore.from_icvlp(dataset)
+    for name, count in [("list counter", list_counter),
+                        ("stats, objects", lambda d: DatasetStats.from_dataset(d).num_distinct_labels),
+                        ("stats, store", lambda d: DatasetStats.from_dataset(store).num_distinct_labels)]:
+        start = time.perf_counter()
+        distinct = count(dataset)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<16} {distinct:7d} distinct plates {elapsed:8.3f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+r""" Compare load time and memory of the object model against the columnar :py:class:`AnnotationStore`.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_store --frames 1000000
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+from icvlp import ICVLP, AnnotationStore
+
+from benchmarks.synthetic import write_dataset
+
+
+def measure(load, path):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    dataset = load(path)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return dataset, elapsed, retained, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_dataset(os.path.join(tmp, 'synthetic.json'), args.frames)
+        print(f"{args.frames} frames, {os.path.getsize(path) / 2 ** 20:.1f} MiB JSON")
+        for name, load in [('ICVLP.from_json', ICVLP.from_json), ('AnnotationStore.from_json', AnnotationStore.from_json)]:
+            dataset, elapsed, retained, peak = measure(load, path)
+            print(f"{name:<28} {elapsed:8.2f} s  retained {retained / 2 ** 20:8.1f} MiB  peak {peak / 2 ** 20:8.1f} MiB")
+            del dataset
+
+
+if __name__ == '__main__':
+    main()
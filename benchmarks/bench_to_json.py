@@ -0,0 +1,45 @@
+r""" Compare ``ICVLP.to_json`` with the previous ``json.dumps`` of ``as_dict`` output.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_to_json --frames 1000000
+"""
+import argparse
+import json
+import time
+
+import icvlp.object
+from icvlp import ICVLP
+
+from benchmarks.synthetic import make_dataset
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    dataset = ICVLP([icvlp.object._video_from_dict(video) for video in make_dataset(args.frames)])
+    print(f"{args.frames} frames")
+    print(f"{'before (json.dumps of as_dict)':<32} {timed(lambda: json.dumps([v.as_dict() for v in dataset.videos], indent=2)):8.2f} s")
+
+    backends = {'orjson': icvlp.object.orjson, 'ujson': icvlp.object.ujson}
+    for name in ['orjson', 'ujson', 'writer']:
+        if name != 'writer' and backends[name] is None:
+            print(f"{name:<32} not installed")
+            continue
+        icvlp.object.orjson = backends['orjson'] if name == 'orjson' else None
+        icvlp.object.ujson = backends['ujson'] if name in ('orjson', 'ujson') else None
+        print(f"{name + ' indent=2':<32} {timed(dataset.to_json):8.2f} s")
+        print(f"{name + ' compact':<32} {timed(lambda: dataset.to_json(compact=True)):8.2f} s")
+    icvlp.object.orjson, icvlp.object.ujson = backends['orjson'], backends['ujson']
+
+
+if __name__ == '__main__':
+    main()
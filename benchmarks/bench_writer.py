@@ -0,0 +1,70 @@
+r""" Compare writing extracted frames with ``cv2.imwrite`` in the decode loop against :py:class:`FrameWriter`.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_writer --frames 1800 --threads 1 2 4
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import cv2
+
+from icvlp import Plate, Video
+from icvlp.extraction import ThroughputCounters, extract_video, plan_frames
+from icvlp.video import read_frames
+
+from benchmarks.synthetic import write_video
+
+
+def imwrite_in_loop(video_filename: str, video: Video, extract_path: str) -> int:
+    cap = cv2.VideoCapture(video_filename)
+    step = int(cap.get(cv2.CAP_PROP_FPS) // video.fps)
+    plan = plan_frames(video, step, extract_path)
+    written = 0
+    for frame_number, frame in read_frames(cap, plan):
+        for path in plan[frame_number]:
+            cv2.imwrite(path, frame)
+            written += 1
+    cap.release()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=1800)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--format', default='jpeg', choices=['jpeg', 'png', 'webp'])
+    args = parser.parse_args()
+
+    plates = [Plate(label=f"AB{i}CD", frame_start=start, frame_end=min(start + 300, args.frames))
+              for i, start in enumerate(range(1, args.frames, 150))]
+    video = Video(video_id="0001", fps=30, plates=plates)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video_filename = write_video(os.path.join(tmp, "0001.mp4"), args.frames)
+
+        extract_path = os.path.join(tmp, "imwrite")
+        os.makedirs(extract_path)
+        start = time.perf_counter()
+        images = imwrite_in_loop(video_filename, video, extract_path) if args.format == 'jpeg' else 0
+        elapsed = time.perf_counter() - start
+        if images:
+            print(f"{'imwrite in loop':<18} {images:6d} images {elapsed:8.2f} s {images / elapsed:8.1f} images/s")
+
+        for threads in args.threads:
+            extract_path = os.path.join(tmp, f"writer_{threads}")
+            os.makedirs(extract_path)
+            counters = ThroughputCounters()
+            start = time.perf_counter()
+            images = extract_video(video, video_filename, extract_path, image_format=args.format,
+                                   writer_threads=threads, counters=counters)
+            elapsed = time.perf_counter() - start
+            name = f"{threads} writer threads"
+            print(f"{name:<18} {images:6d} images {elapsed:8.2f} s {images / elapsed:8.1f} images/s")
+            print(f"    {counters}")
+
+
+if __name__ == '__main__':
+    main()
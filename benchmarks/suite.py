@@ -0,0 +1,275 @@
+r""" Performance baseline of the icvlp package.
+
+Every benchmark builds a synthetic dataset of each size, times an operation and measures its peak memory, and
+the results are written to a JSON file named after the commit, so runs can be compared between commits::
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --sizes 1000 100000 --filter json
+    python -m benchmarks.suite --compare benchmarks/results/<earlier run>.json
+
+Results are written to ``benchmarks/results``, which is ignored by git, or to the directory given with
+``--output``; they depend on the machine, so they are kept locally rather than committed.
+
+Times are the best of ``--repeat`` runs; peak memory is measured with :py:mod:`tracemalloc` in a separate run, as
+tracing slows Python down. With ``--compare``, benchmarks that got slower or use more memory than ``--threshold``
+times the earlier run are reported, and the exit status is 1.
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Optional
+
+from icvlp import ICVLP
+from icvlp.extraction import extract_video
+from icvlp.object import _video_from_dict
+from icvlp.stats import DatasetStats
+
+from benchmarks.synthetic import make_dataset, write_dataset, write_video
+
+SIZES = [1_000, 100_000, 1_000_000]
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+BENCHMARKS: dict[str, tuple[Callable, bool]] = {}
+
+
+def benchmark(name: str, scales: bool = True):
+    r""" Register a benchmark.
+
+    The decorated function takes the number of frames and a scratch directory, prepares its data and returns the
+    callable to measure.
+
+    Arguments:
+        name (str): Name of the benchmark.
+        scales (bool, optional): Run the benchmark for every size. If ``False``, it runs once, with size ``0``.
+            Default: ``True``.
+    """
+    def decorator(function: Callable) -> Callable:
+        BENCHMARKS[name] = (function, scales)
+        return function
+    return decorator
+
+
+def load(num_frames: int) -> ICVLP:
+    return ICVLP([_video_from_dict(video) for video in make_dataset(num_frames)])
+
+
+@benchmark("ICVLP.from_json")
+def bench_from_json(num_frames: int, tmp: str):
+    path = write_dataset(os.path.join(tmp, "dataset.json"), num_frames)
+    return lambda: ICVLP.from_json(path)
+
+
+@benchmark("ICVLP.to_json")
+def bench_to_json(num_frames: int, tmp: str):
+    dataset = load(num_frames)
+    return dataset.to_json
+
+
+@benchmark("ICVLP.get_video_by_id")
+def bench_get_video_by_id(num_frames: int, tmp: str):
+    dataset = load(num_frames)
+    video_ids = [video.video_id for video in dataset.videos] * (10_000 // len(dataset.videos) + 1)
+    return lambda: [dataset.get_video_by_id(video_id) for video_id in video_ids[:10_000]]
+
+
+@benchmark("ICVLP.append")
+def bench_append(num_frames: int, tmp: str):
+    videos = load(num_frames).videos
+
+    def append():
+        dataset = ICVLP([])
+        for video in videos:
+            dataset.append(video)
+    return append
+
+
+@benchmark("ICVLP.extend")
+def bench_extend(num_frames: int, tmp: str):
+    videos = load(num_frames).videos
+    return lambda: ICVLP([]).extend(videos)
+
+
+@benchmark("Plate.check_frame_number_exists_in_children")
+def bench_frame_exists(num_frames: int, tmp: str):
+    plates = [plate for video in load(num_frames).videos for plate in video.plates]
+
+    def check():
+        for plate in plates:
+            for frame_number in range(plate.frame_start, plate.frame_end + 1, 5):
+                plate.check_frame_number_exists_in_children(frame_number)
+                plate.check_frame_number_exists_in_children(frame_number + 1)
+    return check
+
+
+@benchmark("DatasetStats.from_dataset")
+def bench_stats(num_frames: int, tmp: str):
+    dataset = load(num_frames)
+    return lambda: DatasetStats.from_dataset(dataset)
+
+
+@benchmark("extract_video", scales=False)
+def bench_extract_video(num_frames: int, tmp: str):
+    video_frames = 300
+    video_filename = write_video(os.path.join(tmp, "video.mp4"), video_frames)
+    plates = [{"label": f"AB{i}CD", "vehicle_type": None, "frame_start": start,
+               "frame_end": min(start + 60, video_frames), "frames": []}
+              for i, start in enumerate(range(1, video_frames, 30))]
+    video = _video_from_dict({"video_id": "0001", "fps": 6, "plates": plates})
+    runs = 0
+
+    def extract():
+        nonlocal runs
+        runs += 1
+        # A fresh directory every run, since existing images are skipped.
+        extract_path = os.path.join(tmp, f"frames_{runs}")
+        os.makedirs(extract_path)
+        return extract_video(video, video_filename, extract_path)
+    return extract
+
+
+def measure(function: Callable, repeat: int) -> dict:
+    r""" Time ``function`` ``repeat`` times, then measure its peak memory in one more run.
+
+    Returns:
+        dict: ``min_seconds``, ``median_seconds`` and ``peak_bytes``.
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+        del result
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = function()
+        _, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+    return {"min_seconds": min(times), "median_seconds": statistics.median(times), "peak_bytes": peak}
+
+
+def run(sizes: list[int],
+        repeat: int = 3,
+        name_filter: Optional[str] = None,
+        report: Optional[Callable[[dict], None]] = None) -> list[dict]:
+    r""" Run the benchmarks whose name contains ``name_filter`` for every size.
+
+    Arguments:
+        sizes (List[int]): Numbers of frames of the synthetic datasets.
+        repeat (int, optional): Number of timed runs. Default: ``3``.
+        name_filter (str, optional): Substring of the names of the benchmarks to run. Default: all.
+        report (Callable[[dict], None], optional): Called with every result as it is measured.
+
+    Returns:
+        List[dict]: One result per benchmark and size.
+    """
+    results = []
+    for name, (setup, scales) in BENCHMARKS.items():
+        if name_filter and name_filter not in name:
+            continue
+        for size in (sizes if scales else [0]):
+            with tempfile.TemporaryDirectory() as tmp:
+                result = {"name": name, "size": size, "repeat": repeat, **measure(setup(size, tmp), repeat)}
+            results.append(result)
+            if report is not None:
+                report(result)
+    return results
+
+
+def compare(results: list[dict], baseline: list[dict], threshold: float = 1.2) -> list[str]:
+    r""" Compare results with an earlier run.
+
+    Arguments:
+        results (List[dict]): Results of this run.
+        baseline (List[dict]): Results of the earlier run.
+        threshold (float, optional): Ratio above which a benchmark counts as a regression. Default: ``1.2``.
+
+    Returns:
+        List[str]: One line per benchmark in both runs, prefixed with ``REGRESSION`` where this run is slower or
+        uses more memory by more than ``threshold`` times and more than a millisecond or a MiB.
+    """
+    earlier = {(result["name"], result["size"]): result for result in baseline}
+    lines = []
+    for result in results:
+        before = earlier.get((result["name"], result["size"]))
+        if before is None:
+            continue
+        time_ratio = result["min_seconds"] / before["min_seconds"] if before["min_seconds"] else 1.0
+        memory_ratio = result["peak_bytes"] / before["peak_bytes"] if before["peak_bytes"] else 1.0
+        # Differences below a millisecond or a MiB are noise, whatever the ratio.
+        slower = time_ratio > threshold and result["min_seconds"] - before["min_seconds"] > 1e-3
+        larger = memory_ratio > threshold and result["peak_bytes"] - before["peak_bytes"] > 2 ** 20
+        flag = "REGRESSION" if slower or larger else ""
+        lines.append(f"{flag:<10} {result['name']:<44} {result['size']:>9} "
+                     f"time x{time_ratio:5.2f}  memory x{memory_ratio:5.2f}")
+    return lines
+
+
+def git_commit() -> tuple[Optional[str], bool]:
+    r""" Returns the current commit and whether the working tree has changes, or ``(None, False)`` outside git. """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                                    text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, dirty
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--filter', default=None, help="Run only benchmarks whose name contains this string.")
+    parser.add_argument('--output', default=RESULTS_DIR, help="Directory of the results files.")
+    parser.add_argument('--compare', default=None, help="Results file of an earlier run.")
+    parser.add_argument('--threshold', type=float, default=1.2)
+    args = parser.parse_args()
+
+    def report(result: dict):
+        print(f"{result['name']:<44} {result['size']:>9} {result['min_seconds']:10.4f} s "
+              f"(median {result['median_seconds']:.4f} s) {result['peak_bytes'] / 2 ** 20:10.1f} MiB peak",
+              flush=True)
+
+    results = run(args.sizes, args.repeat, args.filter, report)
+
+    commit, dirty = git_commit()
+    timestamp = datetime.datetime.now(datetime.timezone.utc)
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{timestamp:%Y%m%dT%H%M%S}-{commit or 'nogit'}{'-dirty' if dirty else ''}.json")
+    with open(path, 'w') as f:
+        json.dump({
+            "commit": commit,
+            "dirty": dirty,
+            "timestamp": timestamp.isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "results": results,
+        }, f, indent=2)
+    print(f"Wrote {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            lines = compare(results, json.load(f)["results"], args.threshold)
+        print("\n".join(lines))
+        if any(line.startswith("REGRESSION") for line in lines):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+import json
+import random
+import string
+
+
+def make_dataset(num_frames: int, frames_per_plate: int = 20, plates_per_video: int = 50, seed: int = 0) -> list:
+    r""" Generate a synthetic dataset in the JSON layout of ``icvlp_v0.1.json``.
+
+    Arguments:
+        num_frames (int): Total number of annotated frames.
+        frames_per_plate (int): Number of frames of each plate.
+        plates_per_video (int): Number of plates of each video.
+        seed (int): Random seed.
+
+    Returns:
+        list: List of video dictionaries.
+    """
+    rng = random.Random(seed)
+    vehicle_types = ['single_axle', 'bus', 'box_truck', 'semi_trailer', 'pickup_truck', 'minibus', None]
+    videos = []
+    frames_left = num_frames
+    while frames_left > 0:
+        video = {
+            "video_id": f"{len(videos):06d}",
+            "source": f"source_{len(videos) % 7}",
+            "url": f"https://www.youtube.com/watch?v={len(videos):011d}",
+            "fps": 6,
+            "plates": [],
+        }
+        while frames_left > 0 and len(video["plates"]) < plates_per_video:
+            n = min(frames_per_plate, frames_left)
+            frame_start = rng.randrange(0, 100_000)
+            frames = []
+            for i in range(n):
+                x, y = rng.randrange(0, 1800), rng.randrange(0, 1000)
+                frames.append({"frame": frame_start + 5 * i, "bbox": [x, y, x + rng.randrange(40, 200),
+                                                                      y + rng.randrange(15, 80)]})
+            video["plates"].append({
+                "label": (rng.choice(string.ascii_uppercase) + str(rng.randrange(1, 9999))
+                          + "".join(rng.choices(string.ascii_uppercase, k=2))),
+                "vehicle_type": rng.choice(vehicle_types),
+                "frame_start": frame_start,
+                "frame_end": frame_start + 5 * max(n - 1, 0),
+                "frames": frames,
+            })
+            frames_left -= n
+        videos.append(video)
+    return videos
+
+
+def write_dataset(path: str, num_frames: int, **kwargs) -> str:
+    r""" Write a synthetic dataset to ``path`` as indented JSON and return the path. """
+    with open(path, 'w') as f:
+        json.dump(make_dataset(num_frames, **kwargs), f, indent=2)
+    return path
+
+
+def write_video(path: str, num_frames: int, width: int = 640, height: int = 360, fps: int = 30) -> str:
+    r""" Write a synthetic MPEG-4 video whose frames differ from each other and return the path. """
+    import cv2
+    import numpy as np
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    for i in range(num_frames):
+        frame = np.roll(background, i * 4, axis=1)
+        cv2.putText(frame, str(i + 1), (20, height // 2), cv2.FONT_HERSHEY_SIMPLEX, 3, (255, 255, 255), 6)
+        writer.write(frame)
+    writer.release()
+    return path
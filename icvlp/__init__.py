@@ -2,5 +2,6 @@ from .downloader import VideoDownloader
 
 from .object import ICVLP
 from .object import *
+from .store import AnnotationStore
 
 __version__ = '0.0.1'
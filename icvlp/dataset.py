@@ -0,0 +1,296 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Optional, Union
+
+import cv2
+import numpy as np
+
+from icvlp.journal import write_atomic
+from icvlp.object import ICVLP, Video
+from icvlp.store import StringTable
+from icvlp.video import VideoReaderPool, read_frames
+
+
+class PlateCropDataset:
+    r""" Map-style dataset of resized license plate crops.
+
+    Every annotated frame of every plate with a bounding box is one sample ``(crop, label, vehicle_type)``, where
+    ``crop`` is a ``uint8`` BGR image of shape ``(height, width, 3)``. The dataset implements ``__len__`` and
+    ``__getitem__``, so it can be passed directly to ``torch.utils.data.DataLoader``; use ``transform`` to convert
+    crops to tensors.
+
+        >>> dataset = PlateCropDataset(ICVLP.from_json('icvlp_v0.1.json'), 'crops', video_path='videos')
+        >>> dataset.build_cache(workers=8)
+        >>> loader = DataLoader(dataset, batch_size=256, shuffle=True, num_workers=8)
+
+    Crops are cached in ``cache_dir`` in one contiguous ``uint8`` memory-mapped array ``crops.u8`` of shape
+    ``(len(dataset), height, width, 3)``, with a ``valid.u8`` flag per sample and an ``index.json`` describing the
+    samples. Samples are ordered by video, so the cache is split into one contiguous shard per video:
+    :py:meth:`build_cache` fills the shards in parallel, decoding every video once in a forward pass. Samples not
+    cached yet are cropped on first access, from ``frames_path`` if the extracted frame exists, else from the video.
+    Once every sample is cached, reading a sample is a memory copy and never decodes video.
+
+    DataLoader workers open the memory map and video captures lazily in their own process, and write disjoint
+    samples, so the cache is filled correctly by any number of workers. The cache is rebuilt if the samples or the
+    crop size change.
+
+    Arguments:
+        dataset (ICVLP or Iterable[Video]): The dataset, e.g. :py:class:`icvlp.ICVLP`, :py:class:`icvlp.LazyICVLP` or
+            :py:class:`icvlp.AnnotationStore`.
+        cache_dir (str): Directory of the crop cache. Created if it does not exist.
+        crop_size (Tuple[int, int], optional): Height and width of the crops. Default: ``(64, 192)``.
+        video_path (str, optional): Directory of the ``<video_id>.mp4`` video files.
+        frames_path (str, optional): Directory of the ``<video_id>_<frame>_<label>.jpeg`` extracted frames.
+        transform (Callable, optional): Applied to every crop before it is returned.
+    """
+
+    def __init__(self,
+                 dataset: Union[ICVLP, Iterable[Video]],
+                 cache_dir: str,
+                 crop_size: tuple[int, int] = (64, 192),
+                 video_path: Optional[str] = None,
+                 frames_path: Optional[str] = None,
+                 transform: Optional[Callable] = None) -> None:
+        if video_path is None and frames_path is None:
+            raise ValueError("At least one of video_path and frames_path is required.")
+        self.cache_dir: str = cache_dir
+        self.crop_size: tuple[int, int] = (int(crop_size[0]), int(crop_size[1]))
+        self.video_path: Optional[str] = video_path
+        self.frames_path: Optional[str] = frames_path
+        self.transform: Optional[Callable] = transform
+
+        self._collect_samples(dataset.videos if isinstance(dataset, ICVLP) else dataset)
+        os.makedirs(cache_dir, exist_ok=True)
+        self._create_cache()
+
+        self._crops: Optional[np.memmap] = None
+        self._valid: Optional[np.memmap] = None
+        self._videos: Optional[VideoReaderPool] = None
+        self._pid: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.frame_numbers)
+
+    def __getitem__(self, index: int) -> tuple:
+        r""" Get a sample.
+
+        Arguments:
+            index (int): Index of the sample.
+
+        Returns:
+            Tuple[np.ndarray, str, Optional[str]]: The crop, or ``transform(crop)``, the plate label and the vehicle
+            type.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Sample index {index} out of range for {len(self)} samples.")
+        self._open()
+        if not self._valid[index]:
+            image = self._read_frame_image(index)
+            self._crops[index] = crop_and_resize(image, self.bboxes[index], self.crop_size)
+            self._valid[index] = 1
+        crop = np.array(self._crops[index])
+        if self.transform is not None:
+            crop = self.transform(crop)
+        return crop, self.label(index), self.vehicle_type(index)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.update(_crops=None, _valid=None, _videos=None, _pid=None)
+        return state
+
+    def label(self, index: int) -> str:
+        return self.labels.decode(int(self.label_codes[index]))
+
+    def vehicle_type(self, index: int) -> Optional[str]:
+        return self.vehicle_types.decode(int(self.vehicle_type_codes[index]))
+
+    @property
+    def num_cached(self) -> int:
+        r""" Number of samples whose crop is cached. """
+        self._open()
+        return int(np.count_nonzero(self._valid))
+
+    def build_cache(self, workers: int = 1) -> int:
+        r""" Crop every sample that is not cached yet.
+
+        Every video shard is filled by decoding its video once in a forward pass, in a pool of processes if
+        ``workers > 1``. Samples whose video is missing are left for :py:meth:`__getitem__`, which also reads
+        extracted frames.
+
+        Arguments:
+            workers (int, optional): Number of worker processes. Default: ``1``.
+
+        Returns:
+            int: Number of samples cropped.
+        """
+        self._open()
+        self._crops.flush()
+        self._valid.flush()
+        shards = [code for code in range(len(self.video_ids))
+                  if not self._valid[self.video_offsets[code]:self.video_offsets[code + 1]].all()]
+        if workers <= 1:
+            return sum(self._fill_shard(code) for code in shards)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as executor:
+            return sum(executor.map(_fill_shard_job, shards))
+
+    def _collect_samples(self, videos: Iterable[Video]) -> None:
+        self.video_ids: list[str] = []
+        self.labels: StringTable = StringTable()
+        self.vehicle_types: StringTable = StringTable()
+        offsets, frame_numbers, bboxes, label_codes, vehicle_type_codes = [0], [], [], [], []
+        for video in videos:
+            for plate in video.plates:
+                label_code = self.labels.encode(plate.label)
+                vehicle_type_code = self.vehicle_types.encode(plate.vehicle_type)
+                for frame in plate.frames:
+                    if frame.bbox is None:
+                        continue
+                    frame_numbers.append(frame.frame)
+                    bboxes.append(frame.bbox)
+                    label_codes.append(label_code)
+                    vehicle_type_codes.append(vehicle_type_code)
+            if len(frame_numbers) > offsets[-1]:
+                self.video_ids.append(video.video_id)
+                offsets.append(len(frame_numbers))
+        self.video_offsets: np.ndarray = np.asarray(offsets, dtype=np.int64)
+        self.frame_numbers: np.ndarray = np.asarray(frame_numbers, dtype=np.int32)
+        self.bboxes: np.ndarray = np.asarray(bboxes, dtype=np.int32).reshape(-1, 4)
+        self.label_codes: np.ndarray = np.asarray(label_codes, dtype=np.int32)
+        self.vehicle_type_codes: np.ndarray = np.asarray(vehicle_type_codes, dtype=np.int32)
+        self.video_codes: np.ndarray = np.repeat(np.arange(len(self.video_ids), dtype=np.int32),
+                                                 np.diff(self.video_offsets))
+
+    def _fingerprint(self) -> str:
+        digest = hashlib.sha1()
+        digest.update(json.dumps([self.crop_size, self.video_ids, self.labels.strings]).encode('utf-8'))
+        for column in [self.video_offsets, self.frame_numbers, self.bboxes, self.label_codes]:
+            digest.update(column.tobytes())
+        return digest.hexdigest()
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.cache_dir, "index.json")
+
+    @property
+    def _crops_path(self) -> str:
+        return os.path.join(self.cache_dir, "crops.u8")
+
+    @property
+    def _valid_path(self) -> str:
+        return os.path.join(self.cache_dir, "valid.u8")
+
+    def _create_cache(self) -> None:
+        r""" Create empty cache files, unless the cache on disk was built for the same samples. """
+        index = {
+            "num_samples": len(self),
+            "crop_size": list(self.crop_size),
+            "fingerprint": self._fingerprint(),
+        }
+        if os.path.exists(self._index_path):
+            with open(self._index_path, 'r') as f:
+                if json.load(f) == index:
+                    return
+        # Remove the index first, so that a crash leaves no index pointing at a half-built cache.
+        if os.path.exists(self._index_path):
+            os.remove(self._index_path)
+        height, width = self.crop_size
+        for path, size in [(self._crops_path, len(self) * height * width * 3), (self._valid_path, len(self))]:
+            with open(path, 'wb') as f:
+                f.truncate(size)
+        write_atomic(self._index_path, json.dumps(index))
+
+    def _open(self) -> None:
+        r""" Open the memory maps, once per process. """
+        if self._pid == os.getpid():
+            return
+        shape = (len(self), *self.crop_size, 3)
+        if len(self):
+            self._crops = np.memmap(self._crops_path, dtype=np.uint8, mode='r+', shape=shape)
+            self._valid = np.memmap(self._valid_path, dtype=np.uint8, mode='r+', shape=(len(self),))
+        else:
+            self._crops = np.zeros(shape, dtype=np.uint8)
+            self._valid = np.zeros(0, dtype=np.uint8)
+        self._videos = VideoReaderPool(self.video_path, max_open=4, index_filename=None) if self.video_path else None
+        self._pid = os.getpid()
+
+    def _frame_filename(self, index: int) -> Optional[str]:
+        if self.frames_path is None:
+            return None
+        video_id = self.video_ids[self.video_codes[index]]
+        return os.path.join(self.frames_path, f"{video_id}_{self.frame_numbers[index]}_{self.label(index)}.jpeg")
+
+    def _read_frame_image(self, index: int) -> np.ndarray:
+        frame_filename = self._frame_filename(index)
+        if frame_filename is not None and os.path.exists(frame_filename):
+            image = cv2.imread(frame_filename)
+            if image is None:
+                raise FileNotFoundError(f"Could not read image {frame_filename}.")
+            return image
+        video_id = self.video_ids[self.video_codes[index]]
+        frame_number = int(self.frame_numbers[index])
+        if self._videos is not None and video_id in self._videos:
+            for _, image in read_frames(self._videos.get(video_id), [frame_number]):
+                return image
+        raise FileNotFoundError(f"Frame {frame_number} of video {video_id} not found.")
+
+    def _fill_shard(self, code: int) -> int:
+        r""" Crop the uncached samples of one video from a forward decode pass, and return their number. """
+        self._open()
+        start, end = int(self.video_offsets[code]), int(self.video_offsets[code + 1])
+        missing = start + np.flatnonzero(self._valid[start:end] == 0)
+        video_id = self.video_ids[code]
+        if not len(missing) or self._videos is None or video_id not in self._videos:
+            return 0
+        by_frame: dict[int, list[int]] = {}
+        for index in missing.tolist():
+            by_frame.setdefault(int(self.frame_numbers[index]), []).append(index)
+        cap = self._videos.get(video_id)
+        filled = []
+        for frame_number, image in read_frames(cap, by_frame):
+            for index in by_frame[frame_number]:
+                self._crops[index] = crop_and_resize(image, self.bboxes[index], self.crop_size)
+                filled.append(index)
+        self._videos.release(video_id)
+        # Crops reach the file before they are marked valid.
+        self._crops.flush()
+        self._valid[filled] = 1
+        self._valid.flush()
+        return len(filled)
+
+
+def crop_and_resize(image: np.ndarray, bbox: Iterable[int], crop_size: tuple[int, int]) -> np.ndarray:
+    r""" Crop a bounding box from an image and resize it.
+
+    The box is clipped to the image. An empty box gives a black crop.
+
+    Arguments:
+        image (np.ndarray): Image of shape ``(height, width, 3)``.
+        bbox (Iterable[int]): ``[x_min, y_min, x_max, y_max]``.
+        crop_size (Tuple[int, int]): Height and width of the crop.
+
+    Returns:
+        np.ndarray: ``uint8`` crop of shape ``(*crop_size, 3)``.
+    """
+    height, width = image.shape[:2]
+    x_min, y_min, x_max, y_max = (int(value) for value in bbox)
+    x_min, x_max = max(x_min, 0), min(x_max, width)
+    y_min, y_max = max(y_min, 0), min(y_max, height)
+    if x_max <= x_min or y_max <= y_min:
+        return np.zeros((*crop_size, 3), dtype=np.uint8)
+    return cv2.resize(image[y_min:y_max, x_min:x_max], (crop_size[1], crop_size[0]), interpolation=cv2.INTER_AREA)
+
+
+_dataset: Optional[PlateCropDataset] = None
+
+
+def _init_worker(dataset: PlateCropDataset) -> None:
+    global _dataset
+    _dataset = dataset
+
+
+def _fill_shard_job(code: int) -> int:
+    return _dataset._fill_shard(code)
@@ -1,11 +1,204 @@
+import hashlib
 import logging
 import os
 import random
+import subprocess
+import threading
 import time
-from typing import List, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, NamedTuple, Optional, Union
+from urllib.parse import urlparse
 
 from icvlp.object import ICVLP, Video
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class DownloadResult(NamedTuple):
+    r"""Result of downloading a single video.
+
+    Args:
+        video_id (str): ID of the video.
+        path (str): Download path of the video.
+        status (str): ``'downloaded'``, ``'logged'`` (already in the downloaded videos log), ``'exists'``
+            (file already on disk), ``'unsupported'`` (no downloader for the URL) or ``'failed'``.
+        attempts (int): Number of download attempts.
+        error (str, optional): Error message of the last failed attempt.
+    """
+    video_id: str
+    path: str
+    status: str
+    attempts: int = 0
+    error: Optional[str] = None
+
+
+class LedgerEntry(NamedTuple):
+    r"""Record of a downloaded video in a :py:class:`DownloadLedger`.
+
+    Args:
+        path (str): Download path of the video.
+        size (int, optional): Size of the file in bytes. ``None`` for entries written by older versions.
+        sha256 (str, optional): SHA-256 hex digest of the file. ``None`` for entries written by older versions.
+    """
+    path: str
+    size: Optional[int] = None
+    sha256: Optional[str] = None
+
+
+class DownloadLedger:
+    r"""Log of downloaded videos, loaded once into memory.
+
+    Every line of the log file is ``path``, size and SHA-256 separated by tabs. Lines with only a path, as written
+    by older versions, are still read. Lookups are exact matches in a dictionary. Appends are serialized with a
+    thread lock and an exclusive file lock, and lines appended by other processes are merged before writing.
+
+    Args:
+        path (str): Log file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._entries: dict[str, LedgerEntry] = {}
+        self._offset = 0
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                self._read(f)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, path: str) -> Optional[LedgerEntry]:
+        return self._entries.get(path)
+
+    def is_partial(self, path: str, verify_checksum: bool = False) -> bool:
+        r"""Check whether a logged file on disk differs from what was logged.
+
+        Args:
+            path (str): Download path of the video.
+            verify_checksum (bool, optional): Also compare the SHA-256 of the file. Default: ``False``.
+
+        Returns:
+            bool: ``True`` if the file exists and its size (or checksum) does not match the log.
+        """
+        entry = self._entries.get(path)
+        if entry is None or entry.size is None or not os.path.exists(path):
+            return False
+        if os.path.getsize(path) != entry.size:
+            return True
+        return verify_checksum and entry.sha256 is not None and file_sha256(path) != entry.sha256
+
+    def add(self, path: str) -> LedgerEntry:
+        r"""Log a downloaded file with its size and checksum.
+
+        Args:
+            path (str): Download path of the video.
+
+        Returns:
+            LedgerEntry
+        """
+        entry = LedgerEntry(path, os.path.getsize(path), file_sha256(path))
+        with self._lock:
+            with open(self.path, 'a+b') as f:
+                _lock_file(f)
+                try:
+                    self._read(f)
+                    f.write(("\t".join([entry.path, str(entry.size), entry.sha256]) + "\n").encode('utf-8'))
+                    f.flush()
+                    self._offset = f.tell()
+                finally:
+                    _unlock_file(f)
+            self._entries[path] = entry
+        return entry
+
+    def _read(self, f) -> None:
+        r"""Read the lines appended since the last read from a binary file object."""
+        f.seek(self._offset)
+        while True:
+            line = f.readline()
+            # A line without newline is still being written by another process.
+            if not line.endswith(b"\n"):
+                break
+            self._offset += len(line)
+            fields = line.decode('utf-8').rstrip("\r\n").split("\t")
+            if not fields[0]:
+                continue
+            if len(fields) == 3:
+                entry = LedgerEntry(fields[0], int(fields[1]), fields[2])
+            else:
+                entry = LedgerEntry(fields[0])
+            self._entries[entry.path] = entry
+
+
+def file_sha256(path: str) -> str:
+    r"""Compute the SHA-256 hex digest of a file.
+
+    Args:
+        path (str): File path.
+
+    Returns:
+        str
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _lock_file(f) -> None:
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+
+def _unlock_file(f) -> None:
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class TokenBucket:
+    r"""Thread-safe token bucket rate limiter.
+
+    Tokens are added at ``rate`` per second up to ``capacity``. :py:meth:`acquire` blocks until a token is
+    available.
+
+    Args:
+        rate (float): Tokens added per second.
+        capacity (float, optional): Maximum number of tokens, i.e. the allowed burst. Default: ``1``.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        if rate <= 0:
+            raise ValueError(f"rate must be positive. Got {rate}.")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        r"""Take one token, waiting until one is available.
+
+        Returns:
+            None
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
 
 class VideoDownloader:
     r"""Video downloader for ICVLP dataset.
@@ -14,8 +207,11 @@ class VideoDownloader:
     instances.
 
         >>> icvlp = ICVLP.from_json('icvlp_v0.1.json')
-        >>> downloader = VideoDownloader(videos=icvlp)
-        >>> downloader.downloads()
+        >>> downloader = VideoDownloader(videos=icvlp, workers=4)
+        >>> results = downloader.downloads()
+
+    Videos are downloaded by a pool of ``workers`` threads. Requests to the same host are limited to
+    ``rate_limit`` per second by a token bucket, and failed downloads are retried with exponential backoff.
 
     Args:
         videos (ICVLP, List[Video]): List of videos to download.
@@ -23,17 +219,36 @@ class VideoDownloader:
         youtube_downloader (str, optional): YouTube downloader used to download YouTube video:
             ``'yt-dlp'`` | ``'youtube-dl'``.
             Default: ``'yt-dlp'``.
-        downloaded_videos_log (str, optional): File to log which videos has ever downloaded.
-            Default: ``'downloaded_videos.txt'``
+        downloaded_videos_log (str, optional): File to log which videos has ever downloaded, see
+            :py:class:`DownloadLedger`. Default: ``'downloaded_videos.txt'``
+        workers (int, optional): Number of concurrent downloads. Default: ``1``.
+        rate_limit (float, optional): Maximum downloads started per second for each host. Default: ``1.0``.
+        burst (int, optional): Number of downloads that may start at once for each host. Default: ``1``.
+        retries (int, optional): Number of retries of a failed download. Default: ``3``.
+        backoff (float, optional): Delay in seconds before the first retry. It doubles with every retry and is
+            jittered. Default: ``1.0``.
+        download_fn (Callable[[str, str], None], optional): Function called with ``(url, download_path)`` that
+            downloads a video and raises on failure. Default: download YouTube videos with ``youtube_downloader``.
+        verify_checksum (bool, optional): Compare the SHA-256 of logged files, not only their size, to detect
+            partial downloads. Default: ``False``.
     """
 
     def __init__(self,
                  videos: Union[ICVLP, List[Video]],
                  directory: str = "videos",
                  youtube_downloader: str = "yt-dlp",
-                 downloaded_videos_log: str = "downloaded_videos.txt") -> None:
+                 downloaded_videos_log: str = "downloaded_videos.txt",
+                 workers: int = 1,
+                 rate_limit: float = 1.0,
+                 burst: int = 1,
+                 retries: int = 3,
+                 backoff: float = 1.0,
+                 download_fn: Optional[Callable[[str, str], None]] = None,
+                 verify_checksum: bool = False) -> None:
         self.youtube_downloader = youtube_downloader
         self.downloaded_videos_log = downloaded_videos_log
+        self.ledger = DownloadLedger(downloaded_videos_log)
+        self.verify_checksum = verify_checksum
 
         if isinstance(videos, Video):
             videos = [videos]
@@ -43,28 +258,45 @@ class VideoDownloader:
 
         self.directory = directory
 
+        self.workers = workers
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.download_fn = download_fn
+
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._youtube_downloader_checked = False
+
     def __getitem__(self, index: int) -> Video:
         return self.videos[index]
 
-    def download(self, index: int) -> None:
+    def download(self, index: int) -> DownloadResult:
         r"""Download a video from ``videos`` attribute.
 
         Args:
             index (int): The index of the video to download.
 
         Returns:
-            None
+            DownloadResult
         """
-        self._download_video(index)
+        return self._download_video(index)
 
-    def downloads(self) -> None:
+    def downloads(self, workers: Optional[int] = None) -> List[DownloadResult]:
         r"""Download all videos from ``videos`` attribute.
 
+        Args:
+            workers (int, optional): Number of concurrent downloads. Default: ``workers`` attribute.
+
         Returns:
-            None
+            List[DownloadResult]: Result of every video, in the order of ``videos``.
         """
-        for video in self.videos:
-            self._download_video(video)
+        workers = workers or self.workers
+        if workers <= 1:
+            return [self._download_video(video) for video in self.videos]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="VideoDownloader") as executor:
+            return list(executor.map(self._download_video, self.videos))
 
     def _check_youtube_dl_version(self) -> None:
         r"""Check and assert YouTube downloader version.
@@ -77,14 +309,31 @@ class VideoDownloader:
         version = os.popen(f'{self.youtube_downloader} --version').read()
         assert version, f"{self.youtube_downloader} cannot be found in PATH. Please verify your installation."
 
-    def _download_video(self, index: Union[Video, int]) -> None:
+    def _bucket(self, url: str) -> TokenBucket:
+        r"""Get the rate limiter of the host of ``url``.
+
+        Args:
+            url (str): The url to download.
+
+        Returns:
+            TokenBucket
+        """
+        host = urlparse(url).netloc.lower().removeprefix("www.")
+        if host in ("youtu.be", "m.youtube.com"):
+            host = "youtube.com"
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate_limit, self.burst)
+            return self._buckets[host]
+
+    def _download_video(self, index: Union[Video, int]) -> DownloadResult:
         r"""Download a video from ``videos`` attribute.
 
         Args:
             index (Video or int): The index of the video to download.
 
         Returns:
-            None
+            DownloadResult
         """
         if isinstance(index, int):
             video = self[index]
@@ -95,33 +344,70 @@ class VideoDownloader:
         filename = video_id + ".mp4"
         download_path = os.path.join(self.directory, filename)
 
-        if not os.path.exists(self.downloaded_videos_log):
-            with open(self.downloaded_videos_log, 'w') as logfile:
-                logfile.write("")
-                logfile.close()
-
-        with open(self.downloaded_videos_log, 'r') as logfile:
-            if f"{download_path}" in logfile.read():
+        if download_path in self.ledger:
+            if not self.ledger.is_partial(download_path, self.verify_checksum):
                 logging.info(
                     f"Video {download_path} already logged to '{self.downloaded_videos_log}'. "
                     f"Remove the line in the file to download again."
                 )
-                return
+                return DownloadResult(video_id, download_path, "logged")
+            logging.warning(f"Video {download_path} does not match '{self.downloaded_videos_log}'. Downloading again.")
+            os.remove(download_path)
 
         if os.path.exists(download_path):
             logging.info(f'YouTube video {download_path} is already exists.')
+            result = DownloadResult(video_id, download_path, "exists")
         else:
             url = video.url
             logging.info(f"Downloading video to {download_path} from URL {url}")
-            if 'youtube' in url or 'youtu.be' in url:
-                self._check_youtube_dl_version()
-                self._download_youtube_video(url, download_path)
+            if self.download_fn is not None:
+                result = self._download_with_retries(video, download_path, self.download_fn)
+            elif 'youtube' in url or 'youtu.be' in url:
+                with self._lock:
+                    if not self._youtube_downloader_checked:
+                        self._check_youtube_dl_version()
+                        self._youtube_downloader_checked = True
+                result = self._download_with_retries(video, download_path, self._download_youtube_video)
             else:
                 logging.error(f"Downloader not implemented for URL {url}")
+                return DownloadResult(video_id, download_path, "unsupported")
 
+        if result.status == "failed":
+            return result
         logging.debug(f"Adding {download_path} to {self.downloaded_videos_log}")
-        with open(self.downloaded_videos_log, 'a') as f:
-            f.write(f"{download_path}\n")
+        self.ledger.add(download_path)
+        return result
+
+    def _download_with_retries(self,
+                               video: Video,
+                               download_path: str,
+                               download_fn: Callable[[str, str], None]) -> DownloadResult:
+        r"""Download a video, retrying with exponential backoff.
+
+        Args:
+            video (Video): The video to download.
+            download_path (str): The path to save the video to.
+            download_fn (Callable[[str, str], None]): Function that downloads ``url`` to ``download_path``.
+
+        Returns:
+            DownloadResult
+        """
+        bucket = self._bucket(video.url)
+        error = None
+        for attempt in range(1, self.retries + 2):
+            bucket.acquire()
+            try:
+                download_fn(video.url, download_path)
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                logging.warning(f"Attempt {attempt} to download {video.url} failed: {error}")
+                if attempt <= self.retries:
+                    delay = self.backoff * 2 ** (attempt - 1)
+                    time.sleep(random.uniform(delay / 2, delay))
+                continue
+            return DownloadResult(video.video_id, download_path, "downloaded", attempt)
+        logging.error(f'Unsuccessful downloading video URL {video.url}')
+        return DownloadResult(video.video_id, download_path, "failed", self.retries + 1, error)
 
     def _download_youtube_video(self, url: str, download_path: str) -> None:
         r"""Download a YouTube video and save it to download path using instance's YouTube downloader.
@@ -136,16 +422,13 @@ class VideoDownloader:
         cmd = [
             self.youtube_downloader,
             url,
-            f"-o {download_path}",
-            "-f 248/mp4"
+            "-o", download_path,
+            "-f", "248/mp4"
         ]
-        cmd = ' '.join(cmd)
 
-        rv = os.system(cmd)
+        rv = subprocess.run(cmd, stdout=subprocess.DEVNULL).returncode
 
         if not rv:
             logging.info(f'Finish downloading YouTube video URL {url}')
         else:
-            logging.error(f'Unsuccessful downloading YouTube video URL {url}')
-        # Reduce the download frequency, avoid spam
-        time.sleep(random.uniform(0.5, 1.0))
+            raise RuntimeError(f"{self.youtube_downloader} exited with status {rv}")
@@ -0,0 +1,398 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, Mapping, NamedTuple, Optional, Union
+from xml.sax.saxutils import escape
+
+from icvlp.journal import write_atomic
+from icvlp.object import ICVLP, Frame, Plate, Video
+from icvlp.video import VideoReaderPool
+
+FORMATS = ["voc", "yolo", "coco"]
+
+MANIFEST_FILENAME = ".icvlp-export.json"
+
+ImageSize = Union[tuple[int, int], Mapping[str, tuple[int, int]], VideoReaderPool]
+
+
+class ExportReport(NamedTuple):
+    r""" Summary of :py:func:`export`.
+
+    Arguments:
+        files (int): Number of files the export consists of.
+        written (int): Number of files written because they are new or changed.
+        unchanged (int): Number of files skipped because their content did not change.
+        removed (int): Number of files of a previous export that are no longer part of the dataset.
+        seconds (float): Time taken.
+    """
+    files: int
+    written: int
+    unchanged: int
+    removed: int
+    seconds: float
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return (f"Exported {self.files} files in {self.seconds:.2f} s ({self.files_per_second:.0f} files/s): "
+                f"{self.written} written, {self.unchanged} unchanged, {self.removed} removed.")
+
+
+class Annotation(NamedTuple):
+    r""" The bounding boxes of a frame, as exported to one file.
+
+    Plates of a video may share a label, so their frames may share a file name; their boxes are then objects of the
+    same annotation.
+
+    Arguments:
+        name (str): File name of the frame without extension, ``<video_id>_<frame>_<label>``.
+        video (Video): The video.
+        width (int): Image width in pixels.
+        height (int): Image height in pixels.
+        objects (List[Tuple[Plate, Frame]]): The plate and frame of every bounding box, without repeated boxes.
+    """
+    name: str
+    video: Video
+    width: int
+    height: int
+    objects: list[tuple[Plate, Frame]]
+
+
+def object_name(plate: Plate) -> str:
+    r""" Object class of a plate, ``plate-<vehicle_type>``. """
+    return f"plate-{plate.vehicle_type}"
+
+
+def iter_annotations(dataset: ICVLP, image_size: ImageSize) -> Iterator[Annotation]:
+    r""" Iterate over the frames of the dataset that have a bounding box, one annotation per file name.
+
+    Frames of plates with the same label in a video are merged into one annotation per frame number. Boxes of the
+    same class and coordinates are kept once.
+
+    Arguments:
+        dataset (ICVLP): The dataset.
+        image_size (Tuple[int, int], Mapping[str, Tuple[int, int]] or VideoReaderPool): ``(width, height)`` of the
+            frames, a mapping of ``video_id`` to it, or a pool of the video files to read it from. Videos missing
+            from the mapping or the pool are skipped.
+
+    Yields:
+        Annotation
+    """
+    for video in dataset.videos:
+        size = _image_size(image_size, video.video_id)
+        if size is None:
+            continue
+        width, height = size
+        # File names start with the video ID, so they can only repeat within a video.
+        annotations: dict[str, Annotation] = {}
+        for plate in video.plates:
+            for frame in plate.frames:
+                if frame.bbox is None:
+                    continue
+                name = f"{video.video_id}_{frame.frame}_{plate.label}"
+                annotation = annotations.get(name)
+                if annotation is None:
+                    annotations[name] = Annotation(name, video, width, height, [(plate, frame)])
+                elif not any(object_name(other) == object_name(plate) and other_frame.bbox == frame.bbox
+                             for other, other_frame in annotation.objects):
+                    annotation.objects.append((plate, frame))
+        yield from annotations.values()
+
+
+def _image_size(image_size: ImageSize, video_id: str) -> Optional[tuple[int, int]]:
+    if isinstance(image_size, VideoReaderPool):
+        if video_id not in image_size:
+            return None
+        metadata = image_size.metadata(video_id)
+        return metadata.width, metadata.height
+    if isinstance(image_size, Mapping):
+        return image_size.get(video_id)
+    return image_size
+
+
+def voc_annotation(image_filename: str, width: int, height: int, object_name: str, bbox: list, depth: int = 3) -> str:
+    r""" Format a Pascal VOC annotation with a single object.
+
+    Arguments:
+        image_filename (str): File name of the image.
+        width (int): Image width in pixels.
+        height (int): Image height in pixels.
+        object_name (str): Class of the object, e.g. ``'plate-bus'``.
+        bbox (list): ``[x_min, y_min, x_max, y_max]``.
+        depth (int, optional): Number of channels of the image. Default: ``3``.
+
+    Returns:
+        str
+    """
+    return voc_annotation_objects(image_filename, width, height, [(object_name, bbox)], depth=depth)
+
+
+def voc_annotation_objects(image_filename: str,
+                           width: int,
+                           height: int,
+                           objects: Iterable[tuple[str, list]],
+                           depth: int = 3) -> str:
+    r""" Format a Pascal VOC annotation with any number of objects.
+
+    Arguments:
+        image_filename (str): File name of the image.
+        width (int): Image width in pixels.
+        height (int): Image height in pixels.
+        objects (Iterable[Tuple[str, list]]): Class and ``[x_min, y_min, x_max, y_max]`` of every object.
+        depth (int, optional): Number of channels of the image. Default: ``3``.
+
+    Returns:
+        str
+    """
+    return f"""<annotation>
+    <folder>frames</folder>
+    <filename>{escape(image_filename)}</filename>
+    <size>
+        <width>{width}</width>
+        <height>{height}</height>
+        <depth>{depth}</depth>
+    </size>
+""" + "".join(_voc_object(name, bbox) for name, bbox in objects) + "</annotation>\n"
+
+
+def _voc_object(object_name: str, bbox: list) -> str:
+    x_min, y_min, x_max, y_max = bbox
+    return f"""    <object>
+        <name>{escape(object_name)}</name>
+        <pose>Unspecified</pose>
+        <truncated>0</truncated>
+        <occluded>0</occluded>
+        <difficult>0</difficult>
+        <bndbox>
+            <xmin>{x_min}</xmin>
+            <ymin>{y_min}</ymin>
+            <xmax>{x_max}</xmax>
+            <ymax>{y_max}</ymax>
+        </bndbox>
+    </object>
+"""
+
+
+def yolo_annotation(class_id: int, width: int, height: int, bbox: list) -> str:
+    r""" Format a YOLO annotation line: class and box center and size, normalized by the image size.
+
+    Arguments:
+        class_id (int): Index of the class.
+        width (int): Image width in pixels.
+        height (int): Image height in pixels.
+        bbox (list): ``[x_min, y_min, x_max, y_max]``.
+
+    Returns:
+        str
+    """
+    x_min, y_min, x_max, y_max = bbox
+    return (f"{class_id} {(x_min + x_max) / 2 / width:.6f} {(y_min + y_max) / 2 / height:.6f} "
+            f"{(x_max - x_min) / width:.6f} {(y_max - y_min) / height:.6f}\n")
+
+
+def class_names(dataset: ICVLP) -> list[str]:
+    r""" Object classes of the dataset, ``plate-<vehicle_type>`` sorted by name.
+
+    Arguments:
+        dataset (ICVLP): The dataset.
+
+    Returns:
+        List[str]
+    """
+    return sorted({object_name(plate) for video in dataset.videos for plate in video.plates})
+
+
+def export(dataset: ICVLP,
+           output_dir: str,
+           image_size: ImageSize,
+           annotation_format: str = "voc",
+           image_extension: str = "jpeg",
+           workers: int = 4,
+           chunksize: int = 256) -> ExportReport:
+    r""" Export the bounding boxes of the dataset into a training format.
+
+    ``'voc'`` writes one ``<video_id>_<frame>_<label>.xml`` per frame, ``'yolo'`` one ``.txt`` per frame and the
+    class names to ``classes.txt``, and ``'coco'`` a single ``annotations.json``. Plates of a video with the same
+    label share these file names, so their boxes of a frame are written as objects of one file, see
+    :py:func:`iter_annotations`. Annotations are generated lazily and written in chunks on a pool of threads.
+
+    The dataset does not record the resolution of the videos, so ``image_size`` is required to normalize YOLO
+    boxes and to fill in the image size of VOC and COCO annotations. Pass a
+    :py:class:`icvlp.video.VideoReaderPool` to read it from the video files, or from their metadata sidecar.
+
+    The SHA-1 of every file is recorded in ``.icvlp-export.json`` in ``output_dir``. On the next export, files
+    whose content has the same hash are not written again, and files of the previous export that are no longer
+    part of the dataset are removed, so re-exporting only touches what changed.
+
+        >>> with VideoReaderPool('videos') as pool:
+        ...     export(ICVLP.from_json('icvlp_v0.1.json'), 'annotations', pool, annotation_format='yolo')
+
+    Arguments:
+        dataset (ICVLP): The dataset.
+        output_dir (str): Output directory, created if missing.
+        image_size (Tuple[int, int], Mapping[str, Tuple[int, int]] or VideoReaderPool): ``(width, height)`` of the
+            frames, a mapping of ``video_id`` to it, or a pool of the video files to read it from. Videos missing
+            from the mapping or the pool are skipped.
+        annotation_format (str, optional): ``'voc'``, ``'yolo'`` or ``'coco'``. Default: ``'voc'``.
+        image_extension (str, optional): Extension of the extracted frames. Default: ``'jpeg'``.
+        workers (int, optional): Number of writer threads. Default: ``4``.
+        chunksize (int, optional): Number of files written by a thread at a time. Default: ``256``.
+
+    Returns:
+        ExportReport
+    """
+    if annotation_format not in FORMATS:
+        raise ValueError(f"annotation_format must be one of {FORMATS}. Got {annotation_format}.")
+    start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    previous = _read_manifest(output_dir)
+
+    if annotation_format == "voc":
+        files = ((annotation.name + ".xml",
+                  voc_annotation_objects(f"{annotation.name}.{image_extension}", annotation.width, annotation.height,
+                                         [(object_name(plate), frame.bbox) for plate, frame in annotation.objects]))
+                 for annotation in iter_annotations(dataset, image_size))
+    elif annotation_format == "yolo":
+        classes = class_names(dataset)
+        class_ids = {name: i for i, name in enumerate(classes)}
+        files = _chain([("classes.txt", "".join(name + "\n" for name in classes))],
+                       ((annotation.name + ".txt",
+                         "".join(yolo_annotation(class_ids[object_name(plate)], annotation.width, annotation.height,
+                                                 frame.bbox)
+                                 for plate, frame in annotation.objects))
+                        for annotation in iter_annotations(dataset, image_size)))
+    else:
+        files = [("annotations.json", _coco_chunks(dataset, image_size, image_extension))]
+
+    manifest: dict[str, str] = {}
+    written = unchanged = 0
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        pending = set()
+        for chunk in _chunks(files, chunksize):
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                written, unchanged = _collect(done, manifest, written, unchanged)
+            pending.add(executor.submit(_write_chunk, output_dir, chunk, previous))
+        written, unchanged = _collect(pending, manifest, written, unchanged)
+
+    removed = 0
+    for filename in previous.keys() - manifest.keys():
+        path = os.path.join(output_dir, filename)
+        if os.path.exists(path):
+            os.remove(path)
+            removed += 1
+    if written or removed or manifest != previous:
+        write_atomic(os.path.join(output_dir, MANIFEST_FILENAME), json.dumps(manifest, sort_keys=True))
+
+    return ExportReport(files=len(manifest), written=written, unchanged=unchanged, removed=removed,
+                        seconds=time.perf_counter() - start)
+
+
+def _coco_chunks(dataset: ICVLP, image_size: ImageSize, image_extension: str) -> Iterator[str]:
+    # Images and annotations are separate arrays, so the dataset is walked twice instead of holding either in memory.
+    categories = [{"id": i + 1, "name": name, "supercategory": "plate"} for i, name in enumerate(class_names(dataset))]
+    category_ids = {category["name"]: category["id"] for category in categories}
+    yield '{"images": ['
+    for i, annotation in enumerate(iter_annotations(dataset, image_size), start=1):
+        yield ("" if i == 1 else ",") + "\n" + json.dumps({
+            "id": i, "file_name": f"{annotation.name}.{image_extension}",
+            "width": annotation.width, "height": annotation.height,
+            "video_id": annotation.video.video_id, "frame": annotation.objects[0][1].frame,
+        })
+    yield '],\n"annotations": ['
+    annotation_id = 0
+    for image_id, annotation in enumerate(iter_annotations(dataset, image_size), start=1):
+        for plate, frame in annotation.objects:
+            annotation_id += 1
+            x_min, y_min, x_max, y_max = frame.bbox
+            width, height = x_max - x_min, y_max - y_min
+            yield ("" if annotation_id == 1 else ",") + "\n" + json.dumps({
+                "id": annotation_id, "image_id": image_id, "category_id": category_ids[object_name(plate)],
+                "bbox": [x_min, y_min, width, height], "area": width * height, "iscrowd": 0,
+                "label": plate.label,
+            })
+    yield '],\n"categories": ' + json.dumps(categories) + "}\n"
+
+
+def _chain(*iterables: Iterable) -> Iterator:
+    for iterable in iterables:
+        yield from iterable
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _collect(futures, manifest: dict[str, str], written: int, unchanged: int) -> tuple[int, int]:
+    for future in futures:
+        hashes, chunk_written = future.result()
+        manifest.update(hashes)
+        written += chunk_written
+        unchanged += len(hashes) - chunk_written
+    return written, unchanged
+
+
+def _write_chunk(output_dir: str,
+                 chunk: list[tuple[str, Union[str, Iterable[str]]]],
+                 previous: dict[str, str]) -> tuple[dict, int]:
+    hashes = {}
+    written = 0
+    for filename, content in chunk:
+        path = os.path.join(output_dir, filename)
+        if isinstance(content, str):
+            data = content.encode('utf-8')
+            digest = hashlib.sha1(data).hexdigest()
+            if previous.get(filename) != digest or not os.path.exists(path):
+                with open(path, 'wb', buffering=max(len(data), 1)) as f:
+                    f.write(data)
+                written += 1
+        else:
+            digest = _write_stream(path, content, previous.get(filename))
+            written += digest != previous.get(filename)
+        hashes[filename] = digest
+    return hashes, written
+
+
+def _write_stream(path: str, content: Iterable[str], previous_digest: Optional[str]) -> str:
+    # The hash is only known at the end, so the file is streamed to a temporary file that replaces ``path`` if the
+    # content changed.
+    sha1 = hashlib.sha1()
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'wb', buffering=2 ** 20) as f:
+            for text in content:
+                data = text.encode('utf-8')
+                sha1.update(data)
+                f.write(data)
+        digest = sha1.hexdigest()
+        if digest == previous_digest and os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+        return digest
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _read_manifest(output_dir: str) -> dict[str, str]:
+    path = os.path.join(output_dir, MANIFEST_FILENAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except ValueError:
+        return {}
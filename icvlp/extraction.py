@@ -0,0 +1,343 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+from icvlp.object import Video
+from icvlp.video import read_frames
+
+
+IMAGE_FORMATS = {
+    "jpeg": cv2.IMWRITE_JPEG_QUALITY,
+    "png": cv2.IMWRITE_PNG_COMPRESSION,
+    "webp": cv2.IMWRITE_WEBP_QUALITY,
+}
+
+
+class ThroughputCounters:
+    r""" Per-stage counters of frame extraction.
+
+    ``decode_seconds`` is the time spent decoding, ``encode_seconds`` the time spent encoding and writing images
+    summed over writer threads, and ``wait_seconds`` the time the decoder waited for room in the writer queue. A
+    large ``wait_seconds`` means encoding is the bottleneck; a writer queue that is mostly empty means decoding is.
+    """
+
+    def __init__(self) -> None:
+        self.decoded_frames: int = 0
+        self.decode_seconds: float = 0.0
+        self.encoded_frames: int = 0
+        self.encode_seconds: float = 0.0
+        self.written_images: int = 0
+        self.written_bytes: int = 0
+        self.wait_seconds: float = 0.0
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def merge(self, other: "ThroughputCounters") -> "ThroughputCounters":
+        with self._lock:
+            for name, value in other.__getstate__().items():
+                setattr(self, name, getattr(self, name) + value)
+        return self
+
+    def as_dict(self) -> dict:
+        return self.__getstate__()
+
+    def __str__(self) -> str:
+        decode_rate = self.decoded_frames / self.decode_seconds if self.decode_seconds else 0.0
+        encode_rate = self.encoded_frames / self.encode_seconds if self.encode_seconds else 0.0
+        return (f"decode {self.decoded_frames} frames in {self.decode_seconds:.2f} s ({decode_rate:.1f} frames/s), "
+                f"encode {self.encoded_frames} frames in {self.encode_seconds:.2f} s thread time "
+                f"({encode_rate:.1f} frames/s per thread), "
+                f"wrote {self.written_images} images ({self.written_bytes / 2 ** 20:.1f} MiB), "
+                f"decoder waited {self.wait_seconds:.2f} s")
+
+
+class FrameWriter:
+    r""" Encode and write images on a pool of threads.
+
+    Images are passed through a bounded queue, so :py:meth:`write` blocks when the writers fall behind and memory
+    stays bounded at about ``queue_size`` decoded frames. ``cv2.imencode`` releases the GIL, so threads encode in
+    parallel with decoding.
+
+        >>> with FrameWriter(image_format='webp', quality=90) as writer:
+        ...     writer.write(['frame.webp'], image)
+
+    Arguments:
+        threads (int, optional): Number of encoder/writer threads. Default: ``2``.
+        queue_size (int, optional): Maximum number of queued images. Default: ``4 * threads``.
+        image_format (str, optional): ``'jpeg'``, ``'png'`` or ``'webp'``. Default: ``'jpeg'``.
+        quality (int, optional): JPEG or WebP quality (0-100), or PNG compression level (0-9). Default: OpenCV's
+            default.
+        counters (ThroughputCounters, optional): Counters to update.
+        on_written (Callable[[int], None], optional): Called from writer threads with the number of images written.
+    """
+
+    def __init__(self,
+                 threads: int = 2,
+                 queue_size: Optional[int] = None,
+                 image_format: str = "jpeg",
+                 quality: Optional[int] = None,
+                 counters: Optional[ThroughputCounters] = None,
+                 on_written: Optional[Callable[[int], None]] = None) -> None:
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"image_format must be one of {list(IMAGE_FORMATS)}. Got {image_format}.")
+        self.extension: str = "." + image_format
+        self.params: list[int] = [] if quality is None else [IMAGE_FORMATS[image_format], int(quality)]
+        self.counters: ThroughputCounters = counters if counters is not None else ThroughputCounters()
+        self.on_written = on_written
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size or 4 * threads)
+        self._errors: list[BaseException] = []
+        self._threads = [threading.Thread(target=self._run, name=f"FrameWriter-{i}", daemon=True)
+                         for i in range(threads)]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self) -> "FrameWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def write(self, paths: list[str], image: np.ndarray) -> None:
+        r""" Queue an image to be encoded once and written to every path in ``paths``.
+
+        Arguments:
+            paths (List[str]): Output paths.
+            image (np.ndarray): Image to write.
+        """
+        self._raise_errors()
+        start = time.perf_counter()
+        self._queue.put((paths, image))
+        waited = time.perf_counter() - start
+        with self.counters._lock:
+            self.counters.wait_seconds += waited
+
+    def close(self) -> None:
+        r""" Wait until every queued image is written and stop the threads. """
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._raise_errors()
+
+    def _raise_errors(self) -> None:
+        if self._errors:
+            raise self._errors[0]
+
+    def _run(self) -> None:
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            paths, image = task
+            try:
+                start = time.perf_counter()
+                ok, encoded = cv2.imencode(self.extension, image, self.params)
+                if not ok:
+                    raise ValueError(f"Could not encode image for {paths}.")
+                data = encoded.tobytes()
+                for path in paths:
+                    with open(path, 'wb') as f:
+                        f.write(data)
+                elapsed = time.perf_counter() - start
+            except BaseException as e:
+                self._errors.append(e)
+                continue
+            with self.counters._lock:
+                self.counters.encoded_frames += 1
+                self.counters.encode_seconds += elapsed
+                self.counters.written_images += len(paths)
+                self.counters.written_bytes += len(data) * len(paths)
+            if self.on_written is not None:
+                self.on_written(len(paths))
+
+
+def plan_frames(video: Video,
+                step: int,
+                extract_path: str,
+                skip_existing: bool = True,
+                image_format: str = "jpeg") -> dict[int, list[str]]:
+    r""" Plan which frames of a video to extract and where to write them.
+
+    The frames ``frame_start, frame_start + step, ..., frame_end`` of every plate are merged into one mapping, so a
+    frame shared by several plates is decoded once and written once per plate.
+
+    Arguments:
+        video (Video): The video.
+        step (int): Number of video frames between extracted frames.
+        extract_path (str): Directory of the extracted images.
+        skip_existing (bool, optional): Leave out images that already exist. Default: ``True``.
+        image_format (str, optional): Extension of the image files. Default: ``'jpeg'``.
+
+    Returns:
+        Dict[int, List[str]]: Image paths to write for every frame number, sorted by frame number.
+    """
+    plan: dict[int, list[str]] = {}
+    for plate in video.plates:
+        for frame_number in range(plate.frame_start, plate.frame_end + 1, step):
+            frame_filename = f"{video.video_id}_{frame_number}_{plate.label}.{image_format}"
+            frame_path = os.path.join(extract_path, frame_filename)
+            if skip_existing and os.path.exists(frame_path):
+                continue
+            plan.setdefault(frame_number, []).append(frame_path)
+    return dict(sorted(plan.items()))
+
+
+def extract_video(video: Video,
+                  video_filename: str,
+                  extract_path: str,
+                  progress: Optional[Callable[[int], None]] = None,
+                  image_format: str = "jpeg",
+                  quality: Optional[int] = None,
+                  writer_threads: int = 2,
+                  counters: Optional[ThroughputCounters] = None) -> int:
+    r""" Extract the frames of every plate of a video in one decode pass.
+
+    Decoded frames are handed to a :py:class:`FrameWriter`, so decoding continues while earlier frames are encoded
+    and written.
+
+    Arguments:
+        video (Video): The video.
+        video_filename (str): Path of the video file.
+        extract_path (str): Directory of the extracted images.
+        progress (Callable[[int], None], optional): Called with the number of images written, from writer threads.
+        image_format (str, optional): ``'jpeg'``, ``'png'`` or ``'webp'``. Default: ``'jpeg'``.
+        quality (int, optional): Encoding quality, see :py:class:`FrameWriter`. Default: OpenCV's default.
+        writer_threads (int, optional): Number of encoder/writer threads. Default: ``2``.
+        counters (ThroughputCounters, optional): Counters to update.
+
+    Returns:
+        int: Number of images written.
+    """
+    counters = counters if counters is not None else ThroughputCounters()
+    cap = cv2.VideoCapture(video_filename)
+    try:
+        video_fps: float = cap.get(cv2.CAP_PROP_FPS)
+        step: int = int(video_fps // video.fps)
+        plan = plan_frames(video, step, extract_path, image_format=image_format)
+        written = 0
+        with FrameWriter(writer_threads, image_format=image_format, quality=quality, counters=counters,
+                         on_written=progress) as writer:
+            frames = read_frames(cap, plan)
+            while True:
+                start = time.perf_counter()
+                frame_number, frame = next(frames, (None, None))
+                counters.decode_seconds += time.perf_counter() - start
+                if frame_number is None:
+                    break
+                counters.decoded_frames += 1
+                writer.write(plan[frame_number], frame)
+                written += len(plan[frame_number])
+        return written
+    finally:
+        cap.release()
+
+
+def extract_videos(jobs: list[tuple[Video, str]],
+                   extract_path: str,
+                   workers: int = 1,
+                   on_images: Optional[Callable[[int], None]] = None,
+                   on_video: Optional[Callable[[Video, int], None]] = None,
+                   image_format: str = "jpeg",
+                   quality: Optional[int] = None,
+                   writer_threads: int = 2,
+                   counters: Optional[ThroughputCounters] = None) -> int:
+    r""" Extract the frames of several videos, optionally in a pool of processes.
+
+    Every video is extracted by :py:func:`extract_video` in one process. Image names depend only on the dataset,
+    so the output is the same for any number of workers.
+
+    Arguments:
+        jobs (List[Tuple[Video, str]]): Videos and the paths of their video files.
+        extract_path (str): Directory of the extracted images.
+        workers (int, optional): Number of worker processes. ``1`` extracts in the calling process.
+            Default: ``1``.
+        on_images (Callable[[int], None], optional): Called in the calling process with the number of images
+            written as extraction progresses.
+        on_video (Callable[[Video, int], None], optional): Called in the calling process with every finished video
+            and the number of images written for it.
+        image_format (str, optional): ``'jpeg'``, ``'png'`` or ``'webp'``. Default: ``'jpeg'``.
+        quality (int, optional): Encoding quality, see :py:class:`FrameWriter`. Default: OpenCV's default.
+        writer_threads (int, optional): Number of encoder/writer threads per video. Default: ``2``.
+        counters (ThroughputCounters, optional): Counters to update with the totals of all videos.
+
+    Returns:
+        int: Number of images written.
+    """
+    counters = counters if counters is not None else ThroughputCounters()
+    options = dict(image_format=image_format, quality=quality, writer_threads=writer_threads)
+    if workers <= 1:
+        written = 0
+        for video, video_filename in jobs:
+            count = extract_video(video, video_filename, extract_path, on_images, counters=counters, **options)
+            written += count
+            if on_video is not None:
+                on_video(video, count)
+        return written
+
+    progress = multiprocessing.Queue()
+    reported = 0
+
+    def report(block: bool = False) -> bool:
+        nonlocal reported
+        try:
+            count = progress.get(timeout=1.0) if block else progress.get_nowait()
+        except queue.Empty:
+            return False
+        reported += count
+        if on_images is not None:
+            on_images(count)
+        return True
+
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(progress,)) as executor:
+        futures = {executor.submit(_extract_video_job, video, video_filename, extract_path, options): video
+                   for video, video_filename in jobs}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            while report():
+                pass
+            for future in done:
+                count, video_counters = future.result()
+                counters.merge(video_counters)
+                written += count
+                if on_video is not None:
+                    on_video(futures[future], count)
+    # Progress messages can arrive after the result of their video.
+    while reported < written and report(block=True):
+        pass
+    return written
+
+
+_progress: Optional[multiprocessing.Queue] = None
+
+
+def _init_worker(progress: multiprocessing.Queue) -> None:
+    global _progress
+    _progress = progress
+
+
+def _extract_video_job(video: Video,
+                       video_filename: str,
+                       extract_path: str,
+                       options: dict) -> tuple[int, ThroughputCounters]:
+    counters = ThroughputCounters()
+    count = extract_video(video, video_filename, extract_path, _progress.put, counters=counters, **options)
+    return count, counters
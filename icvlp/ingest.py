@@ -0,0 +1,166 @@
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, NamedTuple, Optional
+
+from icvlp.object import ICVLP, Frame, InvalidFramesError, Plate, Video
+
+_OBJECT_BNDBOX = re.compile(rb'<object\b.*?<bndbox\s*>(.*?)</bndbox\s*>', re.DOTALL)
+_COORDINATES = {name: re.compile(rb'<' + name + rb'\s*>\s*([^<]*?)\s*</' + name + rb'\s*>')
+                for name in [b'xmin', b'ymin', b'xmax', b'ymax']}
+
+
+class IngestReport(NamedTuple):
+    r""" Summary of :py:func:`ingest_annotations`.
+
+    Arguments:
+        candidates (int): Number of annotation files looked up.
+        files (int): Number of annotation files found and parsed.
+        frames (int): Number of frames added to the dataset.
+        empty (int): Number of annotation files without a bounding box.
+        seconds (float): Time taken, including listing the directory.
+    """
+    candidates: int
+    files: int
+    frames: int
+    empty: int
+    seconds: float
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return (f"Parsed {self.files} of {self.candidates} annotation files in {self.seconds:.2f} s "
+                f"({self.files_per_second:.0f} files/s): {self.frames} frames added, {self.empty} without a box.")
+
+
+def index_annotations(annotations_dir: str, extension: str = ".xml") -> set[str]:
+    r""" List the annotation files of a directory once.
+
+    Arguments:
+        annotations_dir (str): The directory.
+        extension (str, optional): Extension of the annotation files. Default: ``'.xml'``.
+
+    Returns:
+        Set[str]: File names.
+    """
+    with os.scandir(annotations_dir) as entries:
+        return {entry.name for entry in entries if entry.name.endswith(extension) and entry.is_file()}
+
+
+def read_voc_bbox(xml_path: str) -> Optional[list[int]]:
+    r""" Read the bounding box of the first object of a Pascal VOC annotation.
+
+    The file is scanned with regular expressions instead of being parsed into an element tree. Coordinates are
+    rounded to the nearest integer.
+
+    Arguments:
+        xml_path (str): Path to the annotation file.
+
+    Returns:
+        List[int]: ``[x_min, y_min, x_max, y_max]``, or None if the annotation has no object with a bounding box.
+    """
+    with open(xml_path, 'rb') as f:
+        data = f.read()
+    match = _OBJECT_BNDBOX.search(data)
+    if match is None:
+        return None
+    bndbox = match.group(1)
+    bbox = []
+    for pattern in _COORDINATES.values():
+        coordinate = pattern.search(bndbox)
+        if coordinate is None:
+            return None
+        bbox.append(round(float(coordinate.group(1))))
+    return bbox
+
+
+def read_voc_bboxes(xml_paths: Iterable[str], workers: int = 1, chunksize: int = 256) -> list[Optional[list[int]]]:
+    r""" Read the bounding boxes of many annotation files, in a pool of processes if ``workers > 1``.
+
+    Arguments:
+        xml_paths (Iterable[str]): Paths to the annotation files.
+        workers (int, optional): Number of worker processes. Default: ``1``.
+        chunksize (int, optional): Number of files sent to a worker at a time. Default: ``256``.
+
+    Returns:
+        List[Optional[List[int]]]: The bounding box of every file, in order.
+    """
+    xml_paths = list(xml_paths)
+    if workers <= 1 or len(xml_paths) <= chunksize:
+        return [read_voc_bbox(path) for path in xml_paths]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(read_voc_bbox, xml_paths, chunksize=chunksize))
+
+
+def ingest_annotations(dataset: ICVLP,
+                       annotations_dir: str,
+                       step: int = 5,
+                       workers: int = 1) -> IngestReport:
+    r""" Replace the frames of every plate with the bounding boxes of its Pascal VOC annotations.
+
+    Annotations are named ``<video_id>_<frame>_<label>.xml``, for frames ``frame_start, frame_start + step, ...,
+    frame_end`` of every plate. The directory is listed once, the annotations that exist are parsed in bulk with
+    :py:func:`read_voc_bboxes`, and the plates are updated in memory at the end; writing the dataset is left to
+    the caller. The boxes of every plate are validated with :py:meth:`icvlp.object.Plate.extend_arrays` first, so
+    if any box is invalid, the dataset is left unchanged.
+
+    Arguments:
+        dataset (ICVLP): The dataset, modified in place.
+        annotations_dir (str): Directory of the annotation files.
+        step (int, optional): Number of video frames between annotated frames. Default: ``5``.
+        workers (int, optional): Number of worker processes for parsing. Default: ``1``.
+
+    Returns:
+        IngestReport
+
+    Raises:
+        ValueError: If a bounding box is invalid, naming the video, the plate and the annotation files.
+    """
+    start = time.perf_counter()
+    index = index_annotations(annotations_dir)
+
+    candidates = 0
+    plate_frames: list[tuple] = []
+    lookups, paths = [], []
+    for video in dataset.videos:
+        for plate in video.plates:
+            frame_numbers, bboxes, filenames = [], [], []
+            plate_frames.append((video, plate, frame_numbers, bboxes, filenames))
+            for frame_number in range(plate.frame_start, plate.frame_end + 1, step):
+                candidates += 1
+                filename = f"{video.video_id}_{frame_number}_{plate.label}.xml"
+                if filename in index:
+                    lookups.append((frame_numbers, bboxes, filenames, frame_number, filename))
+                    paths.append(os.path.join(annotations_dir, filename))
+
+    empty = 0
+    for (frame_numbers, bboxes, filenames, frame_number, filename), bbox in zip(lookups,
+                                                                                read_voc_bboxes(paths, workers)):
+        if bbox is None:
+            empty += 1
+            continue
+        frame_numbers.append(frame_number)
+        bboxes.append(bbox)
+        filenames.append(filename)
+    # Every plate is validated before any is changed.
+    new_frames = [_checked_frames(video, plate, frame_numbers, bboxes, filenames)
+                  for video, plate, frame_numbers, bboxes, filenames in plate_frames]
+    for (_, plate, _, _, _), frames in zip(plate_frames, new_frames):
+        plate.frames = frames
+    dataset.invalidate_indexes()
+
+    return IngestReport(candidates=candidates, files=len(paths), frames=len(paths) - empty, empty=empty,
+                        seconds=time.perf_counter() - start)
+
+
+def _checked_frames(video: Video, plate: Plate, frame_numbers: list[int], bboxes: list[list[int]],
+                    filenames: list[str]) -> list[Frame]:
+    scratch = Plate.from_trusted(plate.label, plate.vehicle_type, plate.frame_start, plate.frame_end, [])
+    try:
+        return scratch.extend_arrays(frame_numbers, bboxes).frames
+    except InvalidFramesError as e:
+        raise ValueError(f"Video {video.video_id}, plate {plate.label}: invalid annotations "
+                         f"{', '.join(filenames[row] for row in e.rows)}: {e}") from None
@@ -0,0 +1,277 @@
+import atexit
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Optional, Union
+
+from icvlp.object import ICVLP, Video, Plate, Frame
+
+
+def write_atomic(path: str, data: Union[str, bytes]) -> None:
+    r""" Write ``data`` to ``path`` atomically.
+
+    The data is written to a temporary file in the same directory, flushed to disk and renamed over ``path``, so
+    readers see either the old or the new file, never a partially written one.
+
+    Arguments:
+        path (str): File to write.
+        data (str or bytes): Text, written as UTF-8, or bytes to write.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data.encode('utf-8') if isinstance(data, str) else data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class Journal:
+    r""" Append-only journal of dataset edits.
+
+    Labeling tools record every edit as one small JSON line in the journal file instead of rewriting the whole
+    dataset. On load, the dataset JSON is read and the journal is replayed on top of it. The journal is compacted
+    into the dataset file every ``compact_every`` records, on :py:meth:`close` and at interpreter exit. The dataset
+    file is always replaced atomically.
+
+        >>> with Journal('icvlp_v0.1.json') as journal:
+        ...     video = journal.dataset.get_video_by_id('0001')
+        ...     journal.add_frame(video, video.plates[0], Frame(frame=760, bbox=[1, 1, 90, 90]))
+
+    Plates are identified by their index in ``Video.plates``, since labels are not unique within a video.
+
+    Arguments:
+        dataset_path (str): Dataset JSON file.
+        journal_path (str, optional): Journal file. Default: ``dataset_path + '.journal'``.
+        compact_every (int, optional): Number of records after which the journal is compacted. ``0`` compacts only
+            on close. Default: ``1000``.
+        fsync (bool, optional): Flush every record to disk with ``os.fsync``. Default: ``False``.
+    """
+
+    def __init__(self,
+                 dataset_path: str,
+                 journal_path: Optional[str] = None,
+                 compact_every: int = 1000,
+                 fsync: bool = False) -> None:
+        self.dataset_path: str = dataset_path
+        self.journal_path: str = journal_path or dataset_path + ".journal"
+        self.compact_every: int = compact_every
+        self.fsync: bool = fsync
+
+        self.dataset: ICVLP = ICVLP.from_json(self.dataset_path)
+        self.records: int = self._replay(self._file_digest(self.dataset_path))
+        self._file = open(self.journal_path, 'a')
+        if self._file.tell() == 0:
+            self._write_checkpoint(self._file_digest(self.dataset_path))
+        atexit.register(self.close)
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def add_plate(self, video: Union[Video, str], plate: Plate) -> None:
+        r""" Append a plate to a video and record it.
+
+        Arguments:
+            video (Video or str): The video or its ID.
+            plate (Plate): The plate to append.
+        """
+        video = self._get_video(video)
+        video.append(plate)
+        self.dataset.invalidate_indexes()
+        self._write({
+            "op": "add_plate",
+            "video_id": video.video_id,
+            "plate": plate.as_dict(),
+        })
+
+    def add_frame(self, video: Union[Video, str], plate: Union[Plate, int], frame: Frame) -> None:
+        r""" Append a frame to a plate and record it.
+
+        Arguments:
+            video (Video or str): The video or its ID.
+            plate (Plate or int): The plate or its index in ``video.plates``.
+            frame (Frame): The frame to append.
+        """
+        video = self._get_video(video)
+        index, plate = self._get_plate(video, plate)
+        plate.append(frame)
+        self.dataset.invalidate_indexes()
+        self._write({
+            "op": "add_frame",
+            "video_id": video.video_id,
+            "plate": index,
+            "label": plate.label,
+            "frame": frame.frame,
+            "bbox": frame.bbox,
+        })
+
+    def clear_frames(self, video: Union[Video, str], plate: Union[Plate, int]) -> None:
+        r""" Remove all frames of a plate and record it.
+
+        Arguments:
+            video (Video or str): The video or its ID.
+            plate (Plate or int): The plate or its index in ``video.plates``.
+        """
+        video = self._get_video(video)
+        index, plate = self._get_plate(video, plate)
+        plate.frames.clear()
+        self.dataset.invalidate_indexes()
+        self._write({
+            "op": "clear_frames",
+            "video_id": video.video_id,
+            "plate": index,
+            "label": plate.label,
+        })
+
+    def set_vehicle_type(self, video: Union[Video, str], plate: Union[Plate, int], vehicle_type: str) -> None:
+        r""" Set the vehicle type of a plate and record it.
+
+        Arguments:
+            video (Video or str): The video or its ID.
+            plate (Plate or int): The plate or its index in ``video.plates``.
+            vehicle_type (str): The vehicle type.
+        """
+        video = self._get_video(video)
+        index, plate = self._get_plate(video, plate)
+        plate.vehicle_type = vehicle_type
+        self.dataset.invalidate_indexes()
+        self._write({
+            "op": "set_vehicle_type",
+            "video_id": video.video_id,
+            "plate": index,
+            "label": plate.label,
+            "vehicle_type": vehicle_type,
+        })
+
+    def compact(self) -> None:
+        r""" Write the dataset atomically to ``dataset_path`` and empty the journal. """
+        data = self.dataset.to_json()
+        write_atomic(self.dataset_path, data)
+        self._file.truncate(0)
+        self._write_checkpoint(hashlib.sha1(data.encode('utf-8')).hexdigest())
+        self.records = 0
+        logging.debug(f"Compacted {self.journal_path} into {self.dataset_path}")
+
+    def close(self) -> None:
+        r""" Compact the journal and close it. Called automatically at interpreter exit. """
+        if self._file is None:
+            return
+        if self.records:
+            self.compact()
+        self._file.close()
+        self._file = None
+        os.remove(self.journal_path)
+        atexit.unregister(self.close)
+
+    def _write(self, record: dict) -> None:
+        if self._file is None:
+            raise ValueError(f"Journal {self.journal_path} is closed.")
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.records += 1
+        if self.compact_every and self.records >= self.compact_every:
+            self.compact()
+
+    def _write_checkpoint(self, digest: str) -> None:
+        self._file.write(json.dumps({"op": "checkpoint", "dataset_sha1": digest}) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    @staticmethod
+    def _file_digest(path: str) -> str:
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _replay(self, dataset_digest: str) -> int:
+        r""" Apply the journal to the loaded dataset and return the number of records applied.
+
+        The first line of the journal is a checkpoint with the SHA-1 of the dataset file it applies to. If the
+        dataset file has changed since, the journal was already compacted into it (e.g. the process died between
+        replacing the dataset and emptying the journal) and it is discarded.
+        """
+        if not os.path.exists(self.journal_path):
+            return 0
+        records = 0
+        with open(self.journal_path, 'r') as f:
+            try:
+                checkpoint = json.loads(f.readline())
+            except json.JSONDecodeError:
+                # Empty, or the checkpoint itself was cut short: no record can follow it.
+                open(self.journal_path, 'w').close()
+                return 0
+            if checkpoint.get("op") != "checkpoint":
+                raise ValueError(f"Journal {self.journal_path} does not start with a checkpoint.")
+            if checkpoint["dataset_sha1"] != dataset_digest:
+                logging.warning(f"Discarding {self.journal_path}: it was already compacted into {self.dataset_path}")
+                open(self.journal_path, 'w').close()
+                return 0
+            for line_number, line in enumerate(f, start=2):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A record cut short by a crash can only be the last line.
+                    logging.warning(f"Ignoring incomplete record at {self.journal_path}:{line_number}")
+                    break
+                self._apply(record)
+                records += 1
+        self.dataset.invalidate_indexes()
+        logging.info(f"Replayed {records} records from {self.journal_path}")
+        return records
+
+    def _apply(self, record: dict) -> None:
+        video = self._get_video(record["video_id"])
+        op = record["op"]
+        if op == "add_plate":
+            plate = record["plate"]
+            video.append(Plate(
+                label=plate["label"],
+                vehicle_type=plate["vehicle_type"],
+                frame_start=plate["frame_start"],
+                frame_end=plate["frame_end"],
+                frames=[Frame(frame=frame["frame"], bbox=frame["bbox"]) for frame in plate["frames"]],
+            ))
+            return
+
+        _, plate = self._get_plate(video, record["plate"])
+        if plate.label != record["label"]:
+            raise ValueError(f"Journal record {record} does not match plate {plate.label} of video {video.video_id}.")
+        if op == "add_frame":
+            plate.append(Frame(frame=record["frame"], bbox=record["bbox"]))
+        elif op == "clear_frames":
+            plate.frames.clear()
+        elif op == "set_vehicle_type":
+            plate.vehicle_type = record["vehicle_type"]
+        else:
+            raise ValueError(f"Unknown journal operation {op}.")
+
+    def _get_video(self, video: Union[Video, str]) -> Video:
+        if isinstance(video, Video):
+            return video
+        found = self.dataset.get_video_by_id(video)
+        if found is None:
+            raise KeyError(f"Video ID {video} not found in {self.dataset_path}.")
+        return found
+
+    @staticmethod
+    def _get_plate(video: Video, plate: Union[Plate, int]) -> tuple[int, Plate]:
+        if isinstance(plate, int):
+            return plate, video.plates[plate]
+        for index, candidate in enumerate(video.plates):
+            if candidate is plate:
+                return index, plate
+        raise ValueError(f"Plate {plate.label} is not in video {video.video_id}.")
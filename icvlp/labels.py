@@ -0,0 +1,197 @@
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterable, NamedTuple, Optional, Union
+
+import numpy as np
+
+from icvlp.object import ICVLP, Plate, Video
+from icvlp.store import AnnotationStore
+
+# Region code of one or two letters, a number of one to four digits without a leading zero, and up to three
+# suffix letters.
+LABEL_PATTERN = re.compile(r"([A-Z]{1,2})([1-9][0-9]{0,3})([A-Z]{0,3})")
+# The same, matching one label per line of a string of many labels; invalid lines match the second branch.
+_LINES_PATTERN = re.compile(r"^" + LABEL_PATTERN.pattern + r"$|^.*$", re.MULTILINE)
+
+# Region codes of Indonesian license plates and where they are issued.
+REGIONS = {
+    "A": "Banten", "B": "Jakarta", "D": "Bandung", "E": "Cirebon", "F": "Bogor", "G": "Pekalongan",
+    "H": "Semarang", "K": "Pati", "L": "Surabaya", "M": "Madura", "N": "Malang", "P": "Besuki",
+    "R": "Banyumas", "S": "Bojonegoro", "T": "Purwakarta", "W": "Sidoarjo", "Z": "Priangan Timur",
+    "AA": "Kedu", "AB": "Yogyakarta", "AD": "Surakarta", "AE": "Madiun", "AG": "Kediri",
+    "BA": "Sumatera Barat", "BB": "Sumatera Utara (west)", "BD": "Bengkulu", "BE": "Lampung",
+    "BG": "Sumatera Selatan", "BH": "Jambi", "BK": "Sumatera Utara (east)", "BL": "Aceh", "BM": "Riau",
+    "BN": "Kepulauan Bangka Belitung", "BP": "Kepulauan Riau",
+    "DA": "Kalimantan Selatan", "DB": "Sulawesi Utara", "DC": "Sulawesi Barat", "DD": "Sulawesi Selatan",
+    "DE": "Maluku", "DG": "Maluku Utara", "DH": "Nusa Tenggara Timur (Timor)", "DK": "Bali",
+    "DL": "Sitaro, Sangihe and Talaud", "DM": "Gorontalo", "DN": "Sulawesi Tengah",
+    "DR": "Nusa Tenggara Barat (Lombok)", "DT": "Sulawesi Tenggara",
+    "EA": "Nusa Tenggara Barat (Sumbawa)", "EB": "Nusa Tenggara Timur (Flores)",
+    "ED": "Nusa Tenggara Timur (Sumba)",
+    "KB": "Kalimantan Barat", "KH": "Kalimantan Tengah", "KT": "Kalimantan Timur", "KU": "Kalimantan Utara",
+    "PA": "Papua", "PB": "Papua Barat", "DS": "Papua",
+}
+
+
+class PlateLabel(NamedTuple):
+    r""" Fields of an Indonesian license plate label.
+
+    Arguments:
+        region (str): Region code, e.g. ``'AB'``.
+        number (str): Registration number, e.g. ``'8381'``.
+        suffix (str): Suffix letters, possibly empty, e.g. ``'FU'``.
+    """
+    region: str
+    number: str
+    suffix: str
+
+    @property
+    def text(self) -> str:
+        return self.region + self.number + self.suffix
+
+    @property
+    def region_name(self) -> Optional[str]:
+        return REGIONS.get(self.region)
+
+    @property
+    def is_known_region(self) -> bool:
+        return self.region in REGIONS
+
+
+@lru_cache(maxsize=2 ** 16)
+def parse_label(label: Optional[str]) -> Optional[PlateLabel]:
+    r""" Parse a plate label into its fields.
+
+    Spaces are ignored and letters are upper-cased, so ``'ab 8381 fu'`` parses like ``'AB8381FU'``. Results are
+    memoized, since labels repeat across videos and frames.
+
+        >>> parse_label('AB8381FU')
+        PlateLabel(region='AB', number='8381', suffix='FU')
+
+    Arguments:
+        label (str): The label.
+
+    Returns:
+        PlateLabel: The fields, or None if ``label`` is not a valid plate.
+    """
+    if not label:
+        return None
+    match = LABEL_PATTERN.fullmatch(label.replace(" ", "").upper())
+    if match is None:
+        return None
+    return PlateLabel(*match.groups())
+
+
+def parse_labels(labels: Iterable[Optional[str]],
+                 workers: int = 1,
+                 chunksize: int = 65536) -> list[Optional[PlateLabel]]:
+    r""" Parse many labels.
+
+    Every distinct label is parsed once. Distinct labels are joined into lines and scanned with a single regular
+    expression, in chunks on a pool of processes if ``workers > 1``.
+
+    Arguments:
+        labels (Iterable[str]): The labels.
+        workers (int, optional): Number of worker processes. Default: ``1``.
+        chunksize (int, optional): Number of labels scanned at a time by a worker. Default: ``65536``.
+
+    Returns:
+        List[Optional[PlateLabel]]: The fields of every label, in order.
+    """
+    labels = list(labels)
+    distinct = [label for label in dict.fromkeys(labels) if label and "\n" not in label]
+    chunks = [distinct[i:i + chunksize] for i in range(0, len(distinct), chunksize)]
+    if workers <= 1 or len(chunks) <= 1:
+        parsed = [_parse_lines(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed = list(executor.map(_parse_lines, chunks))
+    fields = {label: fields for chunk, chunk_fields in zip(chunks, parsed) for label, fields in zip(chunk, chunk_fields)}
+    return [fields.get(label) for label in labels]
+
+
+def _parse_lines(labels: list[str]) -> list[Optional[PlateLabel]]:
+    text = "\n".join(labels).replace(" ", "").upper()
+    make = PlateLabel._make
+    return [make(match.groups()) if match.group(1) is not None else None for match in _LINES_PATTERN.finditer(text)]
+
+
+def label_counts(dataset: Union[ICVLP, AnnotationStore]) -> Counter:
+    r""" Count the plates of every distinct label.
+
+    Arguments:
+        dataset (ICVLP or AnnotationStore): The dataset.
+
+    Returns:
+        Counter: Number of plates by label.
+    """
+    if isinstance(dataset, AnnotationStore):
+        codes = np.asarray(dataset.label_codes)
+        counts = np.bincount(codes[codes >= 0], minlength=len(dataset.labels))
+        ret = Counter({dataset.labels.decode(code): count for code, count in enumerate(counts.tolist()) if count})
+        if (codes < 0).any():
+            ret[None] = int((codes < 0).sum())
+        return ret
+    return Counter(plate.label for video in dataset.videos for plate in video.plates)
+
+
+def region_counts(dataset: Union[ICVLP, AnnotationStore], workers: int = 1, chunksize: int = 65536) -> Counter:
+    r""" Count the plates of every region code.
+
+    Only distinct labels are scanned, and only for their region code, so the cost grows with the number of
+    distinct labels rather than plates. Invalid labels are counted under ``None``.
+
+        >>> for region, count in region_counts(dataset).most_common():
+        ...     print(region, REGIONS.get(region), count)
+
+    Arguments:
+        dataset (ICVLP or AnnotationStore): The dataset.
+        workers (int, optional): Number of worker processes for scanning. Default: ``1``.
+        chunksize (int, optional): Number of labels scanned at a time by a worker. Default: ``65536``.
+
+    Returns:
+        Counter: Number of plates by region code.
+    """
+    counts = label_counts(dataset)
+    invalid = counts.pop(None, 0)
+    labels = list(counts)
+    chunks = [labels[i:i + chunksize] for i in range(0, len(labels), chunksize)]
+    if workers <= 1 or len(chunks) <= 1:
+        regions = [_scan_regions(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            regions = list(executor.map(_scan_regions, chunks))
+    ret = Counter()
+    for region, count in zip((region for chunk in regions for region in chunk), counts.values()):
+        ret[region] += count
+    if invalid:
+        ret[None] += invalid
+    return ret
+
+
+def _scan_regions(labels: list[str]) -> list[Optional[str]]:
+    text = "\n".join(labels).replace(" ", "").upper()
+    regions = [match.group(1) for match in _LINES_PATTERN.finditer(text)]
+    if len(regions) != len(labels):
+        # A label spans several lines.
+        return [fields.region if fields is not None else None for fields in map(parse_label, labels)]
+    return regions
+
+
+def invalid_labels(dataset: ICVLP, known_regions: bool = False) -> list[tuple[Video, Plate]]:
+    r""" Find the plates whose label is not a valid Indonesian plate, in one pass over the dataset.
+
+    Arguments:
+        dataset (ICVLP): The dataset.
+        known_regions (bool, optional): Also flag labels whose region code is not in :py:data:`REGIONS`.
+            Default: ``False``.
+
+    Returns:
+        List[Tuple[Video, Plate]]: The flagged plates, in dataset order.
+    """
+    index = dataset.query_index
+    invalid = {label for label, fields in zip(index.by_label, parse_labels(index.by_label))
+               if fields is None or (known_regions and not fields.is_known_region)}
+    return list(dataset.query(label=invalid)) if invalid else []
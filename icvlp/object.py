@@ -1,21 +1,97 @@
 import json
-from typing import TypeVar
+import re
+from bisect import bisect_left, bisect_right
+from operator import attrgetter
+from json.encoder import encode_basestring_ascii as _encode_string
+from typing import Optional, TypeVar
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
 
 T = TypeVar('T', bound="DataObject")
 
 
+class InvalidFramesError(ValueError):
+    r""" Raised by :py:meth:`Plate.extend_arrays` if rows of the arrays are invalid.
+
+    Arguments:
+        message (str): The message, listing the invalid rows.
+        rows (List[int]): Indices of every invalid row.
+    """
+
+    def __init__(self, message: str, rows: list[int]):
+        super().__init__(message)
+        self.rows = rows
+
+
+class _Revision:
+    r""" Number of changes to a dataset, part of the key of :py:attr:`ICVLP.query_index`.
+
+    The dataset shares it with the videos and plates it indexes, so their ``append`` and ``extend`` mark the
+    indexes of that dataset, and no other, as stale. It is a separate object rather than a reference to the dataset,
+    so that pickling a video, e.g. for a worker process, does not pickle the whole dataset.
+    """
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value: int = 0
+
+    def bump(self):
+        self.value += 1
+
+
 class DataObject:
-    children_type: T
-    children: list[T]
+    r""" Base class of the data objects.
+
+    Subclasses declare their attributes in ``__slots__`` and the serialized ones, in order, in ``fields``. Children
+    are stored once, in the list attribute named by ``children_field``; ``children`` refers to the same list.
+    """
+    __slots__ = ()
+
+    children_type: T = None
+    children_field: Optional[str] = None
+    fields: tuple[str, ...] = ()
+
+    def __init__(self, children: list[T] = None):
+        if self.children_field is not None:
+            setattr(self, self.children_field, list(children) if children else [])
+
+    @classmethod
+    def from_trusted(cls, *values):
+        r""" Build an object from already validated values of ``fields``, in order.
+
+        Values are assigned as they are: nothing is checked or copied, so lists passed in are owned by the object.
+
+        Returns:
+            DataObject
+        """
+        self = cls.__new__(cls)
+        for key, value in zip(cls.fields, values):
+            setattr(self, key, value)
+        return self
 
-    def __init__(self, children: list[T]):
-        self.children = [self.children_type.__init__(child)
-                         if not isinstance(child, DataObject) and not isinstance(child, int)
-                         else child
-                         for child in children] if children else []
+    @property
+    def children(self) -> list[T]:
+        return getattr(self, self.children_field) if self.children_field is not None else []
+
+    @children.setter
+    def children(self, children: list[T]):
+        setattr(self, self.children_field, children)
 
     def from_dict(self, data):
-        self.__dict__.update(**data)
+        r""" Set the fields of the object from a dictionary. Keys that are not in ``fields`` are ignored. """
+        for key in self.fields:
+            if key in data:
+                setattr(self, key, data[key])
         return self
 
     def as_dict(self) -> dict:
@@ -25,9 +101,8 @@ class DataObject:
             dict: The object as a dictionary
         """
         ret = {}
-        for key, value in self.__dict__.items():
-            if key == "children":
-                continue
+        for key in self.fields:
+            value = getattr(self, key)
             if isinstance(value, list):
                 ret[key] = [v.as_dict() if isinstance(v, DataObject) else v for v in value]
             else:
@@ -55,17 +130,24 @@ class Frame(DataObject):
         frame (int): Frame number of the video.
         bbox (list): Bounding box of the frame. Configured in [``x_min``, ``y_min``, ``x_max``, ``y_max``].
     """
-    children_type = None
+    __slots__ = ('frame', 'bbox')
+    fields = __slots__
 
     frame: int
     bbox: list[int]
 
     def __init__(self, frame: int = None, bbox: list[int] = None):
-        super().__init__([])
         self.frame: int = frame
         self.__check_bbox(bbox)
         self.bbox: list[int] = bbox
 
+    @classmethod
+    def from_trusted(cls, frame: int, bbox: Optional[list[int]]):
+        self = cls.__new__(cls)
+        self.frame = frame
+        self.bbox = bbox
+        return self
+
     @staticmethod
     def __check_bbox(bbox: list[int]):
         if bbox is None:
@@ -84,6 +166,15 @@ class Frame(DataObject):
 class Plate(DataObject):
     r""" Data object of a plate with labels and frames.
 
+    Frames are kept sorted by frame number, and indexed so that :py:meth:`get_frame`, :py:meth:`has_frame` and
+    :py:meth:`frames_between` run in logarithmic time. The index is maintained by :py:meth:`append` and
+    :py:meth:`extend`. If ``frames`` is reassigned or its length changes, it is sorted and re-indexed on the next
+    lookup. Other in-place changes, such as replacing an item of ``frames`` or changing the ``frame`` of a frame,
+    are not detected; use :py:meth:`append` and :py:meth:`extend` instead.
+
+    :py:meth:`append` and :py:meth:`extend` mark the query indexes of the dataset as stale; assigning a field or
+    modifying ``frames`` or a frame in place does not, see :py:meth:`ICVLP.invalidate_indexes`.
+
     Arguments:
         label (str): Label of the plate.
         vehicle_type (str): Type of the vehicle.
@@ -91,7 +182,11 @@ class Plate(DataObject):
         frame_end (int): Second occurred frame of the plate.
         frames (List[Frame]): List of frames of the plate.
     """
+    __slots__ = ('label', 'vehicle_type', 'frame_start', 'frame_end', 'frames', '_indexed_frames', '_frame_numbers',
+                 '_revision')
+    fields = __slots__[:5]
     children_type = Frame
+    children_field = 'frames'
 
     label: str
     vehicle_type: str
@@ -110,30 +205,211 @@ class Plate(DataObject):
         self.vehicle_type: str = vehicle_type
         self.frame_start: int = frame_start
         self.frame_end: int = frame_end
-        self.frames = self.children
+        self._revision: Optional[_Revision] = None
+        self._index_frames()
+
+    @classmethod
+    def from_trusted(cls,
+                     label: str,
+                     vehicle_type: Optional[str],
+                     frame_start: int,
+                     frame_end: int,
+                     frames: list[Frame]):
+        self = cls.__new__(cls)
+        self.label = label
+        self.vehicle_type = vehicle_type
+        self.frame_start = frame_start
+        self.frame_end = frame_end
+        self.frames = frames
+        # Indexed on the first lookup.
+        self._indexed_frames = None
+        self._frame_numbers = None
+        self._revision = None
+        return self
+
+    def from_dict(self, data):
+        super().from_dict(data)
+        self._index_frames()
+        return self
 
     def append(self, item: T):
         if not isinstance(item, self.children_type):
             raise TypeError(f"Item must be of type {self.children_type}. Got {type(item)}.")
         if self.frame_start > item.frame or item.frame > self.frame_end:
             raise ValueError(f"Frame must between {self.frame_start} and {self.frame_end}. Got {item.as_dict()}.")
-        self.frames.append(item)
-        return super().append(item)
+        if self._revision is not None:
+            self._revision.bump()
+        frame_numbers = self.frame_numbers
+        if not frame_numbers or frame_numbers[-1] <= item.frame:
+            self.frames.append(item)
+            frame_numbers.append(item.frame)
+        else:
+            i = bisect_right(frame_numbers, item.frame)
+            self.frames.insert(i, item)
+            frame_numbers.insert(i, item.frame)
+        return self
 
     def extend(self, other: list[T]):
+        other = list(other)
         for item in other:
             if not isinstance(item, self.children_type):
                 raise TypeError(f"Item must be of type {self.children_type}. Got {type(item)}.")
             if self.frame_start > item.frame or item.frame > self.frame_end:
                 raise ValueError(f"Frame must between {self.frame_start} and {self.frame_end}. Got {item.as_dict()}.")
+        return self._extend_checked(other)
+
+    def extend_arrays(self, frame_numbers, bboxes):
+        r""" Append frames from arrays of frame numbers and bounding boxes, e.g. detector output for the plate.
+
+        The arrays are validated as a whole with NumPy: ``bboxes`` must have shape ``(N, 4)``, hold finite numbers,
+        which are truncated to integers like in :py:class:`Frame`, and satisfy ``x_min < x_max`` and
+        ``y_min < y_max``; frame numbers must be integers between ``frame_start`` and ``frame_end``. If any row is
+        invalid, no frame is added and :py:class:`InvalidFramesError` lists every invalid row.
+
+            >>> plate.extend_arrays(frame_numbers, boxes.xyxy.numpy())
+
+        Arguments:
+            frame_numbers (array_like): Frame numbers of shape ``(N,)``.
+            bboxes (array_like): Bounding boxes of shape ``(N, 4)``, as ``[x_min, y_min, x_max, y_max]``.
+
+        Returns:
+            Plate
+
+        Raises:
+            InvalidFramesError: If any row is invalid.
+        """
+        frame_numbers, bboxes = _check_frame_arrays(frame_numbers, bboxes, self.frame_start, self.frame_end)
+        frame = Frame.from_trusted
+        return self._extend_checked([frame(number, bbox)
+                                     for number, bbox in zip(frame_numbers.tolist(), bboxes.tolist())])
+
+    def validate(self):
+        r""" Check the frames of the plate like :py:meth:`extend_arrays` does, e.g. after loading from JSON.
+
+        Frames without a bounding box are skipped.
+
+        Raises:
+            ValueError: Listing every invalid frame.
+        """
+        frames = [frame for frame in self.frames if frame.bbox is not None]
+        try:
+            _check_frame_arrays([frame.frame for frame in frames], [frame.bbox for frame in frames],
+                                self.frame_start, self.frame_end)
+        except InvalidFramesError as e:
+            raise InvalidFramesError(f"Plate {self.label}: {e}", e.rows) from None
+        except (TypeError, ValueError) as e:
+            raise type(e)(f"Plate {self.label}: {e}") from None
+
+    def _extend_checked(self, other: list[Frame]):
+        if self._revision is not None:
+            self._revision.bump()
+        frame_numbers = self.frame_numbers
         self.frames.extend(other)
-        return super().extend(other)
+        new_numbers = [item.frame for item in other]
+        frame_numbers.extend(new_numbers)
+        if other and not _is_sorted(frame_numbers, start=len(frame_numbers) - len(other) - 1):
+            self._index_frames()
+        return self
+
+    @property
+    def frame_numbers(self) -> list[int]:
+        r""" Sorted frame numbers of ``frames``. Read-only. """
+        if self._indexed_frames is not self.frames or len(self._frame_numbers) != len(self.frames):
+            self._index_frames()
+        return self._frame_numbers
+
+    def _index_frames(self):
+        frame_numbers = [frame.frame for frame in self.frames]
+        if not _is_sorted(frame_numbers):
+            # Stable, so frames with the same number keep their order.
+            self.frames.sort(key=attrgetter('frame'))
+            frame_numbers.sort()
+        self._indexed_frames = self.frames
+        self._frame_numbers = frame_numbers
+
+    def get_frame(self, frame_number: int):
+        r""" Returns the frame with the given frame number.
+
+        Arguments:
+            frame_number (int): The frame number.
+
+        Returns:
+            Frame: The first frame with this number, or None.
+        """
+        frame_numbers = self.frame_numbers
+        i = bisect_left(frame_numbers, frame_number)
+        if i < len(frame_numbers) and frame_numbers[i] == frame_number:
+            return self.frames[i]
+        return None
+
+    def has_frame(self, frame_number: int) -> bool:
+        r""" Returns whether the plate has a frame with the given frame number. """
+        return self.get_frame(frame_number) is not None
+
+    def frames_between(self, start: int, end: int) -> list[Frame]:
+        r""" Returns the frames with ``start <= frame <= end``, sorted by frame number.
+
+        Arguments:
+            start (int): First frame number.
+            end (int): Last frame number.
+
+        Returns:
+            List[Frame]
+        """
+        frame_numbers = self.frame_numbers
+        return self.frames[bisect_left(frame_numbers, start):bisect_right(frame_numbers, end)]
 
     def check_frame_number_exists_in_children(self, frame_number: int):
-        for frame in self.frames:
-            if frame.frame == frame_number:
-                return True
-        return False
+        return self.has_frame(frame_number)
+
+    def keyframe_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        r""" Returns the annotated frames with a bounding box as arrays.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Sorted, unique frame numbers of shape ``(N,)`` and bounding boxes of shape
+            ``(N, 4)``. For repeated frame numbers, the first annotation is kept.
+        """
+        frames = [frame for frame in self.frames if frame.bbox is not None]
+        frame_numbers = np.fromiter((frame.frame for frame in frames), dtype=np.int64, count=len(frames))
+        bboxes = np.array([frame.bbox for frame in frames], dtype=np.int64).reshape(-1, 4)
+        frame_numbers, first = np.unique(frame_numbers, return_index=True)
+        return frame_numbers, bboxes[first]
+
+    def dense_boxes(self, step: int = 1, method: str = "linear") -> tuple[np.ndarray, np.ndarray]:
+        r""" Interpolate the bounding box of every ``step``-th frame between the annotated keyframes.
+
+        Frames ``frame_start, frame_start + step, ..., frame_end`` are interpolated, limited to the span of the
+        keyframes: boxes are never extrapolated before the first or after the last annotated frame. Keyframes
+        keep their annotated boxes.
+
+            >>> frame_numbers, boxes = plate.dense_boxes()
+
+        Arguments:
+            step (int, optional): Number of video frames between interpolated frames. Default: ``1``.
+            method (str, optional): ``'linear'``, or ``'cubic'`` for a natural cubic spline through the keyframes.
+                Plates with fewer than three keyframes are interpolated linearly. Default: ``'linear'``.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: ``int32`` frame numbers of shape ``(M,)`` and ``int32`` bounding boxes of
+            shape ``(M, 4)``, rounded to the nearest pixel.
+        """
+        if step < 1:
+            raise ValueError(f"step must be at least 1. Got {step}.")
+        if method not in ("linear", "cubic"):
+            raise ValueError(f"method must be 'linear' or 'cubic'. Got {method}.")
+        keyframes, bboxes = self.keyframe_arrays()
+        if not len(keyframes):
+            return np.zeros(0, dtype=np.int32), np.zeros((0, 4), dtype=np.int32)
+        frame_start = keyframes[0] if self.frame_start is None else self.frame_start
+        frame_end = keyframes[-1] if self.frame_end is None else self.frame_end
+        frame_numbers = np.arange(frame_start, frame_end + 1, step)
+        frame_numbers = frame_numbers[(frame_numbers >= keyframes[0]) & (frame_numbers <= keyframes[-1])]
+        boxes = _interpolate_boxes(keyframes, bboxes.astype(np.float64), frame_numbers, method)
+        boxes = np.rint(boxes).astype(np.int32)
+        # Keep boxes valid where a spline overshoots.
+        np.maximum(boxes[:, 2], boxes[:, 0] + 1, out=boxes[:, 2])
+        np.maximum(boxes[:, 3], boxes[:, 1] + 1, out=boxes[:, 3])
+        return frame_numbers.astype(np.int32), boxes
 
 
 class Video(DataObject):
@@ -145,8 +421,14 @@ class Video(DataObject):
         url (str): URL of the video.
         fps (int): Frame to get per second when extracting frames from video.
         plates (List[Plate]): List of plates of the video.
+
+    Like for :py:class:`Plate`, :py:meth:`append` and :py:meth:`extend` mark the query indexes of the dataset as
+    stale.
     """
+    __slots__ = ('video_id', 'source', 'url', 'fps', 'plates', '_revision')
+    fields = __slots__[:5]
     children_type = Plate
+    children_field = 'plates'
 
     video_id: str
     source: str
@@ -165,20 +447,44 @@ class Video(DataObject):
         self.source: str = source
         self.url: str = url
         self.fps: int = fps
-        self.plates: list[Plate] = self.children
+        self._revision: Optional[_Revision] = None
+
+    @classmethod
+    def from_trusted(cls,
+                     video_id: str,
+                     source: Optional[str],
+                     url: Optional[str],
+                     fps: Optional[int],
+                     plates: list[Plate]):
+        self = cls.__new__(cls)
+        self.video_id = video_id
+        self.source = source
+        self.url = url
+        self.fps = fps
+        self.plates = plates
+        self._revision = None
+        return self
 
     def append(self, item: T):
         if not isinstance(item, self.children_type):
             raise TypeError(f"Item must be of type {self.children_type}. Got {type(item)}.")
         self.plates.append(item)
-        return super().append(item)
+        if self._revision is not None:
+            item._revision = self._revision
+            self._revision.bump()
+        return self
 
     def extend(self, other: list[T]):
+        other = list(other)
         for item in other:
             if not isinstance(item, self.children_type):
                 raise TypeError(f"Item must be of type {self.children_type}. Got {type(item)}.")
         self.plates.extend(other)
-        return super().extend(other)
+        if self._revision is not None:
+            for item in other:
+                item._revision = self._revision
+            self._revision.bump()
+        return self
 
 
 class ICVLP(DataObject):
@@ -186,74 +492,514 @@ class ICVLP(DataObject):
 
     Collection of Videos that has license plates in their frames.
     """
+    __slots__ = ('videos', '_indexed_videos', '_video_index', '_revision', '_query_index', '_query_index_key')
+    fields = __slots__[:1]
     children_type = Video
+    children_field = 'videos'
 
     videos: list[children_type]
 
     def __init__(self, videos: list[Video]):
         super().__init__(videos)
-        self.videos: list[Video] = self.children
+        self._check_video_ids_exist(self.videos, index={})
+        self._indexed_videos: list[Video] = self.videos
+        self._video_index: dict[str, Video] = {video.video_id: video for video in self.videos}
+        self._revision: _Revision = _Revision()
+        self._query_index = None
+        self._query_index_key: tuple = None
+
+    @classmethod
+    def from_trusted(cls, videos: list[Video]):
+        self = cls.__new__(cls)
+        self.videos = videos
+        # Video IDs are not checked; the index is built on the first lookup.
+        self._indexed_videos = None
+        self._video_index = {}
+        self._revision = _Revision()
+        self._query_index = None
+        self._query_index_key = None
+        return self
 
     def append(self, item: children_type):
         if not isinstance(item, self.children_type):
             raise TypeError(f"Item must be of type {self.children_type}. Got {type(item)}.")
         self._check_video_id_exists(item)
         self.videos.append(item)
-        return super().append(item)
+        self._video_index[item.video_id] = item
+        self.invalidate_indexes()
+        return self
 
     def extend(self, other: list[children_type]):
+        r""" Append a batch of videos.
+
+        The whole batch is validated in one pass before any video is added, so either all videos are added or
+        none of them.
+
+        Arguments:
+            other (List[Video]): Videos to append.
+
+        Returns:
+            ICVLP
+        """
+        other = list(other)
         for item in other:
             if not isinstance(item, self.children_type):
                 raise TypeError(f"Item must be of type {self.children_type}. Got {type(item)}.")
-            self._check_video_id_exists(item)
+        self._check_video_ids_exist(other)
         self.videos.extend(other)
-        return super().extend(other)
+        self._video_index.update((video.video_id, video) for video in other)
+        self.invalidate_indexes()
+        return self
+
+    @property
+    def video_index(self) -> dict[str, Video]:
+        r""" Mapping of ``video_id`` to :py:class:`Video`.
+
+        The index is maintained by :py:meth:`append` and :py:meth:`extend`. It is rebuilt if ``videos`` is
+        replaced or modified directly.
+        """
+        if self._indexed_videos is not self.videos or len(self._video_index) != len(self.videos):
+            self._indexed_videos = self.videos
+            self._video_index = {video.video_id: video for video in self.videos}
+        return self._video_index
 
     def _check_video_id_exists(self, video: Video):
-        video_ids = [video.video_id for video in self.videos]
-        if video.video_id in video_ids:
+        if video.video_id in self.video_index:
             raise KeyError(f"Video ID {video.video_id} is already in {self} videos.")
 
+    def _check_video_ids_exist(self, videos: list[Video], index: dict[str, Video] = None):
+        index = self.video_index if index is None else index
+        seen = set()
+        for video in videos:
+            if video.video_id in index or video.video_id in seen:
+                raise KeyError(f"Video ID {video.video_id} is already in {self} videos.")
+            seen.add(video.video_id)
+
     def get_video_by_id(self, video_id: str):
-        for video in self.videos:
-            if video.video_id == video_id:
-                return video
-        return None
+        return self.video_index.get(video_id)
+
+    def invalidate_indexes(self):
+        r""" Mark the indexes of :py:meth:`query` as stale, so they are rebuilt on the next query.
+
+        Called by :py:meth:`append`, :py:meth:`extend`, :py:class:`icvlp.journal.Journal` edits and
+        :py:func:`icvlp.ingest.ingest_annotations`; ``append`` and ``extend`` of the indexed videos and plates mark
+        the indexes as stale too. Call it after assigning a field of a video or plate, or after modifying the
+        ``plates`` or ``frames`` lists, or a :py:class:`Frame`, in place.
+        """
+        self._revision.bump()
+
+    @property
+    def query_index(self):
+        r""" The :py:class:`icvlp.query.DatasetIndex` of the dataset, built on first use.
+
+        It is rebuilt after :py:meth:`invalidate_indexes`, after ``append`` or ``extend`` of an indexed video or
+        plate, or if ``videos`` is replaced or its length changes.
+        """
+        from icvlp.query import DatasetIndex
+
+        key = (self._revision.value, id(self.videos), len(self.videos))
+        if self._query_index is None or self._query_index_key != key:
+            self._query_index = DatasetIndex(self)
+            self._query_index_key = key
+        return self._query_index
+
+    def query(self, **filters):
+        r""" Select plates and frames with indexed filters.
+
+            >>> dataset.query(vehicle_type='semi_trailer', annotated=False).plates()
+
+        Arguments:
+            **filters: See :py:meth:`icvlp.query.Query.filter`.
+
+        Returns:
+            Query
+        """
+        from icvlp.query import Query
+
+        return Query(self).filter(**filters)
 
     @classmethod
-    def from_json(cls, json_filepath: str):
+    def from_json(cls, json_filepath: str, lazy: bool = False):
         r""" Populate videos with data from JSON file.
 
+        The file is parsed one video at a time, so the whole JSON document is never held in memory next to the
+        objects built from it.
+
         Arguments:
             json_filepath (str): Path to JSON file.
+            lazy (bool, optional): Return a :py:class:`LazyICVLP` that streams videos from the file on every
+                iteration instead of loading them. Default: ``False``.
 
         Returns:
-            ICVLP
+            ICVLP or LazyICVLP
         """
-        with open(json_filepath, 'r') as f:
-            data_list = json.load(f)
-            f.close()
-
-        data = []
-        if len(data_list) > 0:
-            for video_dict in data_list:
-                plates = video_dict['plates']
-                if len(plates) > 0:
-                    plates_list = []
-                    for plate_dict in plates:
-                        frames = plate_dict['frames']
-                        if len(frames) > 0:
-                            frames_list = []
-                            for frame in frames:
-                                frames_list.append(Frame().from_dict(frame))
-                            plate_dict['frames'] = frames_list
-                        plates_list.append(Plate().from_dict(plate_dict))
-                    video_dict['plates'] = plates_list
-                data.append(Video().from_dict(video_dict))
-        return cls(data)
-
-    def to_json(self, indent: int = 2):
-        return json.dumps(
-            [video.as_dict() for video in self.videos],
-            indent=indent
-        )
+        if lazy:
+            return LazyICVLP(json_filepath)
+        return cls(list(cls.iter_json(json_filepath)))
+
+    @staticmethod
+    def iter_json(json_filepath: str):
+        r""" Iterate over the videos of a JSON file without loading the whole file.
+
+        The top-level array is parsed incrementally and only one video is held in memory at a time.
+
+            >>> for video in ICVLP.iter_json('icvlp_v0.1.json'):
+            ...     print(video.video_id)
+
+        Arguments:
+            json_filepath (str): Path to JSON file.
+
+        Yields:
+            Video
+        """
+        for video_dict in _iter_json_array(json_filepath):
+            yield _video_from_dict(video_dict)
+
+    @classmethod
+    def from_binary(cls, binary_filepath: str, lazy: bool = False):
+        r""" Load a dataset from a binary file written by :py:meth:`to_binary`.
+
+        Arguments:
+            binary_filepath (str): Path to binary file.
+            lazy (bool, optional): Return the memory-mapped :py:class:`icvlp.store.AnnotationStore` instead of
+                building objects. Opening is near-instant and data is read only when accessed. Default: ``False``.
+
+        Returns:
+            ICVLP or AnnotationStore
+        """
+        from icvlp.store import AnnotationStore
+
+        store = AnnotationStore.load(binary_filepath, mmap=True)
+        if lazy:
+            return store
+        return store.to_icvlp()
+
+    def to_binary(self, binary_filepath: str):
+        r""" Write the dataset to a compact binary file.
+
+        See :py:meth:`icvlp.store.AnnotationStore.save` for the file layout.
+
+        Arguments:
+            binary_filepath (str): Path to binary file.
+        """
+        from icvlp.store import AnnotationStore
+
+        AnnotationStore.from_icvlp(self).save(binary_filepath)
+
+    def densify(self, step: int = 1, method: str = "linear"):
+        r""" Interpolate dense bounding box tracks for every plate of the dataset.
+
+        See :py:meth:`Plate.dense_boxes`. The result is built straight from the interpolated arrays, without
+        creating a :py:class:`Frame` per interpolated frame.
+
+            >>> store = dataset.densify()
+            >>> store.num_frames
+
+        Arguments:
+            step (int, optional): Number of video frames between interpolated frames. Default: ``1``.
+            method (str, optional): ``'linear'`` or ``'cubic'``. Default: ``'linear'``.
+
+        Returns:
+            AnnotationStore: The dataset with the interpolated frames of every plate.
+        """
+        from icvlp.store import AnnotationStore
+
+        return AnnotationStore.from_dense_tracks(self.videos, step=step, method=method)
+
+    def to_json(self, indent: int = 2, compact: bool = False) -> str:
+        r""" Serialize the dataset to a JSON string.
+
+        The output is the same as ``json.dumps([video.as_dict() for video in videos], indent=indent)``, but it is
+        written straight from the objects. ``orjson`` or ``ujson`` is used when installed.
+
+        Arguments:
+            indent (int, optional): Indentation of nested values. ``None`` writes a single line. Default: ``2``.
+            compact (bool, optional): Write a single line without whitespace, ignoring ``indent``.
+                Default: ``False``.
+
+        Returns:
+            str
+        """
+        return _dumps_videos(self.videos, indent, compact)
+
+    def write_json(self, json_filepath: str, indent: int = 2, compact: bool = False):
+        r""" Write the dataset to a JSON file.
+
+        Arguments:
+            json_filepath (str): Path to JSON file.
+            indent (int, optional): Indentation of nested values. Default: ``2``.
+            compact (bool, optional): Write a single line without whitespace. Default: ``False``.
+        """
+        with open(json_filepath, 'w') as f:
+            f.write(_dumps_videos(self.videos, indent, compact))
+
+
+class LazyICVLP:
+    r""" ICVLP dataset that streams its videos from a JSON file.
+
+    Videos are parsed again on every iteration, so memory use does not grow with the dataset. Use
+    :py:meth:`load` to get a mutable :py:class:`ICVLP`.
+
+        >>> dataset = ICVLP.from_json('icvlp_v0.1.json', lazy=True)
+        >>> for video in dataset.videos:
+        ...     print(video.video_id)
+
+    Arguments:
+        json_filepath (str): Path to JSON file.
+    """
+
+    def __init__(self, json_filepath: str):
+        self.json_filepath: str = json_filepath
+
+    def __iter__(self):
+        return ICVLP.iter_json(self.json_filepath)
+
+    @property
+    def videos(self):
+        return iter(self)
+
+    def load(self) -> ICVLP:
+        return ICVLP.from_json(self.json_filepath)
+
+
+def _check_frame_arrays(frame_numbers, bboxes, frame_start: Optional[int],
+                        frame_end: Optional[int]) -> tuple[np.ndarray, np.ndarray]:
+    r""" Validate frame numbers and bounding boxes as arrays and return them as ``int64``.
+
+    Raises:
+        TypeError: If the values are not numbers.
+        ValueError: If the shapes do not match.
+        InvalidFramesError: Listing every invalid row.
+    """
+    try:
+        frame_numbers = np.asarray(frame_numbers, dtype=np.float64)
+        bboxes = np.asarray(bboxes, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise TypeError("Frame numbers and bboxes must be numbers.") from None
+    if bboxes.size == 0 and len(frame_numbers) == 0:
+        bboxes = bboxes.reshape(0, 4)
+    if frame_numbers.ndim != 1 or bboxes.ndim != 2 or bboxes.shape[1] != 4:
+        raise ValueError(f"Frame numbers must have shape (N,) and bboxes (N, 4). "
+                         f"Got {frame_numbers.shape} and {bboxes.shape}.")
+    if len(frame_numbers) != len(bboxes):
+        raise ValueError(f"Got {len(frame_numbers)} frame numbers for {len(bboxes)} bboxes.")
+
+    finite = np.isfinite(bboxes).all(axis=1)
+    coordinates = np.trunc(np.where(finite[:, None], bboxes, 0)).astype(np.int64)
+    errors = {
+        "bbox is not finite": ~finite,
+        "bbox must be in shape (`x_min`, `y_min`, `x_max`, `y_max`)": finite & (
+            (coordinates[:, 0] >= coordinates[:, 2]) | (coordinates[:, 1] >= coordinates[:, 3])),
+        "frame number is not an integer": ~np.isfinite(frame_numbers) | (frame_numbers != np.trunc(frame_numbers)),
+    }
+    if frame_start is not None:
+        errors[f"frame is before frame_start {frame_start}"] = frame_numbers < frame_start
+    if frame_end is not None:
+        errors[f"frame is after frame_end {frame_end}"] = frame_numbers > frame_end
+    invalid = np.logical_or.reduce(list(errors.values()))
+    if invalid.any():
+        rows = np.flatnonzero(invalid)
+        lines = [f"row {row} (frame {frame_numbers[row]:g}, bbox {bboxes[row].tolist()}): "
+                 + ", ".join(message for message, mask in errors.items() if mask[row])
+                 for row in rows[:20].tolist()]
+        if len(rows) > 20:
+            lines.append(f"... and {len(rows) - 20} more")
+        raise InvalidFramesError(f"{len(rows)} invalid frames:\n" + "\n".join(lines), rows.tolist())
+    return frame_numbers.astype(np.int64), coordinates
+
+
+def _is_sorted(values: list, start: int = 0) -> bool:
+    return all(values[i] <= values[i + 1] for i in range(max(start, 0), len(values) - 1))
+
+
+def _interpolate_boxes(x: np.ndarray, y: np.ndarray, query: np.ndarray, method: str = "linear") -> np.ndarray:
+    r""" Interpolate the columns of ``y``, sampled at sorted ``x``, at ``query`` within ``[x[0], x[-1]]``. """
+    if len(x) == 1:
+        return np.repeat(y, len(query), axis=0)
+    # Segment of every query point, such that x[i] <= q <= x[i + 1].
+    i = np.clip(np.searchsorted(x, query, side='right') - 1, 0, len(x) - 2)
+    h = np.diff(x).astype(np.float64)
+    left = (query - x[i])[:, None]
+    right = (x[i + 1] - query)[:, None]
+    hi = h[i][:, None]
+    if method == "linear" or len(x) < 3:
+        return (y[i] * right + y[i + 1] * left) / hi
+
+    # Natural cubic spline: solve for the second derivatives m at the knots, with m[0] = m[-1] = 0, for all
+    # columns at once.
+    n = len(x)
+    system = np.zeros((n - 2, n - 2))
+    interior = np.arange(n - 2)
+    system[interior, interior] = 2 * (h[:-1] + h[1:])
+    system[interior[1:], interior[:-1]] = h[1:-1]
+    system[interior[:-1], interior[1:]] = h[1:-1]
+    slopes = np.diff(y, axis=0) / h[:, None]
+    m = np.zeros_like(y)
+    m[1:-1] = np.linalg.solve(system, 6 * np.diff(slopes, axis=0))
+    return (m[i] * right ** 3 / (6 * hi) + m[i + 1] * left ** 3 / (6 * hi)
+            + (y[i] / hi - m[i] * hi / 6) * right + (y[i + 1] / hi - m[i + 1] * hi / 6) * left)
+
+
+def _video_from_dict(video_dict: dict) -> Video:
+    frame, plate = Frame.from_trusted, Plate.from_trusted
+    return Video.from_trusted(
+        video_dict.get('video_id'),
+        video_dict.get('source'),
+        video_dict.get('url'),
+        video_dict.get('fps'),
+        [plate(plate_dict.get('label'),
+               plate_dict.get('vehicle_type'),
+               plate_dict.get('frame_start'),
+               plate_dict.get('frame_end'),
+               [frame(frame_dict.get('frame'), frame_dict.get('bbox')) for frame_dict in plate_dict.get('frames', ())])
+         for plate_dict in video_dict.get('plates', ())],
+    )
+
+
+def _video_data(video: Video) -> dict:
+    return {
+        "video_id": video.video_id,
+        "source": video.source,
+        "url": video.url,
+        "fps": video.fps,
+        "plates": [{
+            "label": plate.label,
+            "vehicle_type": plate.vehicle_type,
+            "frame_start": plate.frame_start,
+            "frame_end": plate.frame_end,
+            "frames": [{"frame": frame.frame, "bbox": frame.bbox} for frame in plate.frames],
+        } for plate in video.plates],
+    }
+
+
+def _dumps_videos(videos: list[Video], indent: int = 2, compact: bool = False) -> str:
+    if orjson is not None and (compact or indent == 2):
+        data = [_video_data(video) for video in videos]
+        dumped = orjson.dumps(data, option=0 if compact else orjson.OPT_INDENT_2).decode('utf-8')
+        # orjson writes non-ASCII characters as UTF-8 where ``json`` escapes them, so only ASCII output is used.
+        if dumped.isascii():
+            return dumped
+    if ujson is not None and (compact or indent):
+        data = [_video_data(video) for video in videos]
+        return ujson.dumps(data, indent=0 if compact else indent, ensure_ascii=True, escape_forward_slashes=False)
+    return ''.join(_iter_json_chunks(videos, indent, compact))
+
+
+def _iter_json_chunks(videos: list[Video], indent: int = 2, compact: bool = False):
+    r""" Yield the JSON text of ``videos`` chunk by chunk, formatted like ``json.dumps``. """
+    if compact:
+        indent = None
+        item_separator, key_separator = ',', ':'
+    elif indent is None:
+        item_separator, key_separator = ', ', ': '
+    else:
+        item_separator, key_separator = ',', ': '
+    if indent is None:
+        newline = [''] * 8
+    else:
+        newline = ['\n' + ' ' * (indent * level) for level in range(8)]
+    separator = [item_separator + nl for nl in newline]
+
+    def value(v) -> str:
+        if type(v) is int:
+            return int.__repr__(v)
+        if type(v) is str:
+            return _encode_string(v)
+        if v is None:
+            return 'null'
+        return json.dumps(v)
+
+    def array(items, level: int, render) -> str:
+        if not items:
+            return '[]'
+        return '[' + newline[level] + separator[level].join([render(item) for item in items]) + newline[level - 1] + ']'
+
+    def field(name: str, level: int) -> str:
+        return newline[level] + '"' + name + '"' + key_separator
+
+    frame_head = '{' + field('frame', 6)
+    frame_bbox = item_separator + field('bbox', 6)
+    frame_tail = newline[5] + '}'
+
+    def frame_json(frame: Frame) -> str:
+        return frame_head + value(frame.frame) + frame_bbox + (
+            'null' if frame.bbox is None else array(frame.bbox, 7, value)) + frame_tail
+
+    plate_fields = ['{' + field('label', 4)] + [item_separator + field(name, 4) for name in
+                                                ('vehicle_type', 'frame_start', 'frame_end', 'frames')]
+    plate_tail = newline[3] + '}'
+
+    def plate_json(plate: Plate) -> str:
+        return (plate_fields[0] + value(plate.label) + plate_fields[1] + value(plate.vehicle_type)
+                + plate_fields[2] + value(plate.frame_start) + plate_fields[3] + value(plate.frame_end)
+                + plate_fields[4] + array(plate.frames, 5, frame_json) + plate_tail)
+
+    video_fields = ['{' + field('video_id', 2)] + [item_separator + field(name, 2) for name in
+                                                   ('source', 'url', 'fps', 'plates')]
+    video_tail = newline[1] + '}'
+
+    if not videos:
+        yield '[]'
+        return
+    for i, video in enumerate(videos):
+        yield '[' + newline[1] if i == 0 else separator[1]
+        yield (video_fields[0] + value(video.video_id) + video_fields[1] + value(video.source)
+               + video_fields[2] + value(video.url) + video_fields[3] + value(video.fps)
+               + video_fields[4] + array(video.plates, 3, plate_json) + video_tail)
+    yield newline[0] + ']'
+
+
+_WHITESPACE = re.compile(r'\s*')
+
+
+def _iter_json_array(json_filepath: str, chunk_size: int = 1 << 20):
+    r""" Incrementally parse the top-level array of a JSON file and yield its items one at a time. """
+    decoder = json.JSONDecoder()
+    with open(json_filepath, 'r') as f:
+        buffer = ''
+        pos = 0
+        eof = False
+        expect = '['
+
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                if eof:
+                    raise json.JSONDecodeError("Unexpected end of JSON array", buffer, pos)
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+
+            char = buffer[pos]
+            if expect == '[':
+                if char != '[':
+                    raise json.JSONDecodeError("Expecting '['", buffer, pos)
+                pos += 1
+                expect = 'first'
+            elif expect in ('first', 'item'):
+                if expect == 'first' and char == ']':
+                    return
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    item, end = None, None
+                # An item not followed by a delimiter may be truncated (e.g. a number), so read on.
+                if end is None or not eof and (end == len(buffer) or buffer[end] not in ' \t\n\r,]'):
+                    # Read at least as much as is already buffered so a large item is re-parsed O(log n) times.
+                    chunk = f.read(max(chunk_size, len(buffer) - pos))
+                    eof = not chunk
+                    buffer, pos = buffer[pos:] + chunk, 0
+                    continue
+                yield item
+                pos = end
+                expect = ','
+            else:
+                if char == ']':
+                    return
+                if char != ',':
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+                pos += 1
+                expect = 'item'
@@ -0,0 +1,273 @@
+import io
+import os
+from typing import Callable, Iterable, Optional
+
+import cv2
+import numpy as np
+
+from icvlp.journal import write_atomic
+from icvlp.object import Video
+from icvlp.video import read_frames
+
+Detector = Callable[[list[np.ndarray]], list[tuple[np.ndarray, np.ndarray]]]
+r""" Detects objects in a batch of images and returns ``(boxes, confidences)`` for every image, with ``boxes`` an
+``(N, 4)`` array of ``[x_min, y_min, x_max, y_max]`` and ``confidences`` an ``(N,)`` array."""
+
+
+class Proposals:
+    r""" Detector proposals for the frames of one video.
+
+    Boxes of all frames are stored in flat arrays: the boxes of ``frame_numbers[i]`` are
+    ``boxes[offsets[i]:offsets[i + 1]]``.
+
+    Arguments:
+        frame_numbers (np.ndarray): Sorted frame numbers, ``int32``.
+        offsets (np.ndarray): Start of the boxes of every frame, ``int64`` of length ``len(frame_numbers) + 1``.
+        boxes (np.ndarray): Boxes ``[x_min, y_min, x_max, y_max]`` in pixels, ``float32`` of shape ``(N, 4)``.
+        confidences (np.ndarray): Confidence of every box, ``float32``.
+        shape (tuple): Shape ``(height, width, depth)`` of the frames.
+    """
+
+    def __init__(self,
+                 frame_numbers: np.ndarray,
+                 offsets: np.ndarray,
+                 boxes: np.ndarray,
+                 confidences: np.ndarray,
+                 shape: tuple) -> None:
+        self.frame_numbers: np.ndarray = frame_numbers
+        self.offsets: np.ndarray = offsets
+        self.boxes: np.ndarray = boxes
+        self.confidences: np.ndarray = confidences
+        self.shape: tuple = tuple(int(n) for n in shape)
+
+    def __len__(self) -> int:
+        return len(self.frame_numbers)
+
+    def __contains__(self, frame_number: int) -> bool:
+        i = np.searchsorted(self.frame_numbers, frame_number)
+        return i < len(self.frame_numbers) and self.frame_numbers[i] == frame_number
+
+    def get(self, frame_number: int) -> tuple[np.ndarray, np.ndarray]:
+        r""" Get the proposals of a frame.
+
+        Arguments:
+            frame_number (int): The frame number.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Boxes and confidences, sorted by decreasing confidence. Empty if the frame
+            has no proposals.
+        """
+        i = int(np.searchsorted(self.frame_numbers, frame_number))
+        if i == len(self.frame_numbers) or self.frame_numbers[i] != frame_number:
+            return self.boxes[:0], self.confidences[:0]
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.boxes[start:end], self.confidences[start:end]
+
+    def detections(self) -> dict[int, tuple[np.ndarray, np.ndarray]]:
+        r""" Unpack the proposals per frame, the inverse of :py:meth:`from_detections`.
+
+        Returns:
+            Dict[int, Tuple[np.ndarray, np.ndarray]]: Boxes and confidences of every frame number.
+        """
+        return {frame_number: (self.boxes[start:end], self.confidences[start:end])
+                for frame_number, start, end in zip(self.frame_numbers.tolist(), self.offsets[:-1].tolist(),
+                                                    self.offsets[1:].tolist())}
+
+    @classmethod
+    def from_detections(cls, detections: dict[int, tuple[np.ndarray, np.ndarray]], shape: tuple) -> "Proposals":
+        r""" Pack per-frame detections.
+
+        Arguments:
+            detections (Dict[int, Tuple[np.ndarray, np.ndarray]]): Boxes and confidences of every frame number.
+            shape (tuple): Shape of the frames.
+
+        Returns:
+            Proposals
+        """
+        frame_numbers = sorted(detections)
+        boxes, confidences = [np.zeros((0, 4), dtype=np.float32)], [np.zeros(0, dtype=np.float32)]
+        counts = []
+        for frame_number in frame_numbers:
+            frame_boxes, frame_confidences = detections[frame_number]
+            order = np.argsort(-np.asarray(frame_confidences, dtype=np.float32), kind='stable')
+            boxes.append(np.asarray(frame_boxes, dtype=np.float32).reshape(-1, 4)[order])
+            confidences.append(np.asarray(frame_confidences, dtype=np.float32)[order])
+            counts.append(len(order))
+        offsets = np.zeros(len(frame_numbers) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(np.asarray(frame_numbers, dtype=np.int32), offsets,
+                   np.concatenate(boxes), np.concatenate(confidences), shape)
+
+    def save(self, path: str) -> None:
+        r""" Write the proposals atomically to an ``.npz`` file.
+
+        Arguments:
+            path (str): Output file.
+        """
+        buffer = io.BytesIO()
+        np.savez(buffer, frame_numbers=self.frame_numbers, offsets=self.offsets, boxes=self.boxes,
+                 confidences=self.confidences, shape=np.asarray(self.shape, dtype=np.int64))
+        write_atomic(path, buffer.getvalue())
+
+    @classmethod
+    def load(cls, path: str) -> "Proposals":
+        r""" Read proposals written by :py:meth:`save`.
+
+        Arguments:
+            path (str): ``.npz`` file.
+
+        Returns:
+            Proposals
+        """
+        with np.load(path) as data:
+            return cls(data['frame_numbers'], data['offsets'], data['boxes'], data['confidences'],
+                       tuple(data['shape']))
+
+
+class ProposalCache:
+    r""" Directory of cached :py:class:`Proposals`, one ``<video_id>.npz`` file per video.
+
+    Arguments:
+        directory (str): Cache directory. Created if it does not exist.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory: str = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, video_id: str) -> str:
+        return os.path.join(self.directory, f"{video_id}.npz")
+
+    def __contains__(self, video_id: str) -> bool:
+        return os.path.exists(self.path(video_id))
+
+    def get(self, video_id: str) -> Optional[Proposals]:
+        r""" Get the cached proposals of a video.
+
+        Arguments:
+            video_id (str): The video ID.
+
+        Returns:
+            Proposals: The proposals, or None if they are not cached.
+        """
+        path = self.path(video_id)
+        if not os.path.exists(path):
+            return None
+        return Proposals.load(path)
+
+    def put(self, video_id: str, proposals: Proposals) -> None:
+        proposals.save(self.path(video_id))
+
+
+def plate_frame_numbers(video: Video, step: int) -> list[int]:
+    r""" Get the frame numbers ``frame_start, frame_start + step, ..., frame_end`` of every plate of a video.
+
+    Arguments:
+        video (Video): The video.
+        step (int): Number of video frames between labelled frames.
+
+    Returns:
+        List[int]: Sorted, unique frame numbers.
+    """
+    frame_numbers = set()
+    for plate in video.plates:
+        frame_numbers.update(range(plate.frame_start, plate.frame_end + 1, step))
+    return sorted(frame_numbers)
+
+
+def detect_frames(cap: cv2.VideoCapture,
+                  frame_numbers: Iterable[int],
+                  detector: Detector,
+                  batch_size: int = 16) -> Proposals:
+    r""" Run a detector over frames of a video in batches.
+
+    Frames are decoded in one forward pass with :py:func:`icvlp.video.read_frames` and passed to ``detector``
+    ``batch_size`` at a time, so the per-call overhead of the model is paid once per batch instead of once per
+    frame.
+
+    Arguments:
+        cap (cv2.VideoCapture): Opened video.
+        frame_numbers (Iterable[int]): Frames to detect on.
+        detector (Detector): Batch detector.
+        batch_size (int, optional): Number of frames per detector call. Default: ``16``.
+
+    Returns:
+        Proposals
+    """
+    detections: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+    shape: tuple = (0, 0, 0)
+    batch_numbers: list[int] = []
+    batch: list[np.ndarray] = []
+
+    def flush() -> None:
+        results = detector(batch)
+        if len(results) != len(batch):
+            raise ValueError(f"Detector returned {len(results)} results for {len(batch)} images.")
+        detections.update(zip(batch_numbers, results))
+        batch_numbers.clear()
+        batch.clear()
+
+    for frame_number, image in read_frames(cap, frame_numbers):
+        shape = image.shape
+        batch_numbers.append(frame_number)
+        batch.append(image)
+        if len(batch) == batch_size:
+            flush()
+    if batch:
+        flush()
+    return Proposals.from_detections(detections, shape)
+
+
+def propose_video(video: Video,
+                  video_filename: str,
+                  detector: Detector,
+                  cache: ProposalCache,
+                  batch_size: int = 16,
+                  overwrite: bool = False,
+                  step: Optional[int] = None) -> Proposals:
+    r""" Compute and cache the proposals of every plate frame of a video.
+
+    Cached proposals are reused for the frames they cover. The detector only runs on the frames missing from the
+    cache, e.g. of plates added since or sampled with another ``step``, and their proposals are merged into the
+    cache. Frames that cannot be decoded are cached without proposals, so they are not decoded again.
+
+    Arguments:
+        video (Video): The video.
+        video_filename (str): Path of the video file.
+        detector (Detector): Batch detector.
+        cache (ProposalCache): The cache.
+        batch_size (int, optional): Number of frames per detector call. Default: ``16``.
+        overwrite (bool, optional): Recompute proposals that are already cached. Default: ``False``.
+        step (int, optional): Number of video frames between labelled frames. Default: the FPS of the video file
+            divided by ``video.fps``.
+
+    Returns:
+        Proposals
+    """
+    cached = None if overwrite else cache.get(video.video_id)
+    # The video is only opened if the step is not given or frames are missing.
+    cap: Optional[cv2.VideoCapture] = None
+    try:
+        if step is None:
+            cap = cv2.VideoCapture(video_filename)
+            step = int(cap.get(cv2.CAP_PROP_FPS) // video.fps)
+        frame_numbers = np.asarray(plate_frame_numbers(video, step), dtype=np.int64)
+        if cached is not None:
+            frame_numbers = frame_numbers[~np.isin(frame_numbers, cached.frame_numbers)]
+            if not len(frame_numbers):
+                return cached
+        if cap is None:
+            cap = cv2.VideoCapture(video_filename)
+        proposals = detect_frames(cap, frame_numbers.tolist(), detector, batch_size)
+    finally:
+        if cap is not None:
+            cap.release()
+
+    detections = cached.detections() if cached is not None else {}
+    empty = (np.zeros((0, 4), dtype=np.float32), np.zeros(0, dtype=np.float32))
+    detections.update(dict.fromkeys(frame_numbers.tolist(), empty))
+    detections.update(proposals.detections())
+    shape = proposals.shape if any(proposals.shape) or cached is None else cached.shape
+    proposals = Proposals.from_detections(detections, shape)
+    cache.put(video.video_id, proposals)
+    return proposals
@@ -0,0 +1,242 @@
+import re
+from bisect import bisect_left
+from typing import Iterable, Iterator, Optional, Pattern, Union
+
+from icvlp.object import ICVLP, Frame, Plate, Video
+
+# Default of the filters of ``Query.filter``, so that ``None`` can be matched as a value.
+ANY = object()
+
+
+class DatasetIndex:
+    r""" Inverted indexes over the plates of a dataset.
+
+    Plates are numbered in dataset order, and every index maps a key to the sorted numbers of its plates, so
+    filters are answered with set intersections instead of scanning ``videos -> plates``. Built by
+    :py:meth:`icvlp.object.ICVLP.query`; see there for when it is rebuilt.
+
+    Arguments:
+        dataset (ICVLP): The dataset.
+    """
+
+    def __init__(self, dataset: ICVLP):
+        self.videos: list[Video] = []
+        self.plates: list[Plate] = []
+        self.video_of: list[int] = []
+        self.by_video_id: dict[str, list[int]] = {}
+        self.by_source: dict[Optional[str], list[int]] = {}
+        self.by_label: dict[str, list[int]] = {}
+        self.by_vehicle_type: dict[Optional[str], list[int]] = {}
+        self.unannotated: set[int] = set()
+
+        # Indexed videos and plates share the revision of the dataset, so that their append and extend mark the
+        # index as stale.
+        revision = dataset._revision
+        for video_number, video in enumerate(dataset.videos):
+            video._revision = revision
+            self.videos.append(video)
+            numbers = self.by_video_id.setdefault(video.video_id, [])
+            source = self.by_source.setdefault(video.source, [])
+            for plate in video.plates:
+                number = len(self.plates)
+                plate._revision = revision
+                self.plates.append(plate)
+                self.video_of.append(video_number)
+                numbers.append(number)
+                source.append(number)
+                self.by_label.setdefault(plate.label, []).append(number)
+                self.by_vehicle_type.setdefault(plate.vehicle_type, []).append(number)
+                if not any(frame.bbox is not None for frame in plate.frames):
+                    self.unannotated.add(number)
+        self.labels: list[str] = sorted(label for label in self.by_label if label is not None)
+
+    def __len__(self) -> int:
+        return len(self.plates)
+
+    def lookup(self, index: dict, keys) -> set[int]:
+        r""" Numbers of the plates of one or more keys of ``index``. """
+        if isinstance(keys, (str, type(None))):
+            keys = [keys]
+        return {number for key in keys for number in index.get(key, ())}
+
+    def labels_with_prefix(self, prefix: str) -> list[str]:
+        r""" Distinct labels starting with ``prefix``, found by bisecting the sorted labels. """
+        start = bisect_left(self.labels, prefix)
+        end = start
+        while end < len(self.labels) and self.labels[end].startswith(prefix):
+            end += 1
+        return self.labels[start:end]
+
+
+class Query:
+    r""" Filters over the plates and frames of a dataset.
+
+    Returned by :py:meth:`icvlp.object.ICVLP.query`. Filters are combined with *and*; :py:meth:`filter` returns a
+    new query, so queries can be refined and reused:
+
+        >>> semi_trailers = dataset.query(vehicle_type='semi_trailer')
+        >>> for video, plate in semi_trailers.filter(annotated=False):
+        ...     print(video.video_id, plate.label)
+
+    Label, vehicle type, source and video ID filters and ``annotated`` are answered from the indexes of
+    :py:class:`DatasetIndex`; frame range and bounding box size filters are then checked on the remaining
+    plates only.
+
+    Arguments:
+        dataset (ICVLP): The dataset.
+    """
+
+    def __init__(self, dataset: ICVLP, filters: dict = None):
+        self.dataset: ICVLP = dataset
+        self.filters: dict = filters or {}
+
+    def filter(self,
+               video_id: Union[str, Iterable[str]] = ANY,
+               source: Union[Optional[str], Iterable[Optional[str]]] = ANY,
+               vehicle_type: Union[Optional[str], Iterable[Optional[str]]] = ANY,
+               label: Union[str, Iterable[str]] = ANY,
+               label_prefix: str = ANY,
+               label_regex: Union[str, Pattern] = ANY,
+               annotated: bool = ANY,
+               frame_range: tuple[int, int] = ANY,
+               min_bbox_size: tuple[int, int] = ANY,
+               max_bbox_size: tuple[int, int] = ANY) -> "Query":
+        r""" Returns a query with additional filters.
+
+        Arguments:
+            video_id (str or Iterable[str], optional): Video ID, or any of several.
+            source (str or Iterable[str], optional): Source of the video, or any of several. ``None`` matches
+                videos without a source.
+            vehicle_type (str or Iterable[str], optional): Vehicle type, or any of several. ``None`` matches plates
+                whose vehicle type is not labelled yet.
+            label (str or Iterable[str], optional): Plate label, or any of several.
+            label_prefix (str, optional): Start of the plate label.
+            label_regex (str or Pattern, optional): Regular expression searched in the plate label.
+            annotated (bool, optional): ``True`` for plates with at least one bounding box, ``False`` for plates
+                without any.
+            frame_range (Tuple[int, int], optional): ``(start, end)``. Plates that occur in this range of frames;
+                :py:meth:`frames` only returns frames in it.
+            min_bbox_size (Tuple[int, int], optional): ``(width, height)``. Plates with a bounding box at least this
+                large; :py:meth:`frames` only returns such frames.
+            max_bbox_size (Tuple[int, int], optional): ``(width, height)``. As ``min_bbox_size``, at most this large.
+
+        Returns:
+            Query
+        """
+        filters = dict(self.filters)
+        filters.update((name, value) for name, value in [
+            ("video_id", video_id),
+            ("source", source),
+            ("vehicle_type", vehicle_type),
+            ("label", label),
+            ("label_prefix", label_prefix),
+            ("label_regex", label_regex),
+            ("annotated", annotated),
+            ("frame_range", frame_range),
+            ("min_bbox_size", min_bbox_size),
+            ("max_bbox_size", max_bbox_size),
+        ] if value is not ANY)
+        return Query(self.dataset, filters)
+
+    def __iter__(self) -> Iterator[tuple[Video, Plate]]:
+        index = self.dataset.query_index
+        return ((index.videos[index.video_of[number]], index.plates[number]) for number in self._plate_numbers())
+
+    def __len__(self) -> int:
+        return len(self._plate_numbers())
+
+    def count(self) -> int:
+        r""" Returns the number of matching plates. """
+        return len(self)
+
+    def plates(self) -> list[Plate]:
+        r""" Returns the matching plates, in dataset order. """
+        index = self.dataset.query_index
+        return [index.plates[number] for number in self._plate_numbers()]
+
+    def videos(self) -> list[Video]:
+        r""" Returns the videos with at least one matching plate, in dataset order. """
+        return [video for video, _ in self.by_video()]
+
+    def by_video(self) -> list[tuple[Video, list[Plate]]]:
+        r""" Returns the matching plates grouped by video, in dataset order.
+
+        Returns:
+            List[Tuple[Video, List[Plate]]]
+        """
+        index = self.dataset.query_index
+        groups: list[tuple[Video, list[Plate]]] = []
+        last = None
+        for number in self._plate_numbers():
+            video_number = index.video_of[number]
+            if video_number != last:
+                groups.append((index.videos[video_number], []))
+                last = video_number
+            groups[-1][1].append(index.plates[number])
+        return groups
+
+    def frames(self) -> Iterator[tuple[Video, Plate, Frame]]:
+        r""" Iterate over the frames of the matching plates that pass the frame range and bounding box filters.
+
+        Yields:
+            Tuple[Video, Plate, Frame]
+        """
+        for video, plate in self:
+            for frame in self._frames_of(plate):
+                yield video, plate, frame
+
+    def _plate_numbers(self) -> list[int]:
+        index = self.dataset.query_index
+        filters = self.filters
+        candidates: Optional[set[int]] = None
+
+        def narrow(numbers: set[int]):
+            nonlocal candidates
+            candidates = numbers if candidates is None else candidates & numbers
+
+        if "video_id" in filters:
+            narrow(index.lookup(index.by_video_id, filters["video_id"]))
+        if "source" in filters:
+            narrow(index.lookup(index.by_source, filters["source"]))
+        if "vehicle_type" in filters:
+            narrow(index.lookup(index.by_vehicle_type, filters["vehicle_type"]))
+        if "label" in filters:
+            narrow(index.lookup(index.by_label, filters["label"]))
+        if "label_prefix" in filters:
+            narrow(index.lookup(index.by_label, index.labels_with_prefix(filters["label_prefix"])))
+        if "label_regex" in filters:
+            pattern = re.compile(filters["label_regex"])
+            narrow(index.lookup(index.by_label, [label for label in index.labels if pattern.search(label)]))
+        if filters.get("annotated") is False:
+            narrow(index.unannotated)
+
+        numbers = sorted(candidates) if candidates is not None else range(len(index))
+        if filters.get("annotated") is True:
+            numbers = [number for number in numbers if number not in index.unannotated]
+        if any(name in filters for name in ("frame_range", "min_bbox_size", "max_bbox_size")):
+            numbers = [number for number in numbers if self._plate_matches(index.plates[number])]
+        return list(numbers)
+
+    def _plate_matches(self, plate: Plate) -> bool:
+        if "frame_range" in self.filters:
+            start, end = self.filters["frame_range"]
+            if plate.frame_end is not None and plate.frame_end < start:
+                return False
+            if plate.frame_start is not None and plate.frame_start > end:
+                return False
+        if "min_bbox_size" in self.filters or "max_bbox_size" in self.filters:
+            return next(iter(self._frames_of(plate)), None) is not None
+        return True
+
+    def _frames_of(self, plate: Plate) -> Iterable[Frame]:
+        frames = plate.frames
+        if "frame_range" in self.filters:
+            frames = plate.frames_between(*self.filters["frame_range"])
+        if "min_bbox_size" not in self.filters and "max_bbox_size" not in self.filters:
+            return frames
+        min_width, min_height = self.filters.get("min_bbox_size", (0, 0))
+        max_width, max_height = self.filters.get("max_bbox_size", (float("inf"), float("inf")))
+        return (frame for frame in frames
+                if frame.bbox is not None
+                and min_width <= frame.bbox[2] - frame.bbox[0] <= max_width
+                and min_height <= frame.bbox[3] - frame.bbox[1] <= max_height)
@@ -0,0 +1,244 @@
+import json
+from collections import Counter
+from typing import Iterable, Optional, Union
+
+import numpy as np
+
+from icvlp.object import ICVLP, Video
+from icvlp.store import MISSING, AnnotationStore
+
+
+class DatasetStats:
+    r""" Statistics of a dataset, accumulated one video at a time.
+
+    Counts are kept in sets and counters, and bounding box sizes in NumPy arrays, so statistics can be computed
+    while a dataset streams from disk and merged across shards:
+
+        >>> stats = DatasetStats().update_many(ICVLP.iter_json('icvlp_v0.1.json'))
+        >>> print(stats.to_table())
+
+    ``vehicles_by_type`` counts every distinct plate label once, with the vehicle type of its first occurrence;
+    ``plates_by_type`` counts every plate.
+    """
+
+    def __init__(self) -> None:
+        self.num_videos: int = 0
+        self.num_plates: int = 0
+        self.num_frames: int = 0
+        self.labels: dict[str, Optional[str]] = {}
+        self.plates_by_type: Counter = Counter()
+        self.sources: dict[Optional[str], Counter] = {}
+        self._frames_per_plate: list[np.ndarray] = []
+        self._bbox_sizes: list[np.ndarray] = []
+
+    @classmethod
+    def from_dataset(cls, dataset: Union[ICVLP, AnnotationStore, Iterable[Video]]) -> "DatasetStats":
+        r""" Compute the statistics of a dataset.
+
+        An :py:class:`icvlp.store.AnnotationStore` is summarized with array operations on its columns; any other
+        dataset is iterated video by video.
+
+        Arguments:
+            dataset (ICVLP, AnnotationStore or Iterable[Video]): The dataset.
+
+        Returns:
+            DatasetStats
+        """
+        if isinstance(dataset, AnnotationStore):
+            return cls().update_store(dataset)
+        return cls().update_many(dataset.videos if isinstance(dataset, ICVLP) else dataset)
+
+    @property
+    def num_distinct_labels(self) -> int:
+        return len(self.labels)
+
+    @property
+    def vehicles_by_type(self) -> Counter:
+        return Counter(self.labels.values())
+
+    @property
+    def frames_per_plate(self) -> np.ndarray:
+        return _concatenate(self._frames_per_plate, dtype=np.int64)
+
+    @property
+    def bbox_sizes(self) -> np.ndarray:
+        r""" Width and height of every bounding box, as an ``(N, 2)`` array. """
+        return _concatenate(self._bbox_sizes, dtype=np.int64).reshape(-1, 2)
+
+    def update(self, video: Video) -> "DatasetStats":
+        r""" Add a video to the statistics.
+
+        Arguments:
+            video (Video): The video.
+
+        Returns:
+            DatasetStats
+        """
+        frames_per_plate = []
+        bboxes = []
+        for plate in video.plates:
+            self.labels.setdefault(plate.label, plate.vehicle_type)
+            self.plates_by_type[plate.vehicle_type] += 1
+            frames_per_plate.append(len(plate.frames))
+            bboxes.extend(frame.bbox for frame in plate.frames if frame.bbox is not None)
+        num_frames = sum(frames_per_plate)
+        self.num_videos += 1
+        self.num_plates += len(frames_per_plate)
+        self.num_frames += num_frames
+        self.sources.setdefault(video.source, Counter()).update(
+            {"videos": 1, "plates": len(frames_per_plate), "frames": num_frames})
+        self._frames_per_plate.append(np.asarray(frames_per_plate, dtype=np.int64))
+        bboxes = np.asarray(bboxes, dtype=np.int64).reshape(-1, 4)
+        self._bbox_sizes.append(bboxes[:, 2:] - bboxes[:, :2])
+        return self
+
+    def update_many(self, videos: Iterable[Video]) -> "DatasetStats":
+        for video in videos:
+            self.update(video)
+        return self
+
+    def update_store(self, store: AnnotationStore) -> "DatasetStats":
+        r""" Add every video of an :py:class:`icvlp.store.AnnotationStore` with array operations.
+
+        Arguments:
+            store (AnnotationStore): The store.
+
+        Returns:
+            DatasetStats
+        """
+        frames_per_plate = np.diff(store.frame_offsets)
+        plates_per_video = np.diff(store.plate_offsets)
+        frames_per_video = store.frame_offsets[store.plate_offsets[1:]] - store.frame_offsets[store.plate_offsets[:-1]]
+
+        self.num_videos += store.num_videos
+        self.num_plates += store.num_plates
+        self.num_frames += store.num_frames
+
+        # First occurrence of every label, in plate order.
+        label_codes, first = np.unique(np.asarray(store.label_codes), return_index=True)
+        for code, plate_index in zip(label_codes.tolist(), first.tolist()):
+            label = store.labels.decode(code)
+            self.labels.setdefault(label, store.vehicle_types.decode(int(store.vehicle_type_codes[plate_index])))
+        type_codes, type_counts = np.unique(np.asarray(store.vehicle_type_codes), return_counts=True)
+        for code, count in zip(type_codes.tolist(), type_counts.tolist()):
+            self.plates_by_type[store.vehicle_types.decode(code)] += count
+
+        for video_index, source in enumerate(store.sources):
+            self.sources.setdefault(source, Counter()).update({
+                "videos": 1,
+                "plates": int(plates_per_video[video_index]),
+                "frames": int(frames_per_video[video_index]),
+            })
+
+        self._frames_per_plate.append(frames_per_plate.astype(np.int64))
+        bboxes = np.asarray(store.bboxes, dtype=np.int64)
+        bboxes = bboxes[(bboxes != MISSING).any(axis=1)]
+        self._bbox_sizes.append(bboxes[:, 2:] - bboxes[:, :2])
+        return self
+
+    def merge(self, other: "DatasetStats") -> "DatasetStats":
+        r""" Add the statistics of another part of the dataset, e.g. computed in another process. """
+        self.num_videos += other.num_videos
+        self.num_plates += other.num_plates
+        self.num_frames += other.num_frames
+        for label, vehicle_type in other.labels.items():
+            self.labels.setdefault(label, vehicle_type)
+        self.plates_by_type.update(other.plates_by_type)
+        for source, counts in other.sources.items():
+            self.sources.setdefault(source, Counter()).update(counts)
+        self._frames_per_plate.extend(other._frames_per_plate)
+        self._bbox_sizes.extend(other._bbox_sizes)
+        return self
+
+    def as_dict(self) -> dict:
+        r""" Returns the statistics as a JSON-serializable dictionary.
+
+        Returns:
+            dict
+        """
+        sizes = self.bbox_sizes.astype(np.float64)
+        widths, heights = sizes[:, 0], sizes[:, 1]
+        aspect = np.divide(widths, heights, out=np.zeros_like(widths), where=heights > 0)
+        return {
+            "videos": self.num_videos,
+            "plates": self.num_plates,
+            "distinct_plates": self.num_distinct_labels,
+            "frames": self.num_frames,
+            "vehicles_by_type": _named_counts(self.vehicles_by_type),
+            "plates_by_type": _named_counts(self.plates_by_type),
+            "frames_per_plate": distribution(self.frames_per_plate),
+            "bbox_width": distribution(widths),
+            "bbox_height": distribution(heights),
+            "bbox_aspect_ratio": distribution(aspect),
+            "sources": {str(source): dict(counts) for source, counts in
+                        sorted(self.sources.items(), key=lambda item: str(item[0]))},
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.as_dict(), indent=indent)
+
+    def to_table(self) -> str:
+        r""" Returns the statistics as a plain-text table.
+
+        Returns:
+            str
+        """
+        data = self.as_dict()
+        rows = [(name.replace("_", " ").capitalize(), str(data[name]))
+                for name in ["videos", "plates", "distinct_plates", "frames"]]
+        for section in ["vehicles_by_type", "plates_by_type"]:
+            rows.append((section.replace("_", " ").capitalize(), ""))
+            rows.extend((f"  {name}", str(count)) for name, count in data[section].items())
+        for section in ["frames_per_plate", "bbox_width", "bbox_height", "bbox_aspect_ratio"]:
+            summary = data[section]
+            rows.append((section.replace("_", " ").capitalize(),
+                         "  ".join(f"{key} {_format_number(value)}" for key, value in summary.items())))
+        rows.append(("Sources", "videos / plates / frames"))
+        rows.extend((f"  {source}", f"{counts.get('videos', 0)} / {counts.get('plates', 0)} / "
+                                    f"{counts.get('frames', 0)}")
+                    for source, counts in data["sources"].items())
+        width = max(len(name) for name, _ in rows)
+        return "\n".join(f"{name:<{width}}  {value}".rstrip() for name, value in rows)
+
+
+def distribution(values: np.ndarray) -> dict:
+    r""" Summarize values by their count, mean and percentiles.
+
+    Arguments:
+        values (np.ndarray): The values.
+
+    Returns:
+        dict: ``count``, ``mean``, ``min``, ``p5``, ``p25``, ``median``, ``p75``, ``p95`` and ``max``. Only
+        ``count`` if there are no values.
+    """
+    values = np.asarray(values)
+    if not len(values):
+        return {"count": 0}
+    p5, p25, p50, p75, p95 = np.percentile(values, [5, 25, 50, 75, 95]).tolist()
+    return {
+        "count": int(len(values)),
+        "mean": float(values.mean()),
+        "min": values.min().item(),
+        "p5": p5,
+        "p25": p25,
+        "median": p50,
+        "p75": p75,
+        "p95": p95,
+        "max": values.max().item(),
+    }
+
+
+def _concatenate(chunks: list[np.ndarray], dtype) -> np.ndarray:
+    if not chunks:
+        return np.zeros(0, dtype=dtype)
+    return np.concatenate([chunk.reshape(-1) for chunk in chunks]).astype(dtype, copy=False)
+
+
+def _named_counts(counter: Counter) -> dict:
+    return {str(name): count for name, count in sorted(counter.items(), key=lambda item: (-item[1], str(item[0])))}
+
+
+def _format_number(value) -> str:
+    if isinstance(value, float) and not value.is_integer():
+        return f"{value:.2f}"
+    return str(int(value))
@@ -0,0 +1,616 @@
+import json
+from array import array
+from collections.abc import Sequence
+from typing import Iterable, Optional, Union
+
+import numpy as np
+
+from icvlp.object import ICVLP, Video, Plate, Frame, _iter_json_array
+
+MISSING = -1
+
+_MAGIC = b'ICVLPBIN'
+_VERSION = 1
+_ALIGNMENT = 64
+
+
+class StringTable:
+    r""" Table of distinct strings referenced by integer codes.
+
+    Repeated values such as labels or vehicle types are stored once. Code ``-1`` stands for ``None``.
+
+    Arguments:
+        strings (List[str], optional): Initial distinct strings.
+    """
+
+    def __init__(self, strings: Optional[Sequence[str]] = None):
+        self.strings: Sequence[str] = strings if strings is not None else []
+        self._codes: Optional[dict[str, int]] = None
+
+    def __len__(self):
+        return len(self.strings)
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return MISSING
+        if self._codes is None:
+            self.strings = list(self.strings)
+            self._codes = {string: code for code, string in enumerate(self.strings)}
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.strings)
+            self._codes[value] = code
+            self.strings.append(value)
+        return code
+
+    def decode(self, code: int) -> Optional[str]:
+        if code < 0:
+            return None
+        return self.strings[code]
+
+
+class PackedStrings(Sequence):
+    r""" Read-only sequence of strings packed into one UTF-8 byte array.
+
+    String ``i`` is ``data[offsets[i]:offsets[i + 1]]``. Strings are decoded only when accessed, so the arrays
+    can be memory-mapped.
+
+    Arguments:
+        data (np.ndarray): ``uint8`` array of concatenated UTF-8 strings.
+        offsets (np.ndarray): ``int64`` array of ``len(strings) + 1`` offsets into ``data``.
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data: np.ndarray = data
+        self.offsets: np.ndarray = offsets
+
+    @classmethod
+    def pack(cls, strings: Sequence[str]):
+        encoded = [string.encode('utf-8') for string in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(string) for string in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"String index out of range. Got {index}.")
+        return self.data[self.offsets[index]:self.offsets[index + 1]].tobytes().decode('utf-8')
+
+
+class CodedStrings(Sequence):
+    r""" Read-only sequence of optional strings stored as codes into a :py:class:`StringTable`.
+
+    Arguments:
+        table (StringTable): Distinct strings.
+        codes (np.ndarray): ``int32`` codes, ``-1`` for ``None``.
+    """
+
+    def __init__(self, table: StringTable, codes: np.ndarray):
+        self.table: StringTable = table
+        self.codes: np.ndarray = codes
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.table.decode(int(self.codes[index]))
+
+
+class FrameView:
+    r""" Read-only view of a single frame in an :py:class:`AnnotationStore`.
+
+    Exposes the same attributes as :py:class:`icvlp.object.Frame`.
+    """
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store: "AnnotationStore", index: int):
+        self._store = store
+        self._index = index
+
+    @property
+    def frame(self) -> Optional[int]:
+        return _optional_int(self._store.frame_numbers[self._index])
+
+    @property
+    def bbox(self) -> Optional[list[int]]:
+        bbox = self._store.bboxes[self._index].tolist()
+        if bbox == [MISSING] * 4:
+            return None
+        return bbox
+
+    def as_dict(self) -> dict:
+        return {"frame": self.frame, "bbox": self.bbox}
+
+
+class PlateView:
+    r""" Read-only view of a plate in an :py:class:`AnnotationStore`.
+
+    Exposes the same attributes as :py:class:`icvlp.object.Plate`. The ``frame_numbers`` and ``bboxes`` properties
+    return array slices of the underlying store without copying.
+    """
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store: "AnnotationStore", index: int):
+        self._store = store
+        self._index = index
+
+    @property
+    def label(self) -> Optional[str]:
+        return self._store.labels.decode(int(self._store.label_codes[self._index]))
+
+    @property
+    def vehicle_type(self) -> Optional[str]:
+        return self._store.vehicle_types.decode(int(self._store.vehicle_type_codes[self._index]))
+
+    @property
+    def frame_start(self) -> Optional[int]:
+        return _optional_int(self._store.frame_start[self._index])
+
+    @property
+    def frame_end(self) -> Optional[int]:
+        return _optional_int(self._store.frame_end[self._index])
+
+    @property
+    def _frame_slice(self) -> slice:
+        offsets = self._store.frame_offsets
+        return slice(int(offsets[self._index]), int(offsets[self._index + 1]))
+
+    @property
+    def frame_numbers(self) -> np.ndarray:
+        return self._store.frame_numbers[self._frame_slice]
+
+    @property
+    def bboxes(self) -> np.ndarray:
+        return self._store.bboxes[self._frame_slice]
+
+    @property
+    def frames(self) -> list[FrameView]:
+        return [FrameView(self._store, i) for i in range(*self._frame_slice.indices(self._store.num_frames))]
+
+    def check_frame_number_exists_in_children(self, frame_number: int) -> bool:
+        return bool(np.any(self.frame_numbers == frame_number))
+
+    def as_dict(self) -> dict:
+        return {
+            "label": self.label,
+            "vehicle_type": self.vehicle_type,
+            "frame_start": self.frame_start,
+            "frame_end": self.frame_end,
+            "frames": [frame.as_dict() for frame in self.frames],
+        }
+
+
+class VideoView:
+    r""" Read-only view of a video in an :py:class:`AnnotationStore`.
+
+    Exposes the same attributes as :py:class:`icvlp.object.Video`.
+    """
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store: "AnnotationStore", index: int):
+        self._store = store
+        self._index = index
+
+    @property
+    def video_id(self) -> str:
+        return self._store.video_ids[self._index]
+
+    @property
+    def source(self) -> Optional[str]:
+        return self._store.sources[self._index]
+
+    @property
+    def url(self) -> Optional[str]:
+        return self._store.urls[self._index]
+
+    @property
+    def fps(self) -> Optional[int]:
+        return _optional_int(self._store.fps[self._index])
+
+    @property
+    def plates(self) -> list[PlateView]:
+        offsets = self._store.plate_offsets
+        return [PlateView(self._store, i) for i in range(int(offsets[self._index]), int(offsets[self._index + 1]))]
+
+    def as_dict(self) -> dict:
+        return {
+            "video_id": self.video_id,
+            "source": self.source,
+            "url": self.url,
+            "fps": self.fps,
+            "plates": [plate.as_dict() for plate in self.plates],
+        }
+
+
+class AnnotationStore:
+    r""" Columnar, array-backed storage of an ICVLP dataset.
+
+    Instead of one Python object per frame, every frame of the dataset lives in two contiguous arrays:
+    ``frame_numbers`` of shape ``(N,)`` and ``bboxes`` of shape ``(N, 4)``. Plates and videos are rows of
+    their own columns, and offset arrays map plates to frames and videos to plates. The frames of plate ``i``
+    are ``frame_offsets[i]:frame_offsets[i + 1]``, and the plates of video ``j`` are
+    ``plate_offsets[j]:plate_offsets[j + 1]``.
+
+    :py:class:`VideoView`, :py:class:`PlateView` and :py:class:`FrameView` give read-only access with the same
+    attributes as the object API. Use :py:meth:`to_icvlp` to get a mutable :py:class:`icvlp.object.ICVLP`.
+
+    The store is a separate, read-only representation: :py:class:`icvlp.object.ICVLP` is not backed by it, so
+    loading with :py:meth:`icvlp.object.ICVLP.from_json` still builds one object per frame. Use the store, or
+    :py:class:`icvlp.object.LazyICVLP`, to read large datasets without materializing them.
+
+        >>> store = AnnotationStore.from_json('icvlp_v0.1.json')
+        >>> store.get_video_by_id('0001').plates[0].bboxes
+        array([[ 462,  992,  658, 1062]], dtype=int32)
+
+    Missing integers (``None`` in JSON) are stored as ``-1``. A missing bbox is stored as ``[-1, -1, -1, -1]``.
+    """
+
+    def __init__(self,
+                 video_ids: Sequence[str],
+                 sources: Sequence[Optional[str]],
+                 urls: Sequence[Optional[str]],
+                 fps: np.ndarray,
+                 plate_offsets: np.ndarray,
+                 labels: StringTable,
+                 label_codes: np.ndarray,
+                 vehicle_types: StringTable,
+                 vehicle_type_codes: np.ndarray,
+                 frame_start: np.ndarray,
+                 frame_end: np.ndarray,
+                 frame_offsets: np.ndarray,
+                 frame_numbers: np.ndarray,
+                 bboxes: np.ndarray):
+        self.video_ids: Sequence[str] = video_ids
+        self.sources: Sequence[Optional[str]] = sources
+        self.urls: Sequence[Optional[str]] = urls
+        self.fps: np.ndarray = fps
+        self.plate_offsets: np.ndarray = plate_offsets
+
+        self.labels: StringTable = labels
+        self.label_codes: np.ndarray = label_codes
+        self.vehicle_types: StringTable = vehicle_types
+        self.vehicle_type_codes: np.ndarray = vehicle_type_codes
+        self.frame_start: np.ndarray = frame_start
+        self.frame_end: np.ndarray = frame_end
+        self.frame_offsets: np.ndarray = frame_offsets
+
+        self.frame_numbers: np.ndarray = frame_numbers
+        self.bboxes: np.ndarray = bboxes
+
+        self._video_index: Optional[dict[str, int]] = None
+
+    @property
+    def num_videos(self) -> int:
+        return len(self.video_ids)
+
+    @property
+    def num_plates(self) -> int:
+        return len(self.label_codes)
+
+    @property
+    def num_frames(self) -> int:
+        return len(self.frame_numbers)
+
+    def __len__(self):
+        return self.num_videos
+
+    def __getitem__(self, index: int) -> VideoView:
+        if index < 0:
+            index += self.num_videos
+        if not 0 <= index < self.num_videos:
+            raise IndexError(f"Video index out of range. Got {index}.")
+        return VideoView(self, index)
+
+    def __iter__(self):
+        for i in range(self.num_videos):
+            yield VideoView(self, i)
+
+    @property
+    def videos(self) -> list[VideoView]:
+        return list(self)
+
+    def get_video_by_id(self, video_id: str) -> Optional[VideoView]:
+        if self._video_index is None:
+            self._video_index = {video_id: i for i, video_id in enumerate(self.video_ids)}
+        index = self._video_index.get(video_id)
+        if index is None:
+            return None
+        return VideoView(self, index)
+
+    @classmethod
+    def from_videos(cls, videos: Iterable[Union[dict, Video]]):
+        r""" Build a store from video dictionaries (as found in the JSON file) or :py:class:`icvlp.object.Video`.
+
+        Arguments:
+            videos (Iterable[dict or Video]): Videos to store.
+
+        Returns:
+            AnnotationStore
+        """
+        builder = _StoreBuilder()
+        for video in videos:
+            if isinstance(video, dict):
+                builder.add_video_dict(video)
+            else:
+                builder.add_video(video)
+        return builder.build()
+
+    @classmethod
+    def from_icvlp(cls, dataset: ICVLP):
+        r""" Build a store from an :py:class:`icvlp.object.ICVLP` instance.
+
+        Arguments:
+            dataset (ICVLP): Dataset to convert.
+
+        Returns:
+            AnnotationStore
+        """
+        return cls.from_videos(dataset.videos)
+
+    @classmethod
+    def from_dense_tracks(cls, videos: Iterable[Video], step: int = 1, method: str = "linear"):
+        r""" Build a store whose plates hold the interpolated boxes of :py:meth:`icvlp.object.Plate.dense_boxes`.
+
+        Arguments:
+            videos (Iterable[Video]): Videos to densify.
+            step (int, optional): Number of video frames between interpolated frames. Default: ``1``.
+            method (str, optional): ``'linear'`` or ``'cubic'``. Default: ``'linear'``.
+
+        Returns:
+            AnnotationStore
+        """
+        builder = _StoreBuilder()
+        for video in videos:
+            builder.add_video(video, plate_frames=(plate.dense_boxes(step, method) for plate in video.plates))
+        return builder.build()
+
+    @classmethod
+    def from_json(cls, json_filepath: str):
+        r""" Populate the store with data from JSON file without creating per-frame objects.
+
+        The file is parsed one video at a time.
+
+        Arguments:
+            json_filepath (str): Path to JSON file.
+
+        Returns:
+            AnnotationStore
+        """
+        return cls.from_videos(_iter_json_array(json_filepath))
+
+    def save(self, path: str):
+        r""" Write the store to a binary file.
+
+        The file starts with the magic bytes ``ICVLPBIN``, a ``uint32`` format version and the ``uint32`` length
+        of a JSON header. The header lists every array section by name with its byte offset, dtype and shape.
+        Sections are little-endian, 64-byte aligned and include the string tables of labels, vehicle types, video
+        IDs, sources and URLs (see :py:class:`PackedStrings`) and the packed frame and bbox arrays.
+
+        Arguments:
+            path (str): Path to the binary file.
+        """
+        arrays = {
+            "fps": self.fps,
+            "plate_offsets": self.plate_offsets,
+            "label_codes": self.label_codes,
+            "vehicle_type_codes": self.vehicle_type_codes,
+            "frame_start": self.frame_start,
+            "frame_end": self.frame_end,
+            "frame_offsets": self.frame_offsets,
+            "frame_numbers": self.frame_numbers,
+            "bboxes": self.bboxes,
+        }
+        tables = {"labels": self.labels, "vehicle_types": self.vehicle_types}
+        for name, column in [("video_ids", self.video_ids), ("sources", self.sources), ("urls", self.urls)]:
+            table = StringTable()
+            arrays[f"{name[:-1]}_codes"] = np.array([table.encode(value) for value in column], dtype=np.int32)
+            tables[name] = table
+        for name, table in tables.items():
+            packed = PackedStrings.pack(table.strings)
+            arrays[f"{name}.data"] = packed.data
+            arrays[f"{name}.offsets"] = packed.offsets
+
+        sections = {}
+        offset = 0
+        for name, data in arrays.items():
+            dtype = np.dtype(data.dtype).newbyteorder('<')
+            sections[name] = {"offset": offset, "dtype": dtype.str, "shape": list(data.shape)}
+            offset += _align(data.size * dtype.itemsize)
+        header = json.dumps({"sections": sections}).encode('utf-8')
+        data_start = _align(len(_MAGIC) + 8 + len(header))
+
+        with open(path, 'wb') as f:
+            f.write(_MAGIC)
+            f.write(np.array([_VERSION, len(header)], dtype='<u4').tobytes())
+            f.write(header)
+            for name, data in arrays.items():
+                f.seek(data_start + sections[name]["offset"])
+                f.write(np.ascontiguousarray(data, dtype=sections[name]["dtype"]).tobytes())
+            f.truncate(data_start + offset)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True):
+        r""" Open a binary file written by :py:meth:`save`.
+
+        With ``mmap=True`` every array is a read-only :py:class:`numpy.memmap`, so opening is near-instant and
+        data is read from disk only when it is accessed.
+
+        Arguments:
+            path (str): Path to the binary file.
+            mmap (bool, optional): Memory-map the arrays instead of reading them. Default: ``True``.
+
+        Returns:
+            AnnotationStore
+        """
+        with open(path, 'rb') as f:
+            magic = f.read(len(_MAGIC))
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not an ICVLP binary file.")
+            version, header_size = np.frombuffer(f.read(8), dtype='<u4').tolist()
+            if version != _VERSION:
+                raise ValueError(f"Unsupported ICVLP binary version {version}. Expected {_VERSION}.")
+            header = json.loads(f.read(header_size).decode('utf-8'))
+        data_start = _align(len(_MAGIC) + 8 + header_size)
+
+        arrays = {}
+        for name, section in header["sections"].items():
+            dtype, shape = np.dtype(section["dtype"]), tuple(section["shape"])
+            offset = data_start + section["offset"]
+            if 0 in shape:
+                arrays[name] = np.zeros(shape, dtype=dtype)
+            elif mmap:
+                arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape)
+            else:
+                arrays[name] = np.fromfile(path, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+
+        def table(name):
+            return StringTable(PackedStrings(arrays[f"{name}.data"], arrays[f"{name}.offsets"]))
+
+        return cls(
+            video_ids=CodedStrings(table("video_ids"), arrays["video_id_codes"]),
+            sources=CodedStrings(table("sources"), arrays["source_codes"]),
+            urls=CodedStrings(table("urls"), arrays["url_codes"]),
+            fps=arrays["fps"],
+            plate_offsets=arrays["plate_offsets"],
+            labels=table("labels"),
+            label_codes=arrays["label_codes"],
+            vehicle_types=table("vehicle_types"),
+            vehicle_type_codes=arrays["vehicle_type_codes"],
+            frame_start=arrays["frame_start"],
+            frame_end=arrays["frame_end"],
+            frame_offsets=arrays["frame_offsets"],
+            frame_numbers=arrays["frame_numbers"],
+            bboxes=arrays["bboxes"],
+        )
+
+    def to_icvlp(self) -> ICVLP:
+        r""" Materialize the store into mutable :py:class:`icvlp.object.ICVLP` objects.
+
+        Returns:
+            ICVLP
+        """
+        frame_numbers = self.frame_numbers.tolist()
+        bboxes = self.bboxes.tolist()
+        missing_bbox = [MISSING] * 4
+        videos = []
+        for video in self:
+            plates = []
+            for plate in video.plates:
+                start, end = int(self.frame_offsets[plate._index]), int(self.frame_offsets[plate._index + 1])
+                frames = [Frame.from_trusted(frame_numbers[i] if frame_numbers[i] != MISSING else None,
+                                             bboxes[i] if bboxes[i] != missing_bbox else None)
+                          for i in range(start, end)]
+                plates.append(Plate.from_trusted(plate.label, plate.vehicle_type, plate.frame_start, plate.frame_end,
+                                                 frames))
+            videos.append(Video.from_trusted(video.video_id, video.source, video.url, video.fps, plates))
+        return ICVLP(videos)
+
+    def to_json(self, indent: int = 2):
+        return json.dumps(
+            [video.as_dict() for video in self],
+            indent=indent
+        )
+
+
+class _StoreBuilder:
+    r""" Accumulates columns in compact :py:class:`array.array` buffers and freezes them into NumPy arrays. """
+
+    def __init__(self):
+        self.video_ids: list[str] = []
+        self.sources: list[Optional[str]] = []
+        self.urls: list[Optional[str]] = []
+        self.fps = array('i')
+        self.plate_offsets = array('q', [0])
+
+        self.labels = StringTable()
+        self.label_codes = array('i')
+        self.vehicle_types = StringTable()
+        self.vehicle_type_codes = array('i')
+        self.frame_start = array('i')
+        self.frame_end = array('i')
+        self.frame_offsets = array('q', [0])
+
+        self.frame_numbers = array('i')
+        self.bboxes = array('i')
+
+    def _add_video_fields(self, video_id, source, url, fps):
+        self.video_ids.append(video_id)
+        self.sources.append(source)
+        self.urls.append(url)
+        self.fps.append(_int_or_missing(fps))
+
+    def _add_plate_fields(self, label, vehicle_type, frame_start, frame_end):
+        self.label_codes.append(self.labels.encode(label))
+        self.vehicle_type_codes.append(self.vehicle_types.encode(vehicle_type))
+        self.frame_start.append(_int_or_missing(frame_start))
+        self.frame_end.append(_int_or_missing(frame_end))
+
+    def _add_frame_fields(self, frame, bbox):
+        self.frame_numbers.append(_int_or_missing(frame))
+        self.bboxes.extend(bbox if bbox is not None else [MISSING] * 4)
+
+    def add_video_dict(self, video: dict):
+        self._add_video_fields(video.get('video_id'), video.get('source'), video.get('url'), video.get('fps'))
+        for plate in video.get('plates') or []:
+            self._add_plate_fields(plate.get('label'), plate.get('vehicle_type'),
+                                   plate.get('frame_start'), plate.get('frame_end'))
+            for frame in plate.get('frames') or []:
+                self._add_frame_fields(frame.get('frame'), frame.get('bbox'))
+            self.frame_offsets.append(len(self.frame_numbers))
+        self.plate_offsets.append(len(self.label_codes))
+
+    def add_video(self, video: Video, plate_frames: Optional[Iterable[tuple[np.ndarray, np.ndarray]]] = None):
+        r""" Add a video, with the frames of its plates taken from ``plate_frames`` arrays if given. """
+        self._add_video_fields(video.video_id, video.source, video.url, video.fps)
+        plate_frames = iter(plate_frames) if plate_frames is not None else None
+        for plate in video.plates:
+            self._add_plate_fields(plate.label, plate.vehicle_type, plate.frame_start, plate.frame_end)
+            if plate_frames is None:
+                for frame in plate.frames:
+                    self._add_frame_fields(frame.frame, frame.bbox)
+            else:
+                frame_numbers, bboxes = next(plate_frames)
+                self.frame_numbers.frombytes(np.ascontiguousarray(frame_numbers, dtype=np.int32).tobytes())
+                self.bboxes.frombytes(np.ascontiguousarray(bboxes, dtype=np.int32).tobytes())
+            self.frame_offsets.append(len(self.frame_numbers))
+        self.plate_offsets.append(len(self.label_codes))
+
+    def build(self) -> AnnotationStore:
+        return AnnotationStore(
+            video_ids=self.video_ids,
+            sources=self.sources,
+            urls=self.urls,
+            fps=np.frombuffer(self.fps, dtype=np.int32),
+            plate_offsets=np.frombuffer(self.plate_offsets, dtype=np.int64),
+            labels=self.labels,
+            label_codes=np.frombuffer(self.label_codes, dtype=np.int32),
+            vehicle_types=self.vehicle_types,
+            vehicle_type_codes=np.frombuffer(self.vehicle_type_codes, dtype=np.int32),
+            frame_start=np.frombuffer(self.frame_start, dtype=np.int32),
+            frame_end=np.frombuffer(self.frame_end, dtype=np.int32),
+            frame_offsets=np.frombuffer(self.frame_offsets, dtype=np.int64),
+            frame_numbers=np.frombuffer(self.frame_numbers, dtype=np.int32),
+            bboxes=np.frombuffer(self.bboxes, dtype=np.int32).reshape(-1, 4),
+        )
+
+
+def _int_or_missing(value) -> int:
+    return MISSING if value is None else int(value)
+
+
+def _optional_int(value) -> Optional[int]:
+    value = int(value)
+    return None if value == MISSING else value
+
+
+def _align(size: int) -> int:
+    return -(-size // _ALIGNMENT) * _ALIGNMENT
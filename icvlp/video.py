@@ -0,0 +1,327 @@
+import json
+import logging
+import os
+import queue
+import threading
+from collections import OrderedDict
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+import cv2
+import numpy as np
+
+from icvlp.journal import write_atomic
+
+
+def read_frames(cap: cv2.VideoCapture,
+                frame_numbers: Iterable[int],
+                max_gap: int = 300) -> Iterator[tuple[int, np.ndarray]]:
+    r""" Decode frames of a video in a single forward pass.
+
+    Frame numbers are 1-based, as in the dataset: frame ``n`` is the ``n``-th frame of the video. The numbers are
+    sorted and deduplicated, then the video is decoded forward with ``grab()``, and ``retrieve()`` is called only
+    on the requested frames. Seeking with ``cv2.CAP_PROP_POS_FRAMES`` forces a keyframe search and re-decode, so it
+    is used only to jump over gaps longer than ``max_gap`` frames.
+
+        >>> cap = cv2.VideoCapture('videos/0001.mp4')
+        >>> for frame_number, image in read_frames(cap, [750, 755, 760]):
+        ...     cv2.imwrite(f'{frame_number}.jpeg', image)
+
+    Arguments:
+        cap (cv2.VideoCapture): Opened video.
+        frame_numbers (Iterable[int]): Frames to decode.
+        max_gap (int, optional): Largest gap to decode through instead of seeking. Default: ``300``.
+
+    Yields:
+        Tuple[int, np.ndarray]: Frame number and decoded image, in increasing frame order. Frames that cannot be
+        decoded (e.g. past the end of the video) are not yielded.
+    """
+    position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+    for frame_number in sorted(set(frame_numbers)):
+        index = frame_number - 1
+        if index < position or index - position > max_gap:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+            position = index
+        while position < index:
+            if not cap.grab():
+                return
+            position += 1
+        if not cap.grab():
+            return
+        position += 1
+        ok, image = cap.retrieve()
+        if ok:
+            yield frame_number, image
+
+
+class FramePrefetcher:
+    r""" Decode frames on a background thread ahead of the consumer.
+
+    A thread runs :py:func:`read_frames` and puts the decoded frames in a bounded buffer of ``buffer_size`` frames,
+    so the next frame is usually ready when an interactive tool asks for it, and at most ``buffer_size`` decoded
+    frames are held in memory. The capture belongs to the thread until the prefetcher is closed.
+
+        >>> with FramePrefetcher(cap, range(plate.frame_start, plate.frame_end + 1, step)) as frames:
+        ...     for frame_number, image in frames:
+        ...         cv2.imshow(plate.label, image)
+        ...         cv2.waitKey(0)
+
+    Arguments:
+        cap (cv2.VideoCapture): Opened video.
+        frame_numbers (Iterable[int]): Frames to decode.
+        buffer_size (int, optional): Maximum number of decoded frames waiting to be consumed. Default: ``8``.
+        max_gap (int, optional): Largest gap to decode through instead of seeking, see :py:func:`read_frames`.
+            Default: ``300``.
+    """
+
+    _END = object()
+
+    def __init__(self,
+                 cap: cv2.VideoCapture,
+                 frame_numbers: Iterable[int],
+                 buffer_size: int = 8,
+                 max_gap: int = 300) -> None:
+        self._buffer: queue.Queue = queue.Queue(maxsize=buffer_size)
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, args=(cap, list(frame_numbers), max_gap),
+                                        name="FramePrefetcher", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "FramePrefetcher":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[tuple[int, np.ndarray]]:
+        while True:
+            item = self._buffer.get()
+            if item is self._END:
+                self._buffer.put(self._END)
+                if self._error is not None:
+                    raise self._error
+                return
+            yield item
+
+    def close(self) -> None:
+        r""" Stop decoding and wait for the thread to finish. Frames not consumed yet are dropped, and iterating
+        afterwards yields nothing.
+        """
+        self._stop.set()
+        while self._thread.is_alive():
+            try:
+                self._buffer.get(timeout=0.01)
+            except queue.Empty:
+                pass
+        self._thread.join()
+        # The thread does not put the end marker once stopped, so iterators would wait for it forever.
+        while True:
+            try:
+                self._buffer.get_nowait()
+            except queue.Empty:
+                break
+        self._buffer.put(self._END)
+
+    def _run(self, cap: cv2.VideoCapture, frame_numbers: list[int], max_gap: int) -> None:
+        try:
+            for item in read_frames(cap, frame_numbers, max_gap):
+                if self._stop.is_set():
+                    return
+                self._buffer.put(item)
+        except BaseException as e:
+            self._error = e
+        finally:
+            if not self._stop.is_set():
+                self._buffer.put(self._END)
+
+
+class VideoMetadata(NamedTuple):
+    r""" Properties of a video file, as reported by OpenCV.
+
+    Arguments:
+        fps (float): Frames per second.
+        frame_count (int): Number of frames.
+        width (int): Frame width in pixels.
+        height (int): Frame height in pixels.
+        size (int): Size of the file in bytes, used to detect replaced files.
+        mtime (float): Modification time of the file, used to detect replaced files.
+    """
+    fps: float
+    frame_count: int
+    width: int
+    height: int
+    size: int = 0
+    mtime: float = 0.0
+
+    def step(self, fps: int) -> int:
+        r""" Get the number of video frames between frames sampled at ``fps``.
+
+        Arguments:
+            fps (int): Sampling rate, e.g. ``Video.fps``.
+
+        Returns:
+            int
+        """
+        return int(self.fps // fps)
+
+
+class VideoReaderPool:
+    r""" Pool of open video captures with least-recently-used eviction, and a cache of video metadata.
+
+    Captures are keyed by video ID and opened from ``<video_path>/<video_id>.mp4``. At most ``max_open`` captures
+    are kept open; the least recently used one is released when another video is opened. Metadata is probed once
+    per file and kept in a JSON sidecar, ``<video_path>/.video_index.json``, so later runs do not open videos just
+    to read their FPS or resolution. Entries are re-probed when the file size or modification time changes.
+
+        >>> with VideoReaderPool('videos') as pool:
+        ...     step = pool.metadata('0001').step(video.fps)
+        ...     frames = read_frames(pool.get('0001'), range(plate.frame_start, plate.frame_end + 1, step))
+
+    A capture returned by :py:meth:`get` keeps its position between calls and must not be used by two threads at
+    the same time.
+
+    Arguments:
+        video_path (str): Directory of the video files.
+        max_open (int, optional): Maximum number of open captures. Default: ``8``.
+        extension (str, optional): Extension of the video files. Default: ``'.mp4'``.
+        index_filename (str, optional): Name of the metadata sidecar in ``video_path``. ``None`` keeps metadata in
+            memory only. Default: ``'.video_index.json'``.
+    """
+
+    def __init__(self,
+                 video_path: str,
+                 max_open: int = 8,
+                 extension: str = ".mp4",
+                 index_filename: Optional[str] = ".video_index.json") -> None:
+        if max_open < 1:
+            raise ValueError(f"max_open must be at least 1. Got {max_open}.")
+        self.video_path: str = video_path
+        self.max_open: int = max_open
+        self.extension: str = extension
+        self.index_path: Optional[str] = os.path.join(video_path, index_filename) if index_filename else None
+
+        self._captures: OrderedDict[str, cv2.VideoCapture] = OrderedDict()
+        self._metadata: dict[str, VideoMetadata] = self._read_index()
+        self._dirty: bool = False
+        self._lock = threading.RLock()
+
+    def __enter__(self) -> "VideoReaderPool":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __contains__(self, video_id: str) -> bool:
+        return os.path.exists(self.path(video_id))
+
+    def path(self, video_id: str) -> str:
+        return os.path.join(self.video_path, video_id + self.extension)
+
+    def get(self, video_id: str) -> cv2.VideoCapture:
+        r""" Get an open capture of a video, opening it if needed.
+
+        Arguments:
+            video_id (str): The video ID.
+
+        Returns:
+            cv2.VideoCapture
+
+        Raises:
+            FileNotFoundError: If the video cannot be opened.
+        """
+        with self._lock:
+            cap = self._captures.get(video_id)
+            if cap is not None:
+                self._captures.move_to_end(video_id)
+                return cap
+            path = self.path(video_id)
+            cap = cv2.VideoCapture(path)
+            if not cap.isOpened():
+                cap.release()
+                raise FileNotFoundError(f"Could not open video {path}.")
+            self._captures[video_id] = cap
+            while len(self._captures) > self.max_open:
+                _, evicted = self._captures.popitem(last=False)
+                evicted.release()
+            if video_id not in self._metadata or not self._is_current(video_id, self._metadata[video_id]):
+                self._metadata[video_id] = self._probe(cap, path)
+                self._dirty = True
+            return cap
+
+    def metadata(self, video_id: str) -> VideoMetadata:
+        r""" Get the metadata of a video, from the sidecar if it is current, else by probing the file.
+
+        Arguments:
+            video_id (str): The video ID.
+
+        Returns:
+            VideoMetadata
+
+        Raises:
+            FileNotFoundError: If the video cannot be opened.
+        """
+        with self._lock:
+            metadata = self._metadata.get(video_id)
+            if metadata is not None and self._is_current(video_id, metadata):
+                return metadata
+            # The file is new or was replaced, so a capture opened before is stale too.
+            self.release(video_id)
+            self.get(video_id)
+            return self._metadata[video_id]
+
+    def release(self, video_id: str) -> None:
+        r""" Release the capture of a video, if it is open.
+
+        Arguments:
+            video_id (str): The video ID.
+        """
+        with self._lock:
+            cap = self._captures.pop(video_id, None)
+            if cap is not None:
+                cap.release()
+
+    def close(self) -> None:
+        r""" Release all captures and write the metadata sidecar. """
+        with self._lock:
+            while self._captures:
+                _, cap = self._captures.popitem()
+                cap.release()
+            self.save_index()
+
+    def save_index(self) -> None:
+        r""" Write the metadata sidecar if metadata was probed since it was read. """
+        with self._lock:
+            if self.index_path is None or not self._dirty:
+                return
+            index = {video_id: metadata._asdict() for video_id, metadata in sorted(self._metadata.items())}
+            write_atomic(self.index_path, json.dumps(index, indent=2))
+            self._dirty = False
+
+    def _read_index(self) -> dict[str, VideoMetadata]:
+        if self.index_path is None or not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, 'r') as f:
+                return {video_id: VideoMetadata(**metadata) for video_id, metadata in json.load(f).items()}
+        except (ValueError, TypeError):
+            logging.warning(f"Ignoring invalid video index {self.index_path}")
+            return {}
+
+    def _is_current(self, video_id: str, metadata: VideoMetadata) -> bool:
+        try:
+            stat = os.stat(self.path(video_id))
+        except FileNotFoundError:
+            return False
+        return stat.st_size == metadata.size and stat.st_mtime == metadata.mtime
+
+    @staticmethod
+    def _probe(cap: cv2.VideoCapture, path: str) -> VideoMetadata:
+        stat = os.stat(path)
+        return VideoMetadata(
+            fps=cap.get(cv2.CAP_PROP_FPS),
+            frame_count=int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+            width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+        )
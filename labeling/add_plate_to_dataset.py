@@ -1,13 +1,15 @@
 import os
 
 from icvlp import ICVLP, Video, Plate
+from icvlp.journal import Journal
 
 
 class PlateAdder:
     def __init__(self, dataset_path: str):
         here: str = os.path.dirname(__file__)
         self.dataset_path: str = os.path.join(here, dataset_path)
-        self.dataset: ICVLP = ICVLP.from_json(self.dataset_path)
+        self.journal: Journal = Journal(self.dataset_path)
+        self.dataset: ICVLP = self.journal.dataset
         self.target_video_id: str = str(input('Enter video id: '))
         self.target_video: Video = self.dataset.get_video_by_id(self.target_video_id)
         if self.target_video is None:
@@ -18,6 +20,7 @@ class PlateAdder:
             os.system('clear')
             self.add_plate()
             continue_adding: bool = input('Add another plate? (y/n) ').lower() == 'y'
+        self.journal.close()
 
     @property
     def vehicle_types(self):
@@ -47,12 +50,7 @@ class PlateAdder:
             frame_start=frame_start,
             frame_end=frame_end,
         )
-        self.target_video.append(plate)
-        self.save()
-
-    def save(self):
-        with open(self.dataset_path, 'w') as f:
-            f.write(self.dataset.to_json())
+        self.journal.add_plate(self.target_video, plate)
 
 
 if __name__ == '__main__':
@@ -7,6 +7,10 @@ from ultralytics import YOLO
 from ultralytics.engine.results import Results
 
 from icvlp import ICVLP, Video, Plate, Frame
+from icvlp.export import voc_annotation
+from icvlp.journal import Journal
+from icvlp.proposals import ProposalCache, Proposals, propose_video
+from icvlp.video import FramePrefetcher, VideoReaderPool
 
 
 class BoundingBoxDetector:
@@ -14,32 +18,49 @@ class BoundingBoxDetector:
                  model_path: str,
                  dataset_path: str,
                  video_path: str,
-                 annotations_dir: str):
+                 annotations_dir: str,
+                 proposals_dir: str = '../proposals'):
         here = os.path.dirname(os.path.abspath(__file__))
         self.detector_path: str = os.path.join(here, model_path)
         self.dataset_path: str = os.path.join(here, dataset_path)
         self.detector: YOLO = YOLO(self.detector_path)
-        self.dataset: ICVLP = ICVLP.from_json(self.dataset_path)
-
-        self.original_dataset_string: str = self.dataset.to_json()
+        self.journal: Journal = Journal(self.dataset_path)
+        self.dataset: ICVLP = self.journal.dataset
 
         self.video_path: str = os.path.join(here, video_path)
+        self.videos: VideoReaderPool = VideoReaderPool(self.video_path)
+        self.proposals: ProposalCache = ProposalCache(os.path.join(here, proposals_dir))
         self.annotations_dir: str = os.path.join(here, annotations_dir)
         if not os.path.exists(self.annotations_dir):
             os.makedirs(self.annotations_dir, exist_ok=True)
 
-    def label(self):
+    def propose(self, batch_size: int = 16, overwrite: bool = False):
         for video in self.dataset.videos:
             video: Video
-            video_id = video.video_id
-            video_filename = os.path.join(self.video_path, f"{video_id}.mp4")
+            video_filename = os.path.join(self.video_path, f"{video.video_id}.mp4")
             if not os.path.exists(video_filename):
+                continue
+            # Only frames missing from the cache are detected.
+            step = self.videos.metadata(video.video_id).step(video.fps)
+            proposals = propose_video(video, video_filename, self.detect, self.proposals, batch_size, overwrite,
+                                      step)
+            print(f"Cached proposals for {len(proposals)} frames of video {video.video_id}.")
+
+    def detect(self, images: list[np.ndarray]) -> list[tuple[np.ndarray, np.ndarray]]:
+        results: list[Results] = self.detector(images, device='cpu', verbose=False)
+        return [(result.boxes.xyxy.detach().numpy(), result.boxes.conf.detach().numpy()) for result in results]
+
+    def label(self, batch_size: int = 16):
+        self.propose(batch_size)
+        for video in self.dataset.videos:
+            video: Video
+            video_id = video.video_id
+            if video_id not in self.videos:
                 print(f"Video {video_id} not found. Skipping.")
                 continue
-            cap = cv2.VideoCapture(video_filename)
-            fps: int = video.fps
-            video_fps: int = int(cap.get(cv2.CAP_PROP_FPS))
-            step: int = video_fps // fps
+            proposals: Proposals = self.proposals.get(video_id)
+            cap = self.videos.get(video_id)
+            step: int = self.videos.metadata(video_id).step(video.fps)
 
             for plate in video.plates:
                 plate: Plate
@@ -47,19 +68,21 @@ class BoundingBoxDetector:
                 frame_start: int = plate.frame_start
                 frame_end: int = plate.frame_end
 
+                frame_numbers = []
                 for frame_number in range(frame_start, frame_end + 1, step):
-                    if plate.check_frame_number_exists_in_children(frame_number):
+                    if plate.has_frame(frame_number):
                         print(f"Skipping frame {frame_number} for {label} as it is already labelled.")
                         continue
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number - 1)
-                    _, true_frame = cap.read()
-                    self.show_frame_window(true_frame, f"{video_id} {frame_number} {label}")
-
-                    object_name: str = f"plate-{plate.vehicle_type}"
-                    results: list[Results] = self.detector(true_frame)
-                    for result in results:
-                        result: Results
-                        shape, orig_bbox, bbox = self._get_result_metadata(result)
+                    frame_numbers.append(frame_number)
+
+                with FramePrefetcher(cap, frame_numbers) as frames:
+                    for frame_number, true_frame in frames:
+                        self.show_frame_window(true_frame, f"{video_id} {frame_number} {label}")
+
+                        object_name: str = f"plate-{plate.vehicle_type}"
+                        shape = proposals.shape
+                        orig_bbox, _ = proposals.get(frame_number)
+                        bbox = orig_bbox.astype(np.int32)
                         frame_filename: str = f"{video_id}_{frame_number}_{label}.jpeg"
                         for orig_box, box in zip(orig_bbox, bbox):
                             plate_frame: np.ndarray = true_frame[box[1]:box[3], box[0]:box[2]]
@@ -69,11 +92,14 @@ class BoundingBoxDetector:
 
                             if chr(key) == 'y':
                                 self.create_xml_annotation(frame_filename, object_name, shape, orig_box)
-                                self.append_frame_to_plate(plate, frame_number, box)
+                                self.append_frame_to_plate(video, plate, frame_number, box)
                                 cv2.destroyWindow(window_name)
                                 break
                             cv2.destroyWindow(window_name)
-                    cv2.destroyAllWindows()
+                        cv2.destroyAllWindows()
+
+        self.videos.close()
+        self.journal.close()
 
     @staticmethod
     def show_frame_window(true_frame, window_name):
@@ -93,11 +119,9 @@ class BoundingBoxDetector:
         cv2.resizeWindow(window_name, int(window_width), int(window_height))
         cv2.moveWindow(window_name, int(box[0] - 10), int(box[1] - 10))
 
-    def append_frame_to_plate(self, plate: Plate, frame_number, bbox):
+    def append_frame_to_plate(self, video: Video, plate: Plate, frame_number, bbox):
         frame = Frame(frame=frame_number, bbox=bbox.tolist())
-        plate.append(frame)
-        with open(self.dataset_path, 'w') as f:
-            f.write(self.dataset.to_json())
+        self.journal.add_frame(video, plate, frame)
 
     def create_xml_annotation(self, image_filename: str, object_name: str, shape: tuple, orig_bbox: list):
         annotation_filename = image_filename.split('.')[0] + '.xml'
@@ -108,39 +132,7 @@ class BoundingBoxDetector:
     @staticmethod
     def xml_annotation_string(image_filename: str, image_shape, object_name: str, bbox: list[int]):
         height, width, depth = image_shape
-        x_min, y_min, x_max, y_max = bbox
-
-        return f"""<annotation>
-    <folder>frames</folder>
-    <filename>{image_filename}</filename>
-    <size>
-        <width>{width}</width>
-        <height>{height}</height>
-        <depth>{depth}</depth>
-    </size>
-    <object>
-        <name>{object_name}</name>
-        <pose>Unspecified</pose>
-        <truncated>0</truncated>
-        <occluded>0</occluded>
-        <difficult>0</difficult>
-        <bndbox>
-            <xmin>{x_min}</xmin>
-            <ymin>{y_min}</ymin>
-            <xmax>{x_max}</xmax>
-            <ymax>{y_max}</ymax>
-        </bndbox>
-    </object>
-</annotation>
-        """
-
-    @staticmethod
-    def _get_result_metadata(result: Results):
-        shape = result.orig_img.shape
-        orig_bbox = result.boxes.xyxy
-        orig_box = orig_bbox.detach().numpy()
-        bbox = orig_bbox.int().detach().numpy()
-        return shape, orig_box, bbox
+        return voc_annotation(image_filename, width, height, object_name, bbox, depth=depth)
 
 
 if __name__ == '__main__':
@@ -149,6 +141,7 @@ if __name__ == '__main__':
         dataset_path='../icvlp_v0.1.json',
         video_path='../videos',
         annotations_dir='../annotations',
+        proposals_dir='../proposals',
     )
 
     handler.label()
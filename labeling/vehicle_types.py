@@ -2,7 +2,9 @@ import os
 
 import cv2
 
-from icvlp import ICVLP, Plate, Video
+from icvlp import Plate, Video
+from icvlp.journal import Journal
+from icvlp.video import FramePrefetcher, VideoReaderPool
 
 
 class LabelVehicleTypes:
@@ -13,8 +15,10 @@ class LabelVehicleTypes:
         here = os.path.dirname(__file__)
         self.dataset_path = os.path.join(here, dataset_path)
         self.video_path = os.path.join(here, video_path)
+        self.videos = VideoReaderPool(self.video_path)
 
-        self.dataset = ICVLP.from_json(self.dataset_path)
+        self.journal = Journal(self.dataset_path)
+        self.dataset = self.journal.dataset
 
         self.skip_labelled_vehicle_type = skip_labelled
 
@@ -28,12 +32,10 @@ class LabelVehicleTypes:
             'minibus'
         ]
 
-    def _label_plate_vehicle_type(self, cap, plate: Plate):
+    def _label_plate_vehicle_type(self, frame, video: Video, plate: Plate):
         for i, vehicle_type in enumerate(self.vehicle_types):
             print(f"{i}: {vehicle_type}")
 
-        cap.set(cv2.CAP_PROP_POS_FRAMES, plate.frame_start)
-        _, frame = cap.read()
         cv2.namedWindow(plate.label, cv2.WINDOW_NORMAL)
         cv2.imshow(plate.label, frame)
         zoom = 1 / 2
@@ -43,26 +45,27 @@ class LabelVehicleTypes:
         key: int = cv2.waitKey(0)
         key: int = int(chr(key))
         vehicle_type: str = self.vehicle_types[key]
-        plate.vehicle_type = vehicle_type
+        self.journal.set_vehicle_type(video, plate, vehicle_type)
         print(f"Labelled {plate.label} as {vehicle_type}", end='\n\n')
         cv2.destroyAllWindows()
 
-    def _write_json(self):
-        with open(self.dataset_path, 'w') as f:
-            f.write(self.dataset.to_json())
-
     def label(self):
-        for video in self.dataset.videos:
+        query = self.dataset.query(vehicle_type=None) if self.skip_labelled_vehicle_type else self.dataset.query()
+        for video, video_plates in query.by_video():
             video: Video
-            video_filename: str = os.path.join(self.video_path, video.video_id + ".mp4")
-            cap = cv2.VideoCapture(video_filename)
-            for plate in video.plates:
+            plates: dict[int, list[Plate]] = {}
+            for plate in video_plates:
                 plate: Plate
-                if self.skip_labelled_vehicle_type and plate.vehicle_type is not None:
-                    continue
-                self._label_plate_vehicle_type(cap, plate)
+                plates.setdefault(plate.frame_start, []).append(plate)
+            cap = self.videos.get(video.video_id)
+            # Plates are shown in order of their first frame, decoded ahead while the previous one is labelled.
+            with FramePrefetcher(cap, plates) as frames:
+                for frame_number, frame in frames:
+                    for plate in plates[frame_number]:
+                        self._label_plate_vehicle_type(frame, video, plate)
 
-                self._write_json()
+        self.videos.close()
+        self.journal.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,112 @@
+import os
+import pickle
+
+import cv2
+import numpy as np
+
+from icvlp import ICVLP, Frame, Plate, Video
+from icvlp.dataset import PlateCropDataset, crop_and_resize
+
+from tests.test_video import VideoTestCase, seek_frame, write_video
+
+
+class TestPlateCropDataset(VideoTestCase):
+    def setUp(self):
+        super().setUp()
+        write_video(os.path.join(self.tmpdir.name, "0002.mp4"), 20)
+        self.dataset = ICVLP([
+            Video(video_id="0001", fps=6, plates=[
+                Plate(label="AB1CD", vehicle_type="bus", frame_start=1, frame_end=21, frames=[
+                    Frame(frame=1, bbox=[2, 4, 30, 20]),
+                    Frame(frame=6, bbox=[3, 4, 31, 20]),
+                    Frame(frame=11, bbox=None),
+                ]),
+                Plate(label="EF2GH", frame_start=6, frame_end=31, frames=[Frame(frame=6, bbox=[40, 30, 70, 60])]),
+            ]),
+            Video(video_id="0002", fps=6, plates=[
+                Plate(label="IJ3KL", vehicle_type="box_truck", frame_start=10, frame_end=20, frames=[
+                    Frame(frame=15, bbox=[0, 0, 64, 48]),
+                ]),
+            ]),
+            Video(video_id="0003", fps=6, plates=[]),
+        ])
+        self.cache_dir = os.path.join(self.tmpdir.name, "crops")
+
+    def expected_crop(self, video_id, frame_number, bbox):
+        frame = seek_frame(os.path.join(self.tmpdir.name, f"{video_id}.mp4"), frame_number)
+        return crop_and_resize(frame, bbox, (16, 48))
+
+    def test_samples(self):
+        dataset = PlateCropDataset(self.dataset, self.cache_dir, crop_size=(16, 48), video_path=self.tmpdir.name)
+        self.assertEqual(len(dataset), 4)
+        self.assertEqual(dataset.video_ids, ["0001", "0002"])
+        self.assertEqual(dataset.num_cached, 0)
+
+        crop, label, vehicle_type = dataset[1]
+        self.assertEqual((label, vehicle_type), ("AB1CD", "bus"))
+        self.assertEqual(crop.shape, (16, 48, 3))
+        self.assertEqual(crop.dtype, np.uint8)
+        np.testing.assert_array_equal(crop, self.expected_crop("0001", 6, [3, 4, 31, 20]))
+        self.assertEqual(dataset.num_cached, 1)
+
+        crop, label, vehicle_type = dataset[-1]
+        self.assertEqual((label, vehicle_type), ("IJ3KL", "box_truck"))
+        np.testing.assert_array_equal(crop, self.expected_crop("0002", 15, [0, 0, 64, 48]))
+        self.assertIsNone(dataset[2][2])
+        with self.assertRaises(IndexError):
+            dataset[4]
+
+    def test_build_cache(self):
+        for workers in [1, 2]:
+            cache_dir = os.path.join(self.tmpdir.name, f"crops_{workers}")
+            dataset = PlateCropDataset(self.dataset, cache_dir, crop_size=(16, 48), video_path=self.tmpdir.name)
+            self.assertEqual(dataset.build_cache(workers=workers), 4)
+            self.assertEqual(dataset.num_cached, 4)
+            self.assertEqual(dataset.build_cache(workers=workers), 0)
+            np.testing.assert_array_equal(dataset[2][0], self.expected_crop("0001", 6, [40, 30, 70, 60]))
+
+    def test_cache_is_reused_without_videos(self):
+        dataset = PlateCropDataset(self.dataset, self.cache_dir, crop_size=(16, 48), video_path=self.tmpdir.name)
+        dataset.build_cache()
+        expected = [dataset[i][0] for i in range(len(dataset))]
+
+        os.rename(self.video_filename, self.video_filename + ".moved")
+        reopened = PlateCropDataset(self.dataset, self.cache_dir, crop_size=(16, 48), video_path=self.tmpdir.name)
+        self.assertEqual(reopened.num_cached, 4)
+        for i in range(len(reopened)):
+            np.testing.assert_array_equal(reopened[i][0], expected[i])
+
+        # A different crop size invalidates the cache.
+        resized = PlateCropDataset(self.dataset, self.cache_dir, crop_size=(8, 24), video_path=self.tmpdir.name)
+        self.assertEqual(resized.num_cached, 0)
+        with self.assertRaises(FileNotFoundError):
+            resized[0]
+
+    def test_extracted_frames(self):
+        frames_path = os.path.join(self.tmpdir.name, "frames")
+        os.makedirs(frames_path)
+        image = np.full((48, 64, 3), 200, dtype=np.uint8)
+        cv2.imwrite(os.path.join(frames_path, "0001_1_AB1CD.jpeg"), image)
+        dataset = PlateCropDataset(self.dataset, self.cache_dir, crop_size=(16, 48), frames_path=frames_path,
+                                   transform=lambda crop: crop.transpose(2, 0, 1))
+        crop, label, _ = dataset[0]
+        self.assertEqual(crop.shape, (3, 16, 48))
+        self.assertEqual(label, "AB1CD")
+        np.testing.assert_array_equal(crop, 200)
+        with self.assertRaises(FileNotFoundError):
+            dataset[1]
+
+        # An unreadable image is reported rather than cropped.
+        with open(os.path.join(frames_path, "0001_6_AB1CD.jpeg"), 'wb') as f:
+            f.write(b"not an image")
+        with self.assertRaisesRegex(FileNotFoundError, "0001_6_AB1CD.jpeg"):
+            dataset[1]
+
+    def test_pickle_for_workers(self):
+        dataset = PlateCropDataset(self.dataset, self.cache_dir, crop_size=(16, 48), video_path=self.tmpdir.name)
+        dataset[0]
+        worker_dataset = pickle.loads(pickle.dumps(dataset))
+        self.assertIsNone(worker_dataset._crops)
+        worker_dataset[3]
+        self.assertEqual(dataset.num_cached, 2)
+        np.testing.assert_array_equal(worker_dataset[0][0], dataset[0][0])
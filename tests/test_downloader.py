@@ -0,0 +1,153 @@
+import os
+import tempfile
+import threading
+import time
+from unittest import TestCase
+
+from icvlp import ICVLP, Video
+from icvlp.downloader import DownloadLedger, DownloadResult, TokenBucket, VideoDownloader
+
+
+class StubDownloader:
+    def __init__(self, delay: float = 0.05, failures: int = 0):
+        self.delay = delay
+        self.failures = failures
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, url: str, download_path: str):
+        with self.lock:
+            self.calls.append(url)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            fail = self.calls.count(url) <= self.failures
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        if fail:
+            raise RuntimeError("network error")
+        with open(download_path, 'w') as f:
+            f.write(url)
+
+
+class TestVideoDownloader(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.directory = self.tmpdir.name
+        self.log = os.path.join(self.directory, "downloaded_videos.txt")
+        self.dataset = ICVLP([
+            Video(video_id=f"{i:04d}", url=f"https://host{i % 2}.example.com/{i}", plates=[])
+            for i in range(8)
+        ])
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _downloader(self, stub, **kwargs):
+        kwargs.setdefault("rate_limit", 1000)
+        kwargs.setdefault("backoff", 0)
+        return VideoDownloader(self.dataset, directory=self.directory, downloaded_videos_log=self.log,
+                               download_fn=stub, **kwargs)
+
+    def test_concurrent_downloads(self):
+        stub = StubDownloader()
+        results = self._downloader(stub, workers=4).downloads()
+        self.assertGreater(stub.max_active, 1)
+        self.assertEqual([result.video_id for result in results], [video.video_id for video in self.dataset.videos])
+        self.assertTrue(all(result.status == "downloaded" and result.attempts == 1 for result in results))
+        for video in self.dataset.videos:
+            self.assertTrue(os.path.exists(os.path.join(self.directory, video.video_id + ".mp4")))
+
+    def test_skips_logged_videos(self):
+        self._downloader(StubDownloader(delay=0), workers=4).downloads()
+        stub = StubDownloader(delay=0)
+        results = self._downloader(stub, workers=4).downloads()
+        self.assertEqual(stub.calls, [])
+        self.assertTrue(all(result.status == "logged" for result in results))
+
+    def test_retries_with_backoff(self):
+        stub = StubDownloader(delay=0, failures=2)
+        results = self._downloader(stub, workers=2, retries=3).downloads()
+        self.assertTrue(all(result.status == "downloaded" and result.attempts == 3 for result in results))
+
+        os.remove(self.log)
+        os.remove(os.path.join(self.directory, "0000.mp4"))
+        stub = StubDownloader(delay=0, failures=5)
+        result = self._downloader(stub, retries=1).download(0)
+        self.assertEqual(result, DownloadResult("0000", os.path.join(self.directory, "0000.mp4"), "failed", 2,
+                                                "network error"))
+
+    def test_unsupported_url(self):
+        downloader = VideoDownloader(Video(video_id="0001", url="https://example.com/0001"),
+                                     directory=self.directory, downloaded_videos_log=self.log)
+        self.assertEqual(downloader.download(0).status, "unsupported")
+
+
+class TestTokenBucket(TestCase):
+    def test_rate_limit(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+
+class TestDownloadLedger(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tmpdir.name, "downloaded_videos.txt")
+        self.video_path = os.path.join(self.tmpdir.name, "0001.mp4")
+        with open(self.video_path, 'w') as f:
+            f.write("video")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_exact_match(self):
+        ledger = DownloadLedger(self.log)
+        ledger.add(self.video_path)
+        self.assertIn(self.video_path, ledger)
+        self.assertNotIn(self.video_path[:-5] + ".mp4", ledger)
+        self.assertNotIn(os.path.join(self.tmpdir.name, "0001.mp"), ledger)
+        self.assertEqual(ledger.get(self.video_path).size, 5)
+
+    def test_legacy_lines(self):
+        with open(self.log, 'w') as f:
+            f.write(f"{self.video_path}\n")
+        ledger = DownloadLedger(self.log)
+        self.assertIn(self.video_path, ledger)
+        self.assertFalse(ledger.is_partial(self.video_path))
+
+    def test_detects_partial_download(self):
+        ledger = DownloadLedger(self.log)
+        ledger.add(self.video_path)
+        self.assertFalse(ledger.is_partial(self.video_path, verify_checksum=True))
+        with open(self.video_path, 'w') as f:
+            f.write("vid")
+        self.assertTrue(ledger.is_partial(self.video_path))
+        with open(self.video_path, 'w') as f:
+            f.write("VIDEO")
+        self.assertFalse(ledger.is_partial(self.video_path))
+        self.assertTrue(ledger.is_partial(self.video_path, verify_checksum=True))
+
+    def test_merges_concurrent_writers(self):
+        first, second = DownloadLedger(self.log), DownloadLedger(self.log)
+        first.add(self.video_path)
+        other_path = os.path.join(self.tmpdir.name, "0002.mp4")
+        with open(other_path, 'w') as f:
+            f.write("other")
+        second.add(other_path)
+        self.assertIn(self.video_path, second)
+        self.assertEqual(len(DownloadLedger(self.log)), 2)
+
+    def test_downloader_refetches_partial_download(self):
+        stub = StubDownloader(delay=0)
+        downloader = VideoDownloader(Video(video_id="0001", url="https://example.com/0001"),
+                                     directory=self.tmpdir.name, downloaded_videos_log=self.log, download_fn=stub)
+        self.assertEqual(downloader.download(0).status, "exists")
+        with open(self.video_path, 'w') as f:
+            f.write("vi")
+        self.assertEqual(downloader.download(0).status, "downloaded")
+        self.assertEqual(downloader.download(0).status, "logged")
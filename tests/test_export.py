@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from icvlp import ICVLP, Frame, Plate, Video
+from icvlp.export import MANIFEST_FILENAME, export, yolo_annotation
+from icvlp.ingest import read_voc_bbox
+from icvlp.video import VideoMetadata, VideoReaderPool
+
+
+class TestExport(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.tmpdir.name, "annotations")
+        self.dataset = ICVLP([
+            Video(video_id="0001", plates=[
+                Plate(label="AB1CD", vehicle_type="bus", frame_start=1, frame_end=20, frames=[
+                    Frame(frame=1, bbox=[10, 20, 50, 40]),
+                    Frame(frame=6, bbox=[12, 20, 52, 40]),
+                    Frame(frame=11, bbox=None),
+                ]),
+            ]),
+            Video(video_id="0002", plates=[
+                Plate(label="EF2GH", vehicle_type="box_truck", frame_start=1, frame_end=20, frames=[
+                    Frame(frame=1, bbox=[0, 0, 100, 50]),
+                ]),
+            ]),
+        ])
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_voc(self):
+        report = export(self.dataset, self.output_dir, image_size=(640, 360), workers=2, chunksize=1)
+        self.assertEqual((report.files, report.written, report.unchanged, report.removed), (3, 3, 0, 0))
+        self.assertEqual(sorted(name for name in os.listdir(self.output_dir) if name != MANIFEST_FILENAME),
+                         ["0001_1_AB1CD.xml", "0001_6_AB1CD.xml", "0002_1_EF2GH.xml"])
+        self.assertEqual(read_voc_bbox(os.path.join(self.output_dir, "0001_6_AB1CD.xml")), [12, 20, 52, 40])
+
+    def test_reexport_only_writes_changes(self):
+        export(self.dataset, self.output_dir, annotation_format="yolo", image_size=(640, 360))
+        path = os.path.join(self.output_dir, "0001_1_AB1CD.txt")
+        untouched = os.path.join(self.output_dir, "0002_1_EF2GH.txt")
+        os.utime(untouched, ns=(0, 0))
+
+        plate = self.dataset.videos[0].plates[0]
+        plate.frames[1].bbox = [14, 20, 54, 40]
+        plate.frames.pop(0)
+        report = export(self.dataset, self.output_dir, annotation_format="yolo", image_size=(640, 360))
+        self.assertEqual((report.files, report.written, report.unchanged, report.removed), (3, 1, 2, 1))
+        self.assertFalse(os.path.exists(path))
+
+        report = export(self.dataset, self.output_dir, annotation_format="yolo", image_size=(640, 360))
+        self.assertEqual((report.written, report.unchanged), (0, 3))
+        self.assertEqual(os.stat(untouched).st_mtime_ns, 0)
+        with open(os.path.join(self.output_dir, "classes.txt")) as f:
+            self.assertEqual(f.read(), "plate-box_truck\nplate-bus\n")
+
+    def test_yolo_annotation(self):
+        self.assertEqual(yolo_annotation(1, 200, 100, [50, 25, 150, 75]), "1 0.500000 0.500000 0.500000 0.500000\n")
+
+    def test_coco(self):
+        image_size = {"0001": (640, 360)}
+        report = export(self.dataset, self.output_dir, annotation_format="coco", image_size=image_size)
+        self.assertEqual(report.files, 1)
+        with open(os.path.join(self.output_dir, "annotations.json")) as f:
+            coco = json.load(f)
+        self.assertEqual([image["file_name"] for image in coco["images"]], ["0001_1_AB1CD.jpeg", "0001_6_AB1CD.jpeg"])
+        self.assertEqual(coco["annotations"][1]["bbox"], [12, 20, 40, 20])
+        self.assertEqual([category["name"] for category in coco["categories"]], ["plate-box_truck", "plate-bus"])
+
+        report = export(self.dataset, self.output_dir, annotation_format="coco", image_size=image_size)
+        self.assertEqual((report.written, report.unchanged), (0, 1))
+        self.assertEqual(sorted(os.listdir(self.output_dir)), [MANIFEST_FILENAME, "annotations.json"])
+
+    def test_repeated_names_are_merged(self):
+        # The plate is seen again later in the video, with overlapping frames.
+        self.dataset.videos[0].append(Plate(label="AB1CD", vehicle_type="bus", frame_start=6, frame_end=30, frames=[
+            Frame(frame=6, bbox=[12, 20, 52, 40]),
+            Frame(frame=6, bbox=[100, 20, 140, 40]),
+            Frame(frame=26, bbox=[10, 10, 60, 30]),
+        ]))
+        report = export(self.dataset, self.output_dir, (640, 360), workers=2, chunksize=1)
+        self.assertEqual(report.files, 4)
+        with open(os.path.join(self.output_dir, "0001_6_AB1CD.xml")) as f:
+            self.assertEqual(f.read().count("<object>"), 2)
+
+        export(self.dataset, self.output_dir, (640, 360), annotation_format="coco")
+        with open(os.path.join(self.output_dir, "annotations.json")) as f:
+            coco = json.load(f)
+        self.assertEqual(len(coco["images"]), 4)
+        self.assertEqual([annotation["image_id"] for annotation in coco["annotations"]], [1, 2, 2, 3, 4])
+
+    def test_image_size_from_video_pool(self):
+        with tempfile.TemporaryDirectory() as video_path:
+            # Only 0002 has a video, whose resolution is read from the metadata sidecar.
+            path = os.path.join(video_path, "0002.mp4")
+            with open(path, 'wb'):
+                pass
+            stat = os.stat(path)
+            metadata = VideoMetadata(fps=30.0, frame_count=100, width=200, height=100, size=stat.st_size,
+                                     mtime=stat.st_mtime)
+            with open(os.path.join(video_path, ".video_index.json"), 'w') as f:
+                json.dump({"0002": metadata._asdict()}, f)
+            with VideoReaderPool(video_path) as pool:
+                export(self.dataset, self.output_dir, pool, annotation_format="yolo")
+        self.assertEqual(sorted(os.listdir(self.output_dir)), [MANIFEST_FILENAME, "0002_1_EF2GH.txt", "classes.txt"])
+        with open(os.path.join(self.output_dir, "0002_1_EF2GH.txt")) as f:
+            self.assertEqual(f.read(), "0 0.250000 0.250000 0.500000 0.500000\n")
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            export(self.dataset, self.output_dir, (640, 360), annotation_format="csv")
@@ -0,0 +1,95 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from icvlp import ICVLP, Frame, Plate, Video
+from icvlp.ingest import index_annotations, ingest_annotations, read_voc_bbox, read_voc_bboxes
+
+
+def voc_xml(bbox) -> str:
+    x_min, y_min, x_max, y_max = bbox
+    return f"""<annotation>
+    <folder>frames</folder>
+    <filename>image.jpeg</filename>
+    <size>
+        <width>640</width>
+        <height>360</height>
+        <depth>3</depth>
+    </size>
+    <object>
+        <name>plate-bus</name>
+        <bndbox>
+            <xmin>{x_min}</xmin>
+            <ymin> {y_min} </ymin>
+            <xmax>{x_max}</xmax>
+            <ymax>{y_max}</ymax>
+        </bndbox>
+    </object>
+</annotation>
+"""
+
+
+class TestIngest(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.annotations_dir = self.tmpdir.name
+        self.dataset = ICVLP([
+            Video(video_id="0001", plates=[
+                Plate(label="AB1CD", frame_start=1, frame_end=21, frames=[Frame(frame=2, bbox=[1, 1, 2, 2])]),
+                Plate(label="EF2GH", frame_start=6, frame_end=11, frames=[]),
+            ]),
+        ])
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name: str, text: str) -> str:
+        path = os.path.join(self.annotations_dir, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_read_voc_bbox(self):
+        self.assertEqual(read_voc_bbox(self.write("a.xml", voc_xml([10.4, 20.6, 30, 40.5]))), [10, 21, 30, 40])
+        self.assertIsNone(read_voc_bbox(self.write("b.xml", "<annotation><size></size></annotation>")))
+        self.assertIsNone(read_voc_bbox(self.write("c.xml", "<annotation><object><name>x</name></object>"
+                                                            "</annotation>")))
+
+    def test_read_voc_bboxes_in_processes(self):
+        paths = [self.write(f"{i}.xml", voc_xml([i, i, i + 10, i + 10])) for i in range(7)]
+        expected = [[i, i, i + 10, i + 10] for i in range(7)]
+        self.assertEqual(read_voc_bboxes(paths), expected)
+        self.assertEqual(read_voc_bboxes(paths, workers=2, chunksize=2), expected)
+
+    def test_ingest(self):
+        self.write("0001_11_AB1CD.xml", voc_xml([5, 5, 50, 20]))
+        self.write("0001_1_AB1CD.xml", voc_xml([1, 1, 40, 15]))
+        self.write("0001_6_EF2GH.xml", "<annotation></annotation>")
+        self.write("0001_7_EF2GH.xml", voc_xml([1, 1, 40, 15]))
+        self.write("notes.txt", "")
+        self.assertEqual(len(index_annotations(self.annotations_dir)), 4)
+
+        report = ingest_annotations(self.dataset, self.annotations_dir)
+        self.assertEqual((report.candidates, report.files, report.frames, report.empty), (7, 3, 2, 1))
+        self.assertGreater(report.files_per_second, 0)
+        self.assertIn("files/s", str(report))
+
+        first, second = self.dataset.videos[0].plates
+        self.assertEqual([frame.as_dict() for frame in first.frames],
+                         [{"frame": 1, "bbox": [1, 1, 40, 15]}, {"frame": 11, "bbox": [5, 5, 50, 20]}])
+        self.assertEqual(second.frames, [])
+
+    def test_ingest_invalid_bbox(self):
+        self.write("0001_1_AB1CD.xml", voc_xml([1, 1, 40, 15]))
+        self.write("0001_6_EF2GH.xml", voc_xml([40, 1, 10, 15]))
+        with self.assertRaisesRegex(ValueError, "Video 0001, plate EF2GH: invalid annotations 0001_6_EF2GH.xml: "
+                                                "1 invalid frames:\nrow 0 \\(frame 6"):
+            ingest_annotations(self.dataset, self.annotations_dir)
+        self.assertEqual([frame.frame for frame in self.dataset.videos[0].plates[0].frames], [2])
+
+    def test_ingest_updates_query(self):
+        self.assertEqual([plate.label for plate in self.dataset.query(annotated=False).plates()], ["EF2GH"])
+        self.write("0001_6_EF2GH.xml", voc_xml([1, 1, 40, 15]))
+        ingest_annotations(self.dataset, self.annotations_dir)
+        self.assertEqual([plate.label for plate in self.dataset.query(annotated=False).plates()], ["AB1CD"])
+        self.assertEqual([plate.label for plate in self.dataset.query(annotated=True).plates()], ["EF2GH"])
@@ -0,0 +1,87 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from icvlp import ICVLP, Frame, Plate
+from icvlp.journal import Journal, write_atomic
+
+
+class TestJournal(TestCase):
+    def setUp(self):
+        dirname = os.path.dirname(os.path.dirname(__file__))
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dataset_path = os.path.join(self.tmpdir.name, 'test.json')
+        shutil.copy(os.path.join(dirname, 'test.json'), self.dataset_path)
+        with open(self.dataset_path, 'r') as f:
+            self.original = f.read()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _edit(self, journal):
+        video = journal.dataset.get_video_by_id("0001")
+        journal.add_frame(video, video.plates[0], Frame(frame=760, bbox=[1, 1, 90, 90]))
+        journal.set_vehicle_type("0001", 0, "box_truck")
+        journal.add_plate(video, Plate(label="AB1CD", frame_start=1, frame_end=10,
+                                       frames=[Frame(frame=2, bbox=[1, 1, 5, 5])]))
+        journal.clear_frames("0002", 0)
+
+    def test_edits_are_appended_not_rewritten(self):
+        journal = Journal(self.dataset_path, compact_every=0)
+        self._edit(journal)
+        with open(self.dataset_path, 'r') as f:
+            self.assertEqual(f.read(), self.original)
+        with open(journal.journal_path, 'r') as f:
+            self.assertEqual(len(f.readlines()), 5)
+        expected = journal.dataset.to_json()
+
+        journal.close()
+        self.assertFalse(os.path.exists(journal.journal_path))
+        with open(self.dataset_path, 'r') as f:
+            self.assertEqual(f.read(), expected)
+
+        dataset = ICVLP.from_json(self.dataset_path)
+        plates = dataset.get_video_by_id("0001").plates
+        self.assertEqual(plates[0].vehicle_type, "box_truck")
+        self.assertEqual([frame.frame for frame in plates[0].frames], [750, 760])
+        self.assertEqual(plates[1].label, "AB1CD")
+        self.assertEqual(dataset.get_video_by_id("0002").plates[0].frames, [])
+
+    def test_replay_after_crash(self):
+        journal = Journal(self.dataset_path, compact_every=0)
+        self._edit(journal)
+        expected = journal.dataset.to_json()
+        journal._file.close()
+        journal._file = None
+        with open(journal.journal_path, 'a') as f:
+            f.write('{"op": "add_fr')
+
+        with Journal(self.dataset_path) as replayed:
+            self.assertEqual(replayed.records, 4)
+            self.assertEqual(replayed.dataset.to_json(), expected)
+        with open(self.dataset_path, 'r') as f:
+            self.assertEqual(f.read(), expected)
+
+    def test_compacted_journal_is_not_replayed_twice(self):
+        journal = Journal(self.dataset_path, compact_every=0)
+        self._edit(journal)
+        expected = journal.dataset.to_json()
+        write_atomic(self.dataset_path, expected)
+        journal._file.close()
+        journal._file = None
+
+        with Journal(self.dataset_path) as replayed:
+            self.assertEqual(replayed.records, 0)
+            self.assertEqual(replayed.dataset.to_json(), expected)
+
+    def test_periodic_compaction(self):
+        with Journal(self.dataset_path, compact_every=2) as journal:
+            journal.set_vehicle_type("0001", 0, "bus")
+            with open(self.dataset_path, 'r') as f:
+                self.assertEqual(f.read(), self.original)
+            journal.set_vehicle_type("0002", 0, "bus")
+            self.assertEqual(journal.records, 0)
+            with open(self.dataset_path, 'r') as f:
+                self.assertEqual([video["plates"][0]["vehicle_type"] for video in json.load(f)], ["bus", "bus"])
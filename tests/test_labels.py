@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+from icvlp import ICVLP, Plate, Video
+from icvlp.labels import PlateLabel, invalid_labels, label_counts, parse_label, parse_labels, region_counts
+from icvlp.store import AnnotationStore
+
+
+class TestLabels(TestCase):
+    def setUp(self):
+        self.dataset = ICVLP([
+            Video(video_id="0001", plates=[
+                Plate(label="AB8381FU", frame_start=1, frame_end=2, frames=[]),
+                Plate(label="B9856PDD", frame_start=1, frame_end=2, frames=[]),
+                Plate(label="BM96670BO", frame_start=1, frame_end=2, frames=[]),
+            ]),
+            Video(video_id="0002", plates=[
+                Plate(label="AB8381FU", frame_start=1, frame_end=2, frames=[]),
+                Plate(label="XY123A", frame_start=1, frame_end=2, frames=[]),
+            ]),
+        ])
+
+    def test_parse_label(self):
+        self.assertEqual(parse_label("AB8381FU"), PlateLabel("AB", "8381", "FU"))
+        self.assertEqual(parse_label("b 1 ri"), PlateLabel("B", "1", "RI"))
+        self.assertEqual(parse_label("H1912"), PlateLabel("H", "1912", ""))
+        self.assertEqual(parse_label("AB8381FU").region_name, "Yogyakarta")
+        self.assertEqual(parse_label("AB8381FU").text, "AB8381FU")
+        for label in ["BM96670BO", "AB0123CD", "1234AB", "ABC123D", "AB12CDEF", "AB12C3", "", None]:
+            self.assertIsNone(parse_label(label), label)
+
+    def test_parse_labels(self):
+        labels = ["AB8381FU", "G1618JA", "AB8381FU", "??"] * 5
+        expected = [parse_label(label) for label in labels]
+        self.assertEqual(parse_labels(labels), expected)
+        self.assertEqual(parse_labels(labels, workers=2, chunksize=1), expected)
+
+    def test_counts(self):
+        self.assertEqual(label_counts(self.dataset)["AB8381FU"], 2)
+        expected = {"AB": 2, "B": 1, "XY": 1, None: 1}
+        self.assertEqual(region_counts(self.dataset), expected)
+        self.assertEqual(region_counts(AnnotationStore.from_icvlp(self.dataset)), expected)
+
+    def test_invalid_labels(self):
+        self.assertEqual([plate.label for _, plate in invalid_labels(self.dataset)], ["BM96670BO"])
+        self.assertEqual([(video.video_id, plate.label) for video, plate in invalid_labels(self.dataset, True)],
+                         [("0001", "BM96670BO"), ("0002", "XY123A")])
+
+    def test_multiline_label(self):
+        self.dataset.videos[1].plates[1].label = "B12\nCD"
+        self.assertEqual(region_counts(self.dataset), {"AB": 2, "B": 1, None: 2})
+        self.assertEqual(parse_labels(["B12\nCD", "B12CD"]), [None, PlateLabel("B", "12", "CD")])
@@ -1,8 +1,12 @@
 import json
 import os
+import tempfile
 from unittest import TestCase
 
-from icvlp import Frame, Plate, Video, ICVLP
+import numpy as np
+
+from icvlp import Frame, Plate, Video, ICVLP, InvalidFramesError, LazyICVLP
+from icvlp.object import _iter_json_array, _iter_json_chunks
 
 
 class BaseTestCase(TestCase):
@@ -90,6 +94,19 @@ class TestFrame(TestCase):
         with self.assertRaises(ValueError):
             Frame(frame=10, bbox=[200, 200, 100, 100])
 
+    def test_slots(self):
+        frame = Frame(frame=10, bbox=[1, 1, 2, 2])
+        self.assertFalse(hasattr(frame, "__dict__"))
+        with self.assertRaises(AttributeError):
+            frame.score = 0.5
+        self.assertEqual(frame.children, [])
+
+    def test_from_trusted(self):
+        bbox = [1, 1, 2, 2]
+        frame = Frame.from_trusted(10, bbox)
+        self.assertIs(frame.bbox, bbox)
+        self.assertEqual(frame.as_dict(), {"frame": 10, "bbox": [1, 1, 2, 2]})
+
 
 class TestPlate(BaseTestCase):
     def test_can_append_frame(self):
@@ -123,6 +140,140 @@ class TestPlate(BaseTestCase):
         with self.assertRaises(ValueError):
             self.plate.extend(self.frames2)
 
+    def test_frames_are_kept_sorted(self):
+        plate = Plate(label="N123XYZ", frame_start=1, frame_end=30, frames=[
+            Frame(frame=10, bbox=[1, 1, 9, 9]),
+            Frame(frame=5, bbox=[1, 1, 9, 9]),
+        ])
+        self.assertEqual(plate.frame_numbers, [5, 10])
+        plate.append(Frame(frame=20, bbox=[1, 1, 9, 9]))
+        plate.append(Frame(frame=7, bbox=[1, 1, 9, 9]))
+        plate.extend([Frame(frame=25, bbox=[1, 1, 9, 9]), Frame(frame=1, bbox=[1, 1, 9, 9])])
+        self.assertEqual([frame.frame for frame in plate.frames], [1, 5, 7, 10, 20, 25])
+        self.assertEqual(plate.frame_numbers, [1, 5, 7, 10, 20, 25])
+        self.assertNotIn("_frame_numbers", plate.as_dict())
+
+    def test_frame_lookup(self):
+        self.plate.extend([Frame(frame=f, bbox=[1, 1, 9, f + 9]) for f in [9, 3, 5, 1]])
+        self.assertEqual(self.plate.get_frame(5).bbox, [1, 1, 9, 14])
+        self.assertIsNone(self.plate.get_frame(4))
+        self.assertTrue(self.plate.has_frame(9))
+        self.assertFalse(self.plate.has_frame(10))
+        self.assertTrue(self.plate.check_frame_number_exists_in_children(1))
+        self.assertEqual([frame.frame for frame in self.plate.frames_between(2, 9)], [3, 5, 9])
+        self.assertEqual(self.plate.frames_between(6, 8), [])
+
+        # Direct modifications are picked up on the next lookup.
+        self.plate.frames.clear()
+        self.assertFalse(self.plate.has_frame(5))
+        self.plate.frames = [Frame(frame=8, bbox=[1, 1, 9, 9]), Frame(frame=2, bbox=[1, 1, 9, 9])]
+        self.assertEqual(self.plate.get_frame(8).frame, 8)
+        self.assertEqual(self.plate.frame_numbers, [2, 8])
+
+    def test_extend_arrays(self):
+        self.plate.extend_arrays(np.array([6, 2]), np.array([[1.7, 2, 9, 9], [0, 0, 5, 5]]))
+        self.assertEqual([frame.as_dict() for frame in self.plate.frames],
+                         [{"frame": 2, "bbox": [0, 0, 5, 5]}, {"frame": 6, "bbox": [1, 2, 9, 9]}])
+        self.assertTrue(self.plate.has_frame(6))
+        self.plate.extend_arrays([], [])
+        self.assertEqual(len(self.plate.frames), 2)
+
+    def test_extend_arrays_reports_every_invalid_row(self):
+        with self.assertRaises(InvalidFramesError) as context:
+            self.plate.extend_arrays([1, 2, 11, 3.5], [[0, 0, 5, 5], [5, 0, 5, 5], [0, 0, 5, 5], [0, 0, 5, np.nan]])
+        message = str(context.exception)
+        self.assertIn("3 invalid frames", message)
+        self.assertIn("row 1 (frame 2", message)
+        self.assertIn("row 2 (frame 11", message)
+        self.assertIn("bbox is not finite, frame number is not an integer", message)
+        self.assertEqual(context.exception.rows, [1, 2, 3])
+        self.assertEqual(self.plate.frames, [])
+
+        with self.assertRaises(ValueError):
+            self.plate.extend_arrays([1, 2], [[0, 0, 5, 5]])
+        with self.assertRaises(ValueError):
+            self.plate.extend_arrays([1], [[0, 0, 5]])
+        with self.assertRaises(TypeError):
+            self.plate.extend_arrays([1], [["a", 0, 5, 5]])
+
+    def test_validate(self):
+        self.plate.frames = [Frame.from_trusted(2, [0, 0, 5, 5]), Frame.from_trusted(3, None)]
+        self.plate.validate()
+        self.plate.frames.append(Frame.from_trusted(20, [5, 5, 0, 0]))
+        with self.assertRaisesRegex(ValueError, "N123XYZ: 1 invalid frames"):
+            self.plate.validate()
+
+    def test_children_are_stored_once(self):
+        self.plate.append(self.frames1[0])
+        self.assertIs(self.plate.children, self.plate.frames)
+        self.assertEqual(len(self.plate.frames), 1)
+        self.plate.frames = list(self.frames1)
+        self.assertIs(self.plate.children, self.plate.frames)
+        self.plate.children = []
+        self.assertEqual(self.plate.frames, [])
+
+    def test_from_trusted(self):
+        frames = [Frame(frame=6, bbox=[1, 1, 9, 9]), Frame(frame=1, bbox=[1, 1, 9, 9])]
+        plate = Plate.from_trusted("N123XYZ", None, 1, 10, frames)
+        self.assertIs(plate.frames, frames)
+        self.assertEqual(plate.frame_numbers, [1, 6])
+        self.assertTrue(plate.has_frame(6))
+        self.assertEqual(list(plate.as_dict()), ["label", "vehicle_type", "frame_start", "frame_end", "frames"])
+
+    def test_from_dict_ignores_unknown_keys(self):
+        plate = Plate().from_dict({"label": "N123XYZ", "frame_start": 1, "frame_end": 10, "color": "yellow"})
+        self.assertEqual(plate.as_dict(), {"label": "N123XYZ", "vehicle_type": None, "frame_start": 1,
+                                           "frame_end": 10, "frames": []})
+
+    def test_from_dict_sorts_frames(self):
+        plate = Plate().from_dict({"label": "N123XYZ", "vehicle_type": None, "frame_start": 1, "frame_end": 10,
+                                   "frames": [Frame(frame=6, bbox=[1, 1, 9, 9]), Frame(frame=1, bbox=[1, 1, 9, 9])]})
+        self.assertEqual([frame.frame for frame in plate.frames], [1, 6])
+
+    def test_dense_boxes_linear(self):
+        plate = Plate(label="N123XYZ", frame_start=1, frame_end=21, frames=[
+            Frame(frame=11, bbox=[20, 10, 40, 30]),
+            Frame(frame=1, bbox=[0, 0, 20, 20]),
+            Frame(frame=16, bbox=[20, 10, 40, 30]),
+            Frame(frame=6, bbox=None),
+        ])
+        frame_numbers, boxes = plate.dense_boxes()
+        np.testing.assert_array_equal(frame_numbers, np.arange(1, 17))
+        self.assertEqual(boxes.dtype, np.int32)
+        self.assertEqual(boxes[0].tolist(), [0, 0, 20, 20])
+        self.assertEqual(boxes[5].tolist(), [10, 5, 30, 25])
+        self.assertEqual(boxes[10].tolist(), [20, 10, 40, 30])
+        self.assertEqual(boxes[12].tolist(), [20, 10, 40, 30])
+
+        frame_numbers, boxes = plate.dense_boxes(step=5)
+        self.assertEqual(frame_numbers.tolist(), [1, 6, 11, 16])
+        self.assertEqual(boxes[1].tolist(), [10, 5, 30, 25])
+
+    def test_dense_boxes_cubic(self):
+        keyframes = [1, 6, 16, 21, 31]
+        frames = [Frame(frame=f, bbox=[f, 2 * f, f + 30, 2 * f + 10]) for f in keyframes]
+        plate = Plate(label="N123XYZ", frame_start=1, frame_end=40, frames=frames)
+        # A natural cubic spline reproduces linear motion exactly.
+        frame_numbers, boxes = plate.dense_boxes(method="cubic")
+        np.testing.assert_array_equal(frame_numbers, np.arange(1, 32))
+        np.testing.assert_array_equal(boxes[:, 0], frame_numbers)
+        np.testing.assert_array_equal(boxes[:, 3], 2 * frame_numbers + 10)
+
+        frames[2].bbox = [40, 40, 80, 60]
+        frame_numbers, boxes = plate.dense_boxes(method="cubic")
+        for frame in frames:
+            self.assertEqual(boxes[frame.frame - 1].tolist(), frame.bbox)
+        self.assertTrue((boxes[:, 2] > boxes[:, 0]).all() and (boxes[:, 3] > boxes[:, 1]).all())
+
+    def test_dense_boxes_few_keyframes(self):
+        self.assertEqual(self.plate.dense_boxes()[1].shape, (0, 4))
+        self.plate.append(Frame(frame=4, bbox=[1, 1, 5, 5]))
+        frame_numbers, boxes = self.plate.dense_boxes(method="cubic")
+        self.assertEqual(frame_numbers.tolist(), [4])
+        self.assertEqual(boxes.tolist(), [[1, 1, 5, 5]])
+        with self.assertRaises(ValueError):
+            self.plate.dense_boxes(method="quadratic")
+
 
 class TestVideo(BaseTestCase):
     def test_can_append_plate(self):
@@ -160,6 +311,7 @@ class TestICVLP(BaseTestCase):
             self.test_data = json.load(f)
             f.close()
 
+        self.test_filename = test_filename
         self.icvlp = ICVLP.from_json(test_filename)
 
     def test_can_dump_json_string(self):
@@ -185,3 +337,80 @@ class TestICVLP(BaseTestCase):
             self.icvlp.extend(self.plates)
         with self.assertRaises(TypeError):
             self.icvlp.extend(self.frames1)
+
+    def test_cannot_append_duplicate_video_id(self):
+        self.icvlp.append(self.video)
+        with self.assertRaises(KeyError):
+            self.icvlp.append(Video(video_id=self.video.video_id))
+
+    def test_cannot_extend_duplicate_video_ids(self):
+        videos_len = len(self.icvlp.videos)
+        with self.assertRaises(KeyError):
+            self.icvlp.extend([self.video, Video(video_id=self.video.video_id)])
+        with self.assertRaises(KeyError):
+            self.icvlp.extend([self.video, Video(video_id="0001")])
+        self.assertEqual(len(self.icvlp.videos), videos_len)
+        self.assertIsNone(self.icvlp.get_video_by_id(self.video.video_id))
+
+    def test_get_video_by_id(self):
+        self.icvlp.extend(self.videos)
+        self.assertEqual(self.icvlp.get_video_by_id("0001").video_id, "0001")
+        self.assertEqual(self.icvlp.get_video_by_id("9998"), self.videos[1])
+        self.assertIsNone(self.icvlp.get_video_by_id("9997"))
+
+        self.icvlp.videos.append(self.video)
+        self.assertEqual(self.icvlp.get_video_by_id("9997"), self.video)
+
+    def test_densify(self):
+        self.plates[0].extend([Frame(frame=1000, bbox=[0, 0, 10, 10]), Frame(frame=1010, bbox=[10, 0, 20, 10])])
+        self.plates[1].append(Frame(frame=2000, bbox=[0, 0, 10, 10]))
+        self.video.extend(self.plates)
+        store = ICVLP([self.video]).densify(step=2)
+        self.assertEqual(store.num_frames, 7)
+        plate = store[0].plates[0]
+        self.assertEqual(plate.label, "X123BCA")
+        self.assertEqual(plate.frame_numbers.tolist(), [1000, 1002, 1004, 1006, 1008, 1010])
+        self.assertEqual(plate.bboxes[1].tolist(), [2, 0, 12, 10])
+        self.assertEqual(store[0].plates[1].frames[0].as_dict(), {"frame": 2000, "bbox": [0, 0, 10, 10]})
+
+    def test_iter_json(self):
+        videos = list(ICVLP.iter_json(self.test_filename))
+        self.assertEqual([video.as_dict() for video in videos], self.test_data)
+        for video in videos:
+            self.assertIsInstance(video, Video)
+
+    def test_from_trusted(self):
+        dataset = ICVLP.from_trusted(self.videos)
+        self.assertIs(dataset.videos, self.videos)
+        self.assertIs(dataset.get_video_by_id("9998"), self.videos[1])
+        with self.assertRaises(KeyError):
+            dataset.append(Video(video_id="9999", plates=[]))
+
+    def test_iter_json_array_small_chunks(self):
+        for chunk_size in [1, 7, 64]:
+            self.assertEqual(list(_iter_json_array(self.test_filename, chunk_size)), self.test_data)
+
+    def test_from_json_lazy(self):
+        dataset = ICVLP.from_json(self.test_filename, lazy=True)
+        self.assertIsInstance(dataset, LazyICVLP)
+        self.assertEqual([video.video_id for video in dataset.videos], ["0001", "0002"])
+        self.assertEqual([video.video_id for video in dataset], ["0001", "0002"])
+        self.assertEqual(dataset.load().to_json(), self.icvlp.to_json())
+
+    def test_can_dump_json_formats(self):
+        self.icvlp.append(Video(video_id="\u00fc\"", plates=[Plate(label="AB1CD", frames=[Frame(frame=5)])]))
+        data = [video.as_dict() for video in self.icvlp.videos]
+        for indent in [None, 0, 2, 4]:
+            self.assertEqual(self.icvlp.to_json(indent), json.dumps(data, indent=indent))
+            self.assertEqual("".join(_iter_json_chunks(self.icvlp.videos, indent)), json.dumps(data, indent=indent))
+        compact = json.dumps(data, separators=(",", ":"))
+        self.assertEqual(self.icvlp.to_json(compact=True), compact)
+        self.assertEqual("".join(_iter_json_chunks(self.icvlp.videos, compact=True)), compact)
+        self.assertEqual(ICVLP([]).to_json(), "[]")
+
+    def test_can_write_json_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "dataset.json")
+            self.icvlp.write_json(filename)
+            with open(filename, "r") as f:
+                self.assertEqual(f.read(), json.dumps(self.test_data, indent=2))
@@ -0,0 +1,97 @@
+import os
+
+import cv2
+import numpy as np
+
+from icvlp.proposals import ProposalCache, Proposals, detect_frames, plate_frame_numbers, propose_video
+
+from tests.test_video import VideoTestCase, seek_frame
+
+
+class FakeDetector:
+    r"""Proposes one box per image whose size encodes the image brightness, and records the batch sizes."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, images):
+        self.batches.append(len(images))
+        results = []
+        for image in images:
+            value = float(image.mean())
+            results.append((np.array([[0, 0, 4, 4], [1, 2, value, value]]), np.array([0.25, 0.75])))
+        return results
+
+
+class TestProposals(VideoTestCase):
+    def test_plate_frame_numbers(self):
+        self.assertEqual(plate_frame_numbers(self.video, 5), [1, 6, 11, 16, 21, 26, 31])
+
+    def test_detect_frames_in_batches(self):
+        detector = FakeDetector()
+        cap = cv2.VideoCapture(self.video_filename)
+        proposals = detect_frames(cap, plate_frame_numbers(self.video, 5), detector, batch_size=3)
+        self.assertEqual(detector.batches, [3, 3, 1])
+        self.assertEqual(proposals.shape, (48, 64, 3))
+        self.assertEqual(len(proposals), 7)
+        self.assertIn(11, proposals)
+        self.assertNotIn(12, proposals)
+
+        boxes, confidences = proposals.get(11)
+        np.testing.assert_array_equal(confidences, [0.75, 0.25])
+        expected = seek_frame(self.video_filename, 11).mean()
+        np.testing.assert_allclose(boxes[0], [1, 2, expected, expected], rtol=1e-6)
+        boxes, confidences = proposals.get(12)
+        self.assertEqual(boxes.shape, (0, 4))
+        self.assertEqual(len(confidences), 0)
+
+    def test_cache(self):
+        cache = ProposalCache(os.path.join(self.tmpdir.name, "proposals"))
+        self.assertIsNone(cache.get("0001"))
+        detector = FakeDetector()
+        proposals = propose_video(self.video, self.video_filename, detector, cache, batch_size=16)
+        self.assertEqual(detector.batches, [7])
+        self.assertIn("0001", cache)
+
+        cached = propose_video(self.video, self.video_filename, detector, cache)
+        self.assertEqual(detector.batches, [7])
+        for name in ["frame_numbers", "offsets", "boxes", "confidences"]:
+            np.testing.assert_array_equal(getattr(cached, name), getattr(proposals, name))
+        self.assertEqual(cached.shape, proposals.shape)
+
+        propose_video(self.video, self.video_filename, detector, cache, batch_size=4, overwrite=True)
+        self.assertEqual(detector.batches, [7, 4, 3])
+
+    def test_cache_is_completed_with_missing_frames(self):
+        cache = ProposalCache(os.path.join(self.tmpdir.name, "proposals"))
+        detector = FakeDetector()
+        proposals = propose_video(self.video, self.video_filename, detector, cache, step=10)
+        self.assertEqual(proposals.frame_numbers.tolist(), [1, 11, 21, 31])
+
+        # Only the frames of another step are detected; frames past the end of the video are cached without boxes.
+        self.video.plates[0].frame_end = 1000
+        proposals = propose_video(self.video, self.video_filename, detector, cache, step=5)
+        self.assertEqual(detector.batches, [4, 6])
+        self.assertEqual(proposals.frame_numbers.tolist()[:8], [1, 6, 11, 16, 21, 26, 31, 36])
+        self.assertIn(996, proposals)
+        self.assertEqual(proposals.get(996)[0].shape, (0, 4))
+        self.assertEqual(proposals.shape, (48, 64, 3))
+        np.testing.assert_array_equal(cache.get("0001").frame_numbers, proposals.frame_numbers)
+        expected = seek_frame(self.video_filename, 16).mean()
+        np.testing.assert_allclose(proposals.get(16)[0][0], [1, 2, expected, expected], rtol=1e-6)
+
+        propose_video(self.video, self.video_filename, detector, cache, step=5)
+        self.assertEqual(detector.batches, [4, 6])
+
+    def test_detections(self):
+        detections = {3: (np.array([[0, 0, 1, 1]]), np.array([0.5])), 1: (np.zeros((0, 4)), np.zeros(0))}
+        unpacked = Proposals.from_detections(detections, (2, 2, 3)).detections()
+        self.assertEqual(list(unpacked), [1, 3])
+        np.testing.assert_array_equal(unpacked[3][0], [[0, 0, 1, 1]])
+        self.assertEqual(unpacked[1][0].shape, (0, 4))
+
+    def test_empty(self):
+        proposals = Proposals.from_detections({}, (0, 0, 0))
+        self.assertEqual(len(proposals), 0)
+        self.assertEqual(proposals.get(1)[0].shape, (0, 4))
+
@@ -0,0 +1,108 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from icvlp import ICVLP, Frame, Plate, Video
+from icvlp.journal import Journal
+
+
+class TestQuery(TestCase):
+    def setUp(self):
+        self.dataset = ICVLP([
+            Video(video_id="0001", source="a", plates=[
+                Plate(label="B1234CD", vehicle_type="bus", frame_start=1, frame_end=20, frames=[
+                    Frame(frame=1, bbox=[0, 0, 30, 10]),
+                    Frame(frame=6, bbox=[0, 0, 80, 30]),
+                ]),
+                Plate(label="B99XY", vehicle_type="semi_trailer", frame_start=100, frame_end=200, frames=[]),
+                Plate(label="AD1EF", vehicle_type=None, frame_start=30, frame_end=40, frames=[]),
+            ]),
+            Video(video_id="0002", source="b", plates=[
+                Plate(label="B99XY", vehicle_type="semi_trailer", frame_start=1, frame_end=20, frames=[
+                    Frame(frame=11, bbox=[10, 10, 60, 30]),
+                ]),
+                Plate(label="L7GH", vehicle_type="semi_trailer", frame_start=1, frame_end=20, frames=[
+                    Frame(frame=16, bbox=None),
+                ]),
+            ]),
+        ])
+        self.plates = [plate for video in self.dataset.videos for plate in video.plates]
+
+    def labels(self, query) -> list[str]:
+        return [plate.label for plate in query.plates()]
+
+    def test_indexed_filters(self):
+        query = self.dataset.query
+        self.assertEqual(len(query()), 5)
+        self.assertEqual(self.labels(query(vehicle_type="semi_trailer", annotated=False)), ["B99XY", "L7GH"])
+        self.assertEqual(self.labels(query(vehicle_type=None)), ["AD1EF"])
+        self.assertEqual(self.labels(query(vehicle_type=["bus", None])), ["B1234CD", "AD1EF"])
+        self.assertEqual(self.labels(query(label_prefix="B9")), ["B99XY", "B99XY"])
+        self.assertEqual(self.labels(query(label_regex=r"^[A-Z]\d+[A-Z]{2}$")), ["B1234CD", "B99XY", "B99XY", "L7GH"])
+        self.assertEqual(self.labels(query(label="B99XY", source="b")), ["B99XY"])
+        self.assertEqual(query(annotated=True).count(), 2)
+        self.assertEqual([video.video_id for video in query(video_id=["0002", "0003"]).videos()], ["0002"])
+        self.assertEqual(query(source="c").plates(), [])
+
+    def test_frame_filters(self):
+        query = self.dataset.query(frame_range=(5, 16))
+        self.assertEqual(self.labels(query), ["B1234CD", "B99XY", "L7GH"])
+        self.assertEqual([(video.video_id, frame.frame) for video, _, frame in query.frames()],
+                         [("0001", 6), ("0002", 11), ("0002", 16)])
+
+        large = query.filter(min_bbox_size=(50, 20))
+        self.assertEqual(self.labels(large), ["B1234CD", "B99XY"])
+        self.assertEqual([frame.frame for _, _, frame in large.frames()], [6, 11])
+        self.assertEqual(self.labels(self.dataset.query(max_bbox_size=(40, 20))), ["B1234CD"])
+
+    def test_by_video(self):
+        groups = self.dataset.query(vehicle_type="semi_trailer").by_video()
+        self.assertEqual([(video.video_id, len(plates)) for video, plates in groups], [("0001", 1), ("0002", 2)])
+        self.assertEqual(list(self.dataset.query(vehicle_type="bus")), [(self.dataset.videos[0], self.plates[0])])
+
+    def test_index_is_rebuilt_after_mutation(self):
+        index = self.dataset.query_index
+        self.assertIs(self.dataset.query_index, index)
+
+        self.dataset.append(Video(video_id="0003", source="c", plates=[
+            Plate(label="AB1CD", vehicle_type="bus", frame_start=1, frame_end=2, frames=[]),
+        ]))
+        self.assertIsNot(self.dataset.query_index, index)
+        self.assertEqual(self.dataset.query(vehicle_type="bus").count(), 2)
+
+        self.plates[2].append(Frame(frame=35, bbox=[0, 0, 10, 10]))
+        self.assertEqual(self.labels(self.dataset.query(annotated=True)), ["B1234CD", "AD1EF", "B99XY"])
+        self.plates[1].extend_arrays([150], [[0, 0, 10, 10]])
+        self.assertEqual(self.labels(self.dataset.query(annotated=False)), ["L7GH", "AB1CD"])
+
+        plate = Plate(label="L8IJ", vehicle_type="bus", frame_start=1, frame_end=2, frames=[])
+        self.dataset.videos[1].append(plate)
+        self.assertEqual(self.dataset.query().count(), 7)
+        plate.append(Frame(frame=2, bbox=[0, 0, 10, 10]))
+        self.assertEqual(self.dataset.query(annotated=True).count(), 5)
+
+        # Assigning fields is not detected.
+        self.plates[2].vehicle_type = "minibus"
+        self.dataset.invalidate_indexes()
+        self.assertEqual(self.dataset.query(vehicle_type="minibus").count(), 1)
+
+    def test_changes_to_other_datasets_keep_the_index(self):
+        index = self.dataset.query_index
+        other = ICVLP([Video(video_id="0001", plates=[Plate(label="AB1CD", frame_start=1, frame_end=2)])])
+        other.query_index
+        other.videos[0].plates[0].append(Frame(frame=1, bbox=[0, 0, 10, 10]))
+        other.videos[0].append(Plate(label="EF2GH", frame_start=1, frame_end=2))
+        Plate(label="EF2GH", frame_start=1, frame_end=2).append(Frame(frame=1, bbox=[0, 0, 10, 10]))
+        self.assertIs(self.dataset.query_index, index)
+
+    def test_journal_invalidates_index(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "dataset.json")
+            self.dataset.write_json(path)
+            with Journal(path) as journal:
+                dataset = journal.dataset
+                self.assertEqual(dataset.query(vehicle_type=None).count(), 1)
+                journal.set_vehicle_type("0001", 2, "bus")
+                self.assertEqual(dataset.query(vehicle_type=None).count(), 0)
+                journal.add_frame("0001", 1, Frame(frame=150, bbox=[0, 0, 10, 10]))
+                self.assertEqual(self.labels(dataset.query(annotated=False)), ["AD1EF", "L7GH"])
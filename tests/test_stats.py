@@ -0,0 +1,59 @@
+import json
+from unittest import TestCase
+
+from icvlp import ICVLP, Frame, Plate, Video
+from icvlp.stats import DatasetStats, distribution
+from icvlp.store import AnnotationStore
+
+
+class TestDatasetStats(TestCase):
+    def setUp(self):
+        self.dataset = ICVLP([
+            Video(video_id="0001", source="a", plates=[
+                Plate(label="AB1CD", vehicle_type="bus", frame_start=1, frame_end=20, frames=[
+                    Frame(frame=1, bbox=[0, 0, 30, 10]),
+                    Frame(frame=6, bbox=[0, 0, 40, 10]),
+                    Frame(frame=11, bbox=None),
+                ]),
+                Plate(label="EF2GH", vehicle_type=None, frame_start=1, frame_end=20, frames=[]),
+            ]),
+            Video(video_id="0002", source="b", plates=[
+                Plate(label="AB1CD", vehicle_type="box_truck", frame_start=1, frame_end=20, frames=[
+                    Frame(frame=1, bbox=[10, 10, 30, 20]),
+                ]),
+            ]),
+            Video(video_id="0003", source="a", plates=[]),
+        ])
+
+    def test_counts(self):
+        stats = DatasetStats.from_dataset(self.dataset)
+        self.assertEqual((stats.num_videos, stats.num_plates, stats.num_distinct_labels, stats.num_frames),
+                         (3, 3, 2, 4))
+        self.assertEqual(stats.vehicles_by_type, {"bus": 1, None: 1})
+        self.assertEqual(stats.plates_by_type, {"bus": 1, None: 1, "box_truck": 1})
+        self.assertEqual(stats.frames_per_plate.tolist(), [3, 0, 1])
+        self.assertEqual(stats.bbox_sizes.tolist(), [[30, 10], [40, 10], [20, 10]])
+
+        data = stats.as_dict()
+        self.assertEqual(data["sources"], {"a": {"videos": 2, "plates": 2, "frames": 3},
+                                           "b": {"videos": 1, "plates": 1, "frames": 1}})
+        self.assertEqual(data["bbox_aspect_ratio"]["min"], 2.0)
+        self.assertEqual(data["bbox_aspect_ratio"]["max"], 4.0)
+        self.assertEqual(json.loads(stats.to_json()), data)
+        self.assertIn("Distinct plates", stats.to_table())
+
+    def test_store_matches_objects(self):
+        expected = DatasetStats.from_dataset(self.dataset).as_dict()
+        self.assertEqual(DatasetStats.from_dataset(AnnotationStore.from_icvlp(self.dataset)).as_dict(), expected)
+
+    def test_incremental_and_merge(self):
+        expected = DatasetStats.from_dataset(self.dataset).as_dict()
+        first = DatasetStats().update(self.dataset.videos[0])
+        rest = DatasetStats().update_many(self.dataset.videos[1:])
+        self.assertEqual(first.merge(rest).as_dict(), expected)
+
+    def test_empty(self):
+        data = DatasetStats().as_dict()
+        self.assertEqual(data["videos"], 0)
+        self.assertEqual(data["bbox_width"], {"count": 0})
+        self.assertEqual(distribution([1, 2, 3])["median"], 2.0)
@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from icvlp import ICVLP, AnnotationStore, Frame, Plate, Video
+
+
+class TestAnnotationStore(TestCase):
+    def setUp(self):
+        dirname = os.path.dirname(os.path.dirname(__file__))
+        self.test_filename = os.path.join(dirname, 'test.json')
+
+        with open(self.test_filename, 'r') as f:
+            self.test_data = json.load(f)
+
+        self.store = AnnotationStore.from_json(self.test_filename)
+
+    def test_columns(self):
+        self.assertEqual(self.store.num_videos, 2)
+        self.assertEqual(self.store.num_plates, 2)
+        self.assertEqual(self.store.num_frames, 2)
+        self.assertEqual(self.store.bboxes.shape, (2, 4))
+        self.assertEqual(self.store.bboxes.dtype, np.int32)
+        np.testing.assert_array_equal(self.store.frame_offsets, [0, 1, 2])
+        np.testing.assert_array_equal(self.store.plate_offsets, [0, 1, 2])
+
+    def test_views(self):
+        video = self.store.get_video_by_id("0002")
+        self.assertEqual(video.source, "Something")
+        plate = video.plates[0]
+        self.assertEqual(plate.label, "EX4MPLE")
+        self.assertEqual(plate.frames[0].frame, 222)
+        self.assertEqual(plate.frames[0].bbox, [1, 1, 200, 200])
+        self.assertTrue(plate.check_frame_number_exists_in_children(222))
+        self.assertFalse(plate.check_frame_number_exists_in_children(223))
+        self.assertIsNone(self.store.get_video_by_id("9999"))
+
+    def test_can_dump_json_string(self):
+        self.assertEqual(self.store.to_json(), json.dumps(self.test_data, indent=2))
+
+    def test_round_trip_icvlp(self):
+        dataset = ICVLP.from_json(self.test_filename)
+        self.assertEqual(AnnotationStore.from_icvlp(dataset).to_json(), dataset.to_json())
+        self.assertEqual(self.store.to_icvlp().to_json(), dataset.to_json())
+
+    def test_missing_values(self):
+        video = Video(video_id="0003", plates=[Plate(label="AB1CD", frames=[Frame(frame=5)])])
+        store = AnnotationStore.from_videos([video])
+        self.assertEqual(store.to_json(), ICVLP([video]).to_json())
+
+    def test_missing_frame_number_round_trip(self):
+        video = Video(video_id="0003", plates=[Plate(label="AB1CD", frames=[Frame(bbox=[1, 1, 2, 2])])])
+        store = AnnotationStore.from_videos([video])
+        self.assertIsNone(store.videos[0].plates[0].frames[0].frame)
+        self.assertIsNone(store.to_icvlp().videos[0].plates[0].frames[0].frame)
+        self.assertEqual(store.to_icvlp().to_json(), ICVLP([video]).to_json())
+
+
+class TestBinaryFormat(TestCase):
+    def setUp(self):
+        dirname = os.path.dirname(os.path.dirname(__file__))
+        self.dataset = ICVLP.from_json(os.path.join(dirname, 'test.json'))
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.binary_filename = os.path.join(self.tmpdir.name, 'test.icvlp')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        self.dataset.to_binary(self.binary_filename)
+        self.assertEqual(ICVLP.from_binary(self.binary_filename).to_json(), self.dataset.to_json())
+
+    def test_lazy_is_memory_mapped(self):
+        self.dataset.to_binary(self.binary_filename)
+        store = ICVLP.from_binary(self.binary_filename, lazy=True)
+        self.assertIsInstance(store, AnnotationStore)
+        self.assertIsInstance(store.bboxes, np.memmap)
+        self.assertEqual(store.get_video_by_id("0001").plates[0].label, "AB8381FU")
+        self.assertEqual(store.to_json(), self.dataset.to_json())
+
+    def test_load_without_mmap(self):
+        self.dataset.to_binary(self.binary_filename)
+        store = AnnotationStore.load(self.binary_filename, mmap=False)
+        self.assertNotIsInstance(store.bboxes, np.memmap)
+        self.assertEqual(store.to_json(), self.dataset.to_json())
+
+    def test_round_trip_missing_values_and_empty(self):
+        for dataset in [ICVLP([]),
+                        ICVLP([Video(video_id="0003"),
+                               Video(video_id="0004", source="Ünïcode", plates=[Plate(label="AB1CD")])])]:
+            dataset.to_binary(self.binary_filename)
+            self.assertEqual(ICVLP.from_binary(self.binary_filename).to_json(), dataset.to_json())
+
+    def test_rejects_other_files(self):
+        with open(self.binary_filename, 'w') as f:
+            f.write("[]")
+        with self.assertRaises(ValueError):
+            AnnotationStore.load(self.binary_filename)
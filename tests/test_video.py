@@ -0,0 +1,192 @@
+import json
+import os
+import tempfile
+import time
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from icvlp import Frame, Plate, Video
+from icvlp.extraction import FrameWriter, ThroughputCounters, extract_video, extract_videos, plan_frames
+from icvlp.video import FramePrefetcher, VideoReaderPool, read_frames
+
+
+def write_video(path: str, num_frames: int, fps: int = 30):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (64, 48))
+    for i in range(num_frames):
+        writer.write(np.full((48, 64, 3), (i * 5) % 256, dtype=np.uint8))
+    writer.release()
+
+
+def seek_frame(video_filename: str, frame_number: int) -> np.ndarray:
+    cap = cv2.VideoCapture(video_filename)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number - 1)
+    _, frame = cap.read()
+    cap.release()
+    return frame
+
+
+class VideoTestCase(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.video_filename = os.path.join(self.tmpdir.name, "0001.mp4")
+        write_video(self.video_filename, 50)
+        self.video = Video(video_id="0001", fps=6, plates=[
+            Plate(label="AB1CD", frame_start=1, frame_end=21, frames=[Frame(frame=1, bbox=[1, 1, 10, 10])]),
+            Plate(label="EF2GH", frame_start=11, frame_end=31, frames=[]),
+        ])
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+
+class TestReadFrames(VideoTestCase):
+    def test_matches_seek_per_frame(self):
+        frame_numbers = [40, 3, 3, 1, 17, 18, 50]
+        cap = cv2.VideoCapture(self.video_filename)
+        frames = list(read_frames(cap, frame_numbers, max_gap=10))
+        self.assertEqual([frame_number for frame_number, _ in frames], [1, 3, 17, 18, 40, 50])
+        for frame_number, frame in frames:
+            np.testing.assert_array_equal(frame, seek_frame(self.video_filename, frame_number))
+
+    def test_stops_at_end_of_video(self):
+        cap = cv2.VideoCapture(self.video_filename)
+        self.assertEqual([frame_number for frame_number, _ in read_frames(cap, [49, 50, 51, 60])], [49, 50])
+
+
+class TestFramePrefetcher(VideoTestCase):
+    def test_matches_read_frames(self):
+        frame_numbers = [40, 3, 1, 17, 18, 50, 60]
+        expected = list(read_frames(cv2.VideoCapture(self.video_filename), frame_numbers))
+        with FramePrefetcher(cv2.VideoCapture(self.video_filename), frame_numbers, buffer_size=2) as frames:
+            prefetched = list(frames)
+        self.assertEqual([n for n, _ in prefetched], [n for n, _ in expected])
+        for (_, image), (_, expected_image) in zip(prefetched, expected):
+            np.testing.assert_array_equal(image, expected_image)
+
+    def test_buffer_is_bounded(self):
+        with FramePrefetcher(cv2.VideoCapture(self.video_filename), range(1, 51), buffer_size=3) as frames:
+            time.sleep(0.2)
+            self.assertEqual(frames._buffer.qsize(), 3)
+            self.assertEqual(next(iter(frames))[0], 1)
+
+    def test_close_early(self):
+        prefetcher = FramePrefetcher(cv2.VideoCapture(self.video_filename), range(1, 51), buffer_size=1)
+        prefetcher.close()
+        self.assertFalse(prefetcher._thread.is_alive())
+        self.assertEqual(list(prefetcher), [])
+        prefetcher.close()
+        self.assertEqual(list(prefetcher), [])
+
+
+class TestVideoReaderPool(VideoTestCase):
+    def setUp(self):
+        super().setUp()
+        for video_id in ["0002", "0003"]:
+            write_video(os.path.join(self.tmpdir.name, f"{video_id}.mp4"), 20, fps=24)
+
+    def test_lru_eviction(self):
+        with VideoReaderPool(self.tmpdir.name, max_open=2) as pool:
+            first = pool.get("0001")
+            self.assertIs(pool.get("0001"), first)
+            pool.get("0002")
+            pool.get("0001")
+            pool.get("0003")
+            self.assertEqual(list(pool._captures), ["0001", "0003"])
+            self.assertTrue(first.isOpened())
+            pool.get("0002")
+            self.assertEqual(list(pool._captures), ["0003", "0002"])
+            self.assertFalse(first.isOpened())
+            with self.assertRaises(FileNotFoundError):
+                pool.get("0009")
+            self.assertNotIn("0009", pool)
+        self.assertEqual(len(pool._captures), 0)
+
+    def test_metadata_sidecar(self):
+        with VideoReaderPool(self.tmpdir.name) as pool:
+            metadata = pool.metadata("0002")
+            self.assertEqual((metadata.fps, metadata.frame_count, metadata.width, metadata.height), (24, 20, 64, 48))
+            self.assertEqual(metadata.step(6), 4)
+        with open(os.path.join(self.tmpdir.name, ".video_index.json")) as f:
+            self.assertEqual(list(json.load(f)), ["0002"])
+
+        pool = VideoReaderPool(self.tmpdir.name)
+        self.assertEqual(pool.metadata("0002"), metadata)
+        self.assertEqual(len(pool._captures), 0)
+
+        write_video(os.path.join(self.tmpdir.name, "0002.mp4"), 30, fps=24)
+        os.utime(os.path.join(self.tmpdir.name, "0002.mp4"), (0, 0))
+        self.assertEqual(pool.metadata("0002").frame_count, 30)
+        pool.close()
+
+
+class TestExtraction(VideoTestCase):
+    def test_plan_merges_plates(self):
+        plan = plan_frames(self.video, 5, self.tmpdir.name)
+        self.assertEqual(list(plan), [1, 6, 11, 16, 21, 26, 31])
+        self.assertEqual([os.path.basename(path) for path in plan[11]], ["0001_11_AB1CD.jpeg", "0001_11_EF2GH.jpeg"])
+
+    def test_extract_video(self):
+        extract_path = os.path.join(self.tmpdir.name, "frames")
+        os.makedirs(extract_path)
+        self.assertEqual(extract_video(self.video, self.video_filename, extract_path), 10)
+        self.assertEqual(len(os.listdir(extract_path)), 10)
+        self.assertEqual(plan_frames(self.video, 5, extract_path), {})
+        self.assertEqual(extract_video(self.video, self.video_filename, extract_path), 0)
+
+    def test_extract_video_matches_imwrite(self):
+        extract_path = os.path.join(self.tmpdir.name, "frames")
+        os.makedirs(extract_path)
+        counters = ThroughputCounters()
+        extract_video(self.video, self.video_filename, extract_path, writer_threads=3, counters=counters)
+        self.assertEqual((counters.decoded_frames, counters.encoded_frames, counters.written_images), (7, 7, 10))
+        expected = os.path.join(self.tmpdir.name, "expected.jpeg")
+        cv2.imwrite(expected, seek_frame(self.video_filename, 11))
+        with open(expected, 'rb') as f, open(os.path.join(extract_path, "0001_11_EF2GH.jpeg"), 'rb') as g:
+            self.assertEqual(f.read(), g.read())
+
+    def test_image_formats(self):
+        for image_format, quality in [("png", 9), ("webp", 80), ("jpeg", 50)]:
+            extract_path = os.path.join(self.tmpdir.name, image_format)
+            os.makedirs(extract_path)
+            extract_video(self.video, self.video_filename, extract_path, image_format=image_format, quality=quality)
+            names = os.listdir(extract_path)
+            self.assertEqual(len(names), 10)
+            self.assertTrue(all(name.endswith("." + image_format) for name in names))
+            image = cv2.imread(os.path.join(extract_path, "0001_1_AB1CD." + image_format))
+            self.assertEqual(image.shape, (48, 64, 3))
+            if image_format == "png":
+                np.testing.assert_array_equal(image, seek_frame(self.video_filename, 1))
+        with self.assertRaises(ValueError):
+            FrameWriter(image_format="bmp")
+
+    def test_writer_raises_errors(self):
+        writer = FrameWriter(threads=1, queue_size=1)
+        writer.write([os.path.join(self.tmpdir.name, "missing", "image.jpeg")], np.zeros((4, 4, 3), dtype=np.uint8))
+        with self.assertRaises(FileNotFoundError):
+            writer.close()
+
+    def test_extract_videos_in_processes(self):
+        jobs = []
+        for video_id in ["0002", "0003", "0004"]:
+            video_filename = os.path.join(self.tmpdir.name, f"{video_id}.mp4")
+            write_video(video_filename, 40)
+            jobs.append((Video(video_id=video_id, fps=6, plates=self.video.plates), video_filename))
+
+        outputs = []
+        for workers in [1, 3]:
+            extract_path = os.path.join(self.tmpdir.name, f"frames_{workers}")
+            os.makedirs(extract_path)
+            images, videos = [], []
+            counters = ThroughputCounters()
+            written = extract_videos(jobs, extract_path, workers=workers, on_images=images.append,
+                                     on_video=lambda video, count: videos.append((video.video_id, count)),
+                                     counters=counters)
+            self.assertEqual(written, 30)
+            self.assertEqual((counters.decoded_frames, counters.written_images), (21, 30))
+            self.assertEqual(sum(images), 30)
+            self.assertEqual(sorted(videos), [("0002", 10), ("0003", 10), ("0004", 10)])
+            outputs.append({name: open(os.path.join(extract_path, name), 'rb').read()
+                            for name in os.listdir(extract_path)})
+        self.assertEqual(outputs[0], outputs[1])